@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Batch Analysis Benchmark
+Throughput of batch.py over a set of recordings as the worker count grows
+
+Recordings are simulated bursty traffic (one seed per file) written to a
+temporary directory once and analyzed with 1, 2, 4, ... workers up to the
+core count. Each worker pins its BLAS/FFT thread pools to one thread (as
+in bench_channelizer.py), so the speedup comes from the process pool
+alone. Files are read from the page cache after the first run.
+
+Usage:
+    python3 bench_batch.py                            # 8 files of 4 s at 2 MS/s, 1..all cores
+    python3 bench_batch.py --files 16 --seconds 16 --workers 1,4,16 --output bench.json
+"""
+
+import os
+
+for _var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ.setdefault(_var, '1')
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import sys  # noqa: E402
+import tempfile  # noqa: E402
+from typing import Dict, List, Optional  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(BENCH_DIR, '..', 'sdr')))
+
+from batch import DEFAULT_CHUNK_SAMPLES, analyze_recordings  # noqa: E402
+from bench_channelizer import make_input  # noqa: E402
+from bench_ingest import environment, measure  # noqa: E402
+
+
+def default_workers() -> List[int]:
+    """1, 2, 4, ... up to and including the core count"""
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 < cores:
+        counts.append(counts[-1] * 2)
+    return counts + ([cores] if cores > 1 else [])
+
+
+def run_suite(worker_counts: Optional[List[int]] = None, files: int = 8, sample_rate: float = 2e6,
+              seconds: float = 4.0, chunk_samples: int = DEFAULT_CHUNK_SAMPLES, repeat: int = 3,
+              verbose: bool = True) -> List[Dict]:
+    worker_counts = worker_counts or default_workers()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(files):
+            path = os.path.join(tmp, f'recording{i:03}.cf32')
+            make_input(sample_rate, seconds, seed=i).tofile(path)
+            paths.append(path)
+        total_bytes = sum(os.path.getsize(p) for p in paths)
+
+        baseline = None
+        for workers in worker_counts:
+            rows = []
+
+            def run():
+                rows[:] = analyze_recordings(paths, workers, sample_rate, chunk_samples=chunk_samples)
+
+            elapsed, _ = measure(run, repeat, trace_memory=False)
+            baseline = baseline or elapsed
+            result = {
+                'benchmark': 'batch',
+                'workers': workers,
+                'files': files,
+                'chunks': sum(row['chunks'] for row in rows),
+                'failed': sum(1 for row in rows if row['error']),
+                'bytes': total_bytes,
+                'seconds': round(elapsed, 6),
+                'megabytes_per_second': round(total_bytes / 1e6 / elapsed, 1),
+                'realtime_factor': round(files * seconds / elapsed, 2),
+                'speedup': round(baseline / elapsed, 2),
+            }
+            results.append(result)
+            if verbose:
+                print(f"{workers:3} workers  {files} x {seconds:g}s  {elapsed * 1000:8.1f} ms  "
+                      f"{result['megabytes_per_second']:7.1f} MB/s  {result['realtime_factor']:6.1f}x real time  "
+                      f"{result['speedup']:5.2f}x speedup", file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark batch analysis throughput against the number of worker processes',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # 8 recordings of 4 s at 2 MS/s, 1, 2, 4, ... workers, JSON on stdout (table on stderr)
+  python3 bench_batch.py
+
+  # Fewer, longer recordings: one file is split across the pool too
+  python3 bench_batch.py --files 2 --seconds 32 --workers 1,2,4,8
+        """
+    )
+    parser.add_argument('--workers', help='Comma-separated worker counts (default: 1, 2, 4, ... cores)')
+    parser.add_argument('--files', type=int, default=8, help='Recordings (default: 8)')
+    parser.add_argument('--rate', type=float, default=2e6, help='Sample rate (default: 2e6)')
+    parser.add_argument('--seconds', type=float, default=4.0, help='Seconds per recording (default: 4)')
+    parser.add_argument('--chunk', type=int, default=DEFAULT_CHUNK_SAMPLES,
+                        help=f'Samples per task (default: {DEFAULT_CHUNK_SAMPLES})')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs; best is reported (default: 3)')
+    parser.add_argument('--output', '-o', help='Write results JSON here (default: stdout)')
+    args = parser.parse_args()
+
+    worker_counts = [int(n) for n in args.workers.split(',') if n.strip()] if args.workers else None
+    results = run_suite(worker_counts, args.files, args.rate, args.seconds, args.chunk, args.repeat)
+    output = json.dumps({'environment': environment(), 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+        print(f"Results written to: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
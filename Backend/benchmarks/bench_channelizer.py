@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Channelizer Throughput Benchmark
+Wideband samples per second through the polyphase channelizer on one core
+
+Input is simulated bursty traffic (sdr/simulator.py, fixed seed) held in
+memory, fed in capture-sized blocks. BLAS/OpenMP pools are pinned to one
+thread and scipy.fft runs single-threaded, so the numbers are per core. For
+scale, the same channels are also produced the one-radio-per-channel way
+(mix, filter and decimate each channel separately).
+
+Usage:
+    python3 bench_channelizer.py                        # 16, 80 and 160 channels at 2 MS/s
+    python3 bench_channelizer.py --channels 160 --select 8 --output bench.json
+"""
+
+import os
+
+for _var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ.setdefault(_var, '1')
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import sys  # noqa: E402
+from typing import Dict, List  # noqa: E402
+
+import numpy as np  # noqa: E402
+from scipy.signal import upfirdn  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(BENCH_DIR, '..', 'sdr')))
+
+from bench_ingest import environment, measure  # noqa: E402
+from channelizer import DEFAULT_TAPS_PER_CHANNEL, Channelizer  # noqa: E402
+from simulator import IQSimulator, build_scenario  # noqa: E402
+
+DEFAULT_CHANNELS = '16,80,160'
+
+
+def make_input(sample_rate: float, seconds: float, seed: int = 0) -> np.ndarray:
+    simulator = IQSimulator(build_scenario('bursty', sample_rate, seed), sample_rate)
+    return simulator.generate(np.empty(int(sample_rate * seconds), np.complex64))
+
+
+def channel_freqs(num_channels: int, sample_rate: float, select: int = 0) -> List[float]:
+    """``select`` channel centers (all if 0) spread evenly over the filterbank grid"""
+    grid = (np.arange(num_channels) - num_channels // 2) * sample_rate / num_channels
+    if select and select < num_channels:
+        grid = grid[np.linspace(0, num_channels - 1, select).astype(int)]
+    return [float(f) for f in grid]
+
+
+def mix_and_decimate(iq: np.ndarray, freqs: List[float], sample_rate: float, taps: np.ndarray, decimation: int):
+    """Reference: each channel mixed, filtered and decimated on its own"""
+    t = np.arange(len(iq)) / sample_rate
+    return [upfirdn(taps, iq * np.exp(-2j * np.pi * f * t).astype(np.complex64), down=decimation) for f in freqs]
+
+
+def run_suite(channel_counts: List[int], sample_rate: float = 2e6, seconds: float = 2.0, select: int = 0,
+              oversample: int = 2, taps_per_channel: int = DEFAULT_TAPS_PER_CHANNEL,
+              block_size: int = 1 << 18, repeat: int = 3, reference: bool = True,
+              verbose: bool = True) -> List[Dict]:
+    iq = make_input(sample_rate, seconds)
+    results = []
+
+    def record(name: str, num_channels: int, selected: int, func, samples: int, output_rate: float):
+        elapsed, _ = measure(func, repeat, trace_memory=False)
+        rate = samples / elapsed
+        result = {
+            'benchmark': name,
+            'channels': num_channels,
+            'selected': selected,
+            'sample_rate': sample_rate,
+            'samples': samples,
+            'seconds': round(elapsed, 6),
+            'samples_per_second': round(rate, 1),
+            'realtime_factor': round(rate / sample_rate, 2),
+            'channel_samples_per_second': round(selected * rate * output_rate / sample_rate, 1),
+        }
+        results.append(result)
+        if verbose:
+            print(f"{name:18} {num_channels:>4} ch ({selected:>3} out)  {elapsed * 1000:9.1f} ms  "
+                  f"{rate / 1e6:7.2f} MS/s  {result['realtime_factor']:6.2f}x real time", file=sys.stderr)
+
+    for num_channels in channel_counts:
+        freqs = channel_freqs(num_channels, sample_rate, select)
+        channelizer = Channelizer(sample_rate, freqs, num_channels=num_channels, oversample=oversample,
+                                  taps_per_channel=taps_per_channel)
+
+        def channelize():
+            channelizer.reset()
+            for start in range(0, len(iq), block_size):
+                channelizer.process(iq[start:start + block_size])
+
+        record('polyphase', num_channels, len(freqs), channelize, len(iq), channelizer.output_rate)
+
+        if reference:
+            # One channel is enough: the per-channel approach scales linearly
+            part = iq[:min(len(iq), int(sample_rate / 4))]
+            record('mix_decimate_1ch', num_channels, 1,
+                   lambda: mix_and_decimate(part, freqs[:1], sample_rate, channelizer.taps, channelizer.decimation),
+                   len(part), channelizer.output_rate)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the polyphase channelizer (wideband samples/s per core)',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Default sweep, JSON on stdout (table on stderr)
+  python3 bench_channelizer.py
+
+  # 12.5 kHz grid at 2.4 MS/s, only 8 channels kept
+  python3 bench_channelizer.py --rate 2.4e6 --channels 192 --select 8
+        """
+    )
+    parser.add_argument('--channels', default=DEFAULT_CHANNELS,
+                        help=f'Comma-separated filterbank sizes (default: {DEFAULT_CHANNELS})')
+    parser.add_argument('--select', type=int, default=0, help='Channels kept per run (default: all)')
+    parser.add_argument('--rate', type=float, default=2e6, help='Input sample rate (default: 2e6)')
+    parser.add_argument('--seconds', type=float, default=2.0, help='Seconds of input (default: 2)')
+    parser.add_argument('--oversample', type=int, default=2)
+    parser.add_argument('--taps', type=int, default=DEFAULT_TAPS_PER_CHANNEL, help='Taps per channel')
+    parser.add_argument('--block-size', type=int, default=1 << 18, help='Samples per block (default: 262144)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs; best is reported (default: 3)')
+    parser.add_argument('--no-reference', action='store_true', help='Skip the per-channel reference')
+    parser.add_argument('--output', '-o', help='Write results JSON here (default: stdout)')
+    args = parser.parse_args()
+
+    counts = [int(c) for c in args.channels.split(',') if c.strip()]
+    results = run_suite(counts, args.rate, args.seconds, args.select, args.oversample, args.taps,
+                        args.block_size, args.repeat, not args.no_reference)
+    output = json.dumps({'environment': environment(), 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+        print(f"Results written to: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
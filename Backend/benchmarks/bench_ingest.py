@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Ingestion Micro-Benchmarks
+Times the profile/registry hot paths of ingest_openmhz.py on synthetic calls
+
+Calls are generated from the Assets/openmhz.json schema (field shapes and
+value distributions are sampled from the fixture) with a fixed seed, so runs
+on different commits see identical input. Each benchmark reports the best of
+``--repeat`` timed runs plus the peak Python heap of one traced run.
+
+Usage:
+    python3 bench_ingest.py                                # 1k, 100k, 1M calls
+    python3 bench_ingest.py --sizes 1k,100k --output bench.json
+    python3 bench_ingest.py --sizes 100k --baseline bench.json   # exit 1 on regression
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(BENCH_DIR, '..', 'openmhz')))
+
+from ingest_openmhz import StreamProfileGenerator  # noqa: E402
+from metrics import METRICS  # noqa: E402
+from registry_store import RegistryStore  # noqa: E402
+
+FIXTURE_FILE = os.path.abspath(os.path.join(BENCH_DIR, '..', '..', 'Assets', 'openmhz.json'))
+DEFAULT_SIZES = '1k,100k,1M'
+SYSTEM_ID = 'bench'
+
+
+# ============================================================================
+# Synthetic Data
+# ============================================================================
+
+def parse_size(text: str) -> int:
+    """'1k' -> 1000, '1M' -> 1000000, '250' -> 250"""
+    text = text.strip()
+    scale = {'k': 1000, 'K': 1000, 'm': 1000000, 'M': 1000000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def load_fixture(path: str = FIXTURE_FILE) -> List[Dict]:
+    with open(path, 'r') as f:
+        return json.load(f)['calls']
+
+
+def synth_talkgroups(count: int) -> List[Dict]:
+    """Talkgroup metadata shaped like the OpenMHz /talkgroups response"""
+    tags = ['Fire Dispatch', 'Law Dispatch', 'EMS Dispatch', 'Fire-Tac', 'Public Works', 'Interop']
+    return [{
+        'num': 1000 + i,
+        'decimal': 1000 + i,
+        'alpha': f"TG_{1000 + i}",
+        'description': f"Talkgroup {1000 + i} Dispatch",
+        'tag': tags[i % len(tags)],
+        'category': 'Emergency Services'
+    } for i in range(count)]
+
+
+def synth_calls(count: int, talkgroups: int = 10000, seed: int = 0,
+                end_time: float = 1761249499.0, fixture: Optional[List[Dict]] = None) -> List[Dict]:
+    """
+    Deterministic OpenMHz call dicts, newest first like the API
+
+    srcList length, call length, frequency and patches are drawn from the
+    fixture's empirical distributions; talkgroups follow a skewed (hot
+    dispatch channels) distribution over ``talkgroups`` numbers.
+    """
+    fixture = fixture or load_fixture()
+    rng = random.Random(seed)
+    src_counts = [len(c['srcList']) for c in fixture]
+    lengths = [c['len'] for c in fixture]
+    freqs = [c['freq'] for c in fixture]
+    patches = [c['patches'] for c in fixture]
+
+    calls = []
+    t = end_time
+    for i in range(count):
+        t -= rng.expovariate(2.0)  # ~2 calls/second
+        tg = 1000 + min(int(rng.paretovariate(1.2)) - 1, talkgroups - 1)
+        stamp = datetime.fromtimestamp(t, tz=timezone.utc)
+        ms = int(t * 1000) % 1000
+        call_id = f"{int(t):08x}{i:016x}"
+        n_src = rng.choice(src_counts)
+        pos = 0.0
+        src_list = []
+        for j in range(n_src):
+            src_list.append({'pos': round(pos, 2), 'src': str(1100000 + rng.randrange(20000)),
+                             '_id': f"{call_id[:-4]}{j:04x}"})
+            pos += rng.uniform(0.5, 4.0)
+        calls.append({
+            '_id': call_id,
+            'talkgroupNum': tg,
+            'url': f"https://media.openmhz.com/media/{SYSTEM_ID}/{tg}/{SYSTEM_ID}-{tg}-{int(t)}.m4a",
+            'filename': f"/{SYSTEM_ID}/{stamp:%Y/%m/%d}/{tg}-{int(t)}.m4a",
+            'time': stamp.strftime("%Y-%m-%dT%H:%M:%S.") + f"{ms:03d}Z",
+            'srcList': src_list,
+            'star': 0,
+            'emergency': False,
+            'freq': rng.choice(freqs),
+            'patches': list(rng.choice(patches)),
+            'len': rng.choice(lengths)
+        })
+    return calls
+
+
+# ============================================================================
+# Benchmarks
+# ============================================================================
+
+def measure(func: Callable[[], object], repeat: int, trace_memory: bool) -> Tuple[float, Optional[int]]:
+    """Best wall-clock time of ``repeat`` runs, and peak traced heap of one more run"""
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+
+    peak = None
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return best, peak
+
+
+def run_suite(sizes: List[int], talkgroup_count: int = 10000, repeat: int = 3,
+              trace_memory: bool = True, seed: int = 0, verbose: bool = True) -> List[Dict]:
+    """Run every benchmark at every size; returns one result dict per (benchmark, size)"""
+    fixture = load_fixture()
+    talkgroups = synth_talkgroups(talkgroup_count)
+    tg_lookup = StreamProfileGenerator.build_talkgroup_lookup(talkgroups)
+    results = []
+
+    def record(name: str, calls: int, func: Callable[[], object], items: int, runs: int):
+        seconds, peak = measure(func, runs, trace_memory)
+        result = {
+            'benchmark': name,
+            'calls': calls,
+            'talkgroups': talkgroup_count,
+            'items': items,
+            'seconds': round(seconds, 6),
+            'items_per_second': round(items / seconds, 1) if seconds else None,
+            'peak_mb': round(peak / 2**20, 2) if peak is not None else None
+        }
+        results.append(result)
+        if verbose:
+            peak_text = f"{result['peak_mb']:9.1f} MB" if peak is not None else ''
+            print(f"{name:24} {calls:>9,} calls  {seconds * 1000:10.2f} ms  "
+                  f"{result['items_per_second'] or 0:>14,.0f} items/s {peak_text}", file=sys.stderr)
+
+    record('build_talkgroup_lookup', 0,
+           lambda: StreamProfileGenerator.build_talkgroup_lookup(talkgroups), talkgroup_count, repeat)
+
+    for size in sizes:
+        if verbose:
+            print(f"-- generating {size:,} calls", file=sys.stderr)
+        calls = synth_calls(size, talkgroup_count, seed, fixture=fixture)
+        runs = repeat if size <= 100000 else 1
+        METRICS.reset()
+
+        def generate_profiles():
+            return [StreamProfileGenerator.generate_profile(call, SYSTEM_ID, tg_lookup.get(call['talkgroupNum']))
+                    for call in calls]
+
+        record('generate_profile', size, generate_profiles, size, runs)
+
+        def generate_system_profile():
+            return StreamProfileGenerator.generate_system_profile(SYSTEM_ID, talkgroups, calls, tg_lookup=tg_lookup)
+
+        record('generate_system_profile', size, generate_system_profile, size, runs)
+
+        profile = generate_system_profile()
+        record('json_serialize', size, lambda: json.dumps(profile), size, runs)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            counter = iter(range(1 << 30))
+
+            def registry_save():
+                # Fresh database per run: measures inserts, not no-op updates
+                with RegistryStore(os.path.join(tmp, f"streams-{next(counter)}.db")) as store:
+                    store.upsert_profile(profile)
+
+            record('registry_save', size, registry_save, size, runs)
+
+        calls = profile = None
+        gc.collect()
+    return results
+
+
+# ============================================================================
+# Reporting
+# ============================================================================
+
+def environment() -> Dict:
+    """Enough context to decide whether two result files are comparable"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+                                capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+        'cpu_count': os.cpu_count(),
+        'generated_at': datetime.utcnow().isoformat() + 'Z'
+    }
+
+
+def compare(results: List[Dict], baseline: Dict, tolerance: float) -> List[Dict]:
+    """Return results whose throughput dropped more than ``tolerance`` vs the baseline"""
+    previous = {(r['benchmark'], r['calls']): r for r in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        old = previous.get((result['benchmark'], result['calls']))
+        if not old or not old.get('items_per_second') or not result.get('items_per_second'):
+            continue
+        ratio = result['items_per_second'] / old['items_per_second']
+        if ratio < 1 - tolerance:
+            regressions.append(dict(result, baseline_items_per_second=old['items_per_second'],
+                                    ratio=round(ratio, 3)))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the OpenMHz ingestion hot paths on synthetic calls',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Full suite, results as JSON on stdout (table on stderr)
+  python3 bench_ingest.py
+
+  # Save a baseline, then check a later commit against it
+  python3 bench_ingest.py --sizes 1k,100k --output baseline.json
+  python3 bench_ingest.py --sizes 1k,100k --baseline baseline.json --tolerance 0.15
+        """
+    )
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f'Comma-separated call counts, k/M suffixes allowed (default: {DEFAULT_SIZES})')
+    parser.add_argument('--talkgroups', type=int, default=10000,
+                        help='Synthetic talkgroups (default: 10000)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Timed runs per benchmark up to 100k calls; best is reported (default: 3)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Skip the traced run (peak memory), roughly halving run time')
+    parser.add_argument('--output', '-o', help='Write results JSON here (default: stdout)')
+    parser.add_argument('--baseline', help='Earlier results JSON to compare throughput against')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='Allowed throughput drop vs --baseline before failing (default: 0.15)')
+    args = parser.parse_args()
+
+    sizes = [parse_size(s) for s in args.sizes.split(',') if s.strip()]
+    results = run_suite(sizes, args.talkgroups, args.repeat, not args.no_memory, args.seed)
+    report = {'environment': environment(), 'results': results}
+    output = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+        print(f"Results written to: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['benchmark']} @ {r['calls']:,} calls: "
+                  f"{r['items_per_second']:,.0f}/s vs {r['baseline_items_per_second']:,.0f}/s "
+                  f"({r['ratio']:.0%})", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+IQ Framing Benchmark
+Bytes per sample, write/read throughput and quantization SNR of each framed sample type
+
+Input is simulated bursty traffic (fixed seed) held in memory and framed in
+capture-sized blocks, with thread pools pinned to one thread as in
+bench_channelizer.py. Writing goes to a sink that discards the bytes;
+reading decodes the framed bytes from memory (``memory``, zero-copy views)
+and through a file-like stream (``stream``, one reused read buffer), back to
+complex64 in both cases. cf32 frames are never converted, so their rates
+only measure the framing overhead.
+
+Usage:
+    python3 bench_iqframe.py                       # cf32, cs16, cs8 at 2 MS/s
+    python3 bench_iqframe.py --dtypes cs8 --block-size 65536 --output bench.json
+"""
+
+import os
+
+for _var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ.setdefault(_var, '1')
+
+import argparse  # noqa: E402
+import io  # noqa: E402
+import json  # noqa: E402
+import sys  # noqa: E402
+from typing import Dict, List, Optional  # noqa: E402
+
+import numpy as np  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(BENCH_DIR, '..', 'sdr')))
+
+from bench_channelizer import make_input  # noqa: E402
+from bench_ingest import environment, measure  # noqa: E402
+from iqframe import DTYPES, FrameReader, FrameWriter  # noqa: E402
+
+
+class NullSink:
+    """Counts what is written without keeping it"""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, data) -> int:
+        n = memoryview(data).nbytes
+        self.bytes += n
+        return n
+
+
+def snr_db(reference: np.ndarray, decoded: np.ndarray) -> Optional[float]:
+    """Signal to quantization noise; None when lossless"""
+    error = np.mean(np.abs(decoded - reference) ** 2)
+    return None if error == 0 else round(float(10 * np.log10(np.mean(np.abs(reference) ** 2) / error)), 1)
+
+
+def run_suite(dtypes: List[str], sample_rate: float = 2e6, seconds: float = 4.0, block_size: int = 1 << 18,
+              repeat: int = 3, verbose: bool = True) -> List[Dict]:
+    iq = make_input(sample_rate, seconds)
+    blocks = [iq[i:i + block_size] for i in range(0, len(iq), block_size)]
+    results = []
+    for dtype in dtypes:
+        sink = NullSink()
+
+        def write():
+            writer = FrameWriter(sink, sample_rate, dtype=dtype)
+            for block in blocks:
+                writer.write(block)
+
+        write_time, _ = measure(write, repeat, trace_memory=False)
+        framed = io.BytesIO()
+        writer = FrameWriter(framed, sample_rate, dtype=dtype)
+        for block in blocks:
+            writer.write(block)
+        data = framed.getvalue()
+
+        def read_memory():
+            for _ in FrameReader(data).blocks():
+                pass
+
+        def read_stream():
+            for _ in FrameReader(io.BytesIO(data)).blocks():
+                pass
+
+        memory_time, _ = measure(read_memory, repeat, trace_memory=False)
+        stream_time, _ = measure(read_stream, repeat, trace_memory=False)
+        decoded = np.concatenate([block.copy() for block in FrameReader(data).blocks()])
+        result = {
+            'benchmark': 'iq_framing',
+            'dtype': dtype,
+            'sample_rate': sample_rate,
+            'samples': len(iq),
+            'block_size': block_size,
+            'bytes': len(data),
+            'bytes_per_sample': round(len(data) / len(iq), 3),
+            'size_reduction': round(iq.nbytes / len(data), 2),
+            'write_samples_per_second': round(len(iq) / write_time, 1),
+            'read_memory_samples_per_second': round(len(iq) / memory_time, 1),
+            'read_stream_samples_per_second': round(len(iq) / stream_time, 1),
+            'snr_db': snr_db(iq, decoded),
+        }
+        results.append(result)
+        if verbose:
+            quality = 'lossless' if result['snr_db'] is None else f"SNR {result['snr_db']} dB"
+            print(f"{dtype:5} {result['bytes_per_sample']:6.2f} B/sample  {result['size_reduction']:5.2f}x smaller  "
+                  f"write {len(iq) / write_time / 1e6:7.1f} MS/s  read {len(iq) / memory_time / 1e6:7.1f} MS/s "
+                  f"(stream {len(iq) / stream_time / 1e6:6.1f})  {quality}", file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark framed IQ: size, write/read throughput and quantization SNR',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # All sample types at 2 MS/s, JSON on stdout (table on stderr)
+  python3 bench_iqframe.py
+
+  # sim-capture.py's chunk size, 8-bit only
+  python3 bench_iqframe.py --dtypes cs8 --block-size 65536
+        """
+    )
+    parser.add_argument('--dtypes', default=','.join(DTYPES), help='Comma-separated sample types (default: all)')
+    parser.add_argument('--rate', type=float, default=2e6, help='Sample rate (default: 2e6)')
+    parser.add_argument('--seconds', type=float, default=4.0, help='Seconds of input (default: 4)')
+    parser.add_argument('--block-size', type=int, default=1 << 18, help='Samples per frame (default: 262144)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs; best is reported (default: 3)')
+    parser.add_argument('--output', '-o', help='Write results JSON here (default: stdout)')
+    args = parser.parse_args()
+
+    dtypes = [d.strip() for d in args.dtypes.split(',') if d.strip()]
+    unknown = set(dtypes) - set(DTYPES)
+    if unknown:
+        parser.error(f"unknown dtypes: {', '.join(sorted(unknown))}")
+    results = run_suite(dtypes, args.rate, args.seconds, args.block_size, args.repeat)
+    output = json.dumps({'environment': environment(), 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+        print(f"Results written to: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Waterfall Benchmark
+Wideband IQ to averaged uint8 spectrum rows on one core: real-time factor and output rate
+
+Input is simulated bursty traffic (fixed seed) held in memory and fed in
+capture-sized blocks, with thread pools pinned to one thread as in
+bench_channelizer.py. Output bytes are the JSON lines waterfall.py would
+publish, compared with the complex64 input.
+
+Usage:
+    python3 bench_waterfall.py                      # 256, 1024 and 4096 bins at 2 MS/s, 5 rows/s
+    python3 bench_waterfall.py --rate 2.4e6 --nfft 2048 --fps 10 --output bench.json
+"""
+
+import os
+
+for _var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ.setdefault(_var, '1')
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import sys  # noqa: E402
+from typing import Dict, List  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(BENCH_DIR, '..', 'sdr')))
+
+from bench_channelizer import make_input  # noqa: E402
+from bench_ingest import environment, measure  # noqa: E402
+from waterfall import DEFAULT_ROWS_PER_SECOND, Waterfall, encode_row  # noqa: E402
+
+
+def run_suite(sizes: List[int], sample_rate: float = 2e6, seconds: float = 4.0,
+              rows_per_second: float = DEFAULT_ROWS_PER_SECOND, block_size: int = 1 << 18, repeat: int = 3,
+              verbose: bool = True) -> List[Dict]:
+    iq = make_input(sample_rate, seconds)
+    results = []
+    for nfft in sizes:
+        rows = []
+
+        def run():
+            waterfall = Waterfall(sample_rate, nfft, rows_per_second)
+            rows[:] = [row for i in range(0, len(iq), block_size) for row in waterfall.update(iq[i:i + block_size])]
+
+        elapsed, _ = measure(run, repeat, trace_memory=False)
+        out_bytes = sum(len(encode_row(row)) + 1 for row in rows)
+        result = {
+            'benchmark': 'waterfall',
+            'nfft': nfft,
+            'sample_rate': sample_rate,
+            'rows_per_second': rows_per_second,
+            'rows': len(rows),
+            'samples': len(iq),
+            'seconds': round(elapsed, 6),
+            'samples_per_second': round(len(iq) / elapsed, 1),
+            'realtime_factor': round(seconds / elapsed, 2),
+            'bytes_in': iq.nbytes,
+            'bytes_out': out_bytes,
+            'output_bytes_per_second': round(out_bytes / seconds, 1),
+            'bandwidth_reduction': round(iq.nbytes / max(out_bytes, 1), 1),
+        }
+        results.append(result)
+        if verbose:
+            print(f"{nfft:5} bins  {sample_rate / 1e6:.2f} MS/s  {elapsed * 1000:8.1f} ms for {seconds:g}s  "
+                  f"{result['realtime_factor']:6.1f}x real time  {out_bytes / seconds / 1e3:6.1f} kB/s out  "
+                  f"({result['bandwidth_reduction']:.0f}x less data)", file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the live waterfall stage (real-time factor on one core)',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Three FFT sizes at 2 MS/s, JSON on stdout (table on stderr)
+  python3 bench_waterfall.py
+
+  # An RTL-SDR's usual 2.4 MS/s, 10 rows/s
+  python3 bench_waterfall.py --rate 2.4e6 --fps 10
+        """
+    )
+    parser.add_argument('--nfft', default='256,1024,4096', help='Comma-separated FFT sizes (default: 256,1024,4096)')
+    parser.add_argument('--rate', type=float, default=2e6, help='Input sample rate (default: 2e6)')
+    parser.add_argument('--seconds', type=float, default=4.0, help='Seconds of input (default: 4)')
+    parser.add_argument('--fps', type=float, default=DEFAULT_ROWS_PER_SECOND,
+                        help=f'Rows per second (default: {DEFAULT_ROWS_PER_SECOND:g})')
+    parser.add_argument('--block-size', type=int, default=1 << 18, help='Samples per block (default: 262144)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs; best is reported (default: 3)')
+    parser.add_argument('--output', '-o', help='Write results JSON here (default: stdout)')
+    args = parser.parse_args()
+
+    sizes = [int(n) for n in args.nfft.split(',') if n.strip()]
+    results = run_suite(sizes, args.rate, args.seconds, args.fps, args.block_size, args.repeat)
+    output = json.dumps({'environment': environment(), 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+        print(f"Results written to: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
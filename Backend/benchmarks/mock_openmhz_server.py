@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenMHz API - serves fixture calls/talkgroups over HTTP
+
+Usage:
+    python3 mock_openmhz_server.py --port 8765
+    OPENMHZ_API_URL=http://127.0.0.1:8765 python3 ../openmhz/ingest_openmhz.py --system dcfd
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit, parse_qs
+
+FIXTURE_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'Assets', 'openmhz.json'))
+
+
+def call_time_ms(call: Dict) -> int:
+    """Convert an OpenMHz call 'time' (ISO 8601) to epoch milliseconds"""
+    parsed = datetime.strptime(call['time'], "%Y-%m-%dT%H:%M:%S.%fZ")
+    return int(round(parsed.replace(tzinfo=timezone.utc).timestamp() * 1000))
+
+
+def load_fixture_calls() -> List[Dict]:
+    """Load the recorded calls from Assets/openmhz.json"""
+    with open(FIXTURE_FILE, 'r') as f:
+        return json.load(f)['calls']
+
+
+def rebase_calls(calls: List[Dict], end_time: Optional[float] = None) -> List[Dict]:
+    """Shift call times so the newest call lands at end_time (default: now)"""
+    if end_time is None:
+        end_time = time.time()
+    offset_ms = int(end_time * 1000) - max(call_time_ms(c) for c in calls)
+    rebased = []
+    for call in calls:
+        ms = call_time_ms(call) + offset_ms
+        stamp = datetime.fromtimestamp(ms / 1000, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.") + f"{ms % 1000:03d}Z"
+        rebased.append(dict(call, time=stamp))
+    return rebased
+
+
+def fake_audio(path: str, size: int = 4096) -> bytes:
+    """Deterministic stand-in audio bytes for a media path"""
+    digest = hashlib.sha256(path.encode()).digest()
+    return (digest * (size // len(digest) + 1))[:size]
+
+
+def talkgroups_for(calls: List[Dict]) -> List[Dict]:
+    """Synthesize talkgroup metadata for every talkgroup seen in the calls"""
+    nums = sorted({c['talkgroupNum'] for c in calls})
+    return [{
+        'num': num,
+        'decimal': num,
+        'alpha': f"TG_{num}",
+        'description': f"Talkgroup {num} Dispatch",
+        'tag': 'Fire Dispatch' if num % 2 else 'Law Dispatch',
+        'category': 'Emergency Services'
+    } for num in nums]
+
+
+class MockOpenMHzServer:
+    """
+    Threaded HTTP server answering /{system}/talkgroups and /{system}/calls/newer,
+    plus /media/... audio files (see fake_audio)
+    """
+
+    def __init__(self, systems: Optional[Dict[str, Dict]] = None, delay: float = 0.0,
+                 page_size: int = 50, port: int = 0):
+        if systems is None:
+            calls = load_fixture_calls()
+            systems = {'dcfd': {'calls': calls, 'talkgroups': talkgroups_for(calls)}}
+        self.systems = systems
+        self.delay = delay
+        self.page_size = page_size
+        self.request_log: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.faults: List[Dict] = []
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MockOpenMHzServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def add_calls(self, system_id: str, calls: List[Dict]):
+        """Append calls to a system (simulates new traffic arriving)"""
+        with self._lock:
+            system = self.systems.setdefault(system_id, {'calls': [], 'talkgroups': []})
+            system['calls'] = system['calls'] + list(calls)
+
+    def inject(self, status: int, count: int = 1, retry_after: Optional[str] = None):
+        """Answer the next ``count`` requests with ``status`` (e.g. 429 with Retry-After)"""
+        with self._lock:
+            self.faults.extend({'status': status, 'retry_after': retry_after} for _ in range(count))
+
+    def talkgroups_etag(self, system_id: str) -> str:
+        body = json.dumps(self.systems[system_id]['talkgroups'], sort_keys=True).encode()
+        return '"%s"' % hashlib.sha1(body).hexdigest()
+
+    def route(self, path: str, query: Dict[str, List[str]], headers=None):
+        """Return (status, payload) for a request path"""
+        parts = [p for p in path.split('/') if p]
+        if parts[:1] == ['media']:
+            return 200, fake_audio(path)
+        if not parts or parts[0] not in self.systems:
+            return 404, {'error': 'unknown system'}
+        system = self.systems[parts[0]]
+
+        if parts[1:] == ['talkgroups']:
+            if headers is not None and headers.get('If-None-Match') == self.talkgroups_etag(parts[0]):
+                return 304, None
+            return 200, system['talkgroups']
+
+        if parts[1:] == ['calls', 'newer']:
+            since = int(query.get('time', ['0'])[0])
+            calls = sorted((c for c in system['calls'] if call_time_ms(c) > since), key=call_time_ms)
+            if 'filter-code' in query:
+                wanted = {int(x) for x in query['filter-code'][0].split(',')}
+                calls = [c for c in calls if c['talkgroupNum'] in wanted]
+            return 200, {'calls': calls[:self.page_size], 'direction': 'newer'}
+
+        return 404, {'error': 'not found'}
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.request_log.append(self.path)
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                    fault = server.faults.pop(0) if server.faults else None
+                try:
+                    if server.delay:
+                        time.sleep(server.delay)
+                    if fault:
+                        self.send_response(fault['status'])
+                        if fault['retry_after'] is not None:
+                            self.send_header('Retry-After', fault['retry_after'])
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                    split = urlsplit(self.path)
+                    status, payload = server.route(split.path, parse_qs(split.query), self.headers)
+                    if isinstance(payload, bytes):
+                        body, content_type = payload, 'audio/mp4'
+                    else:
+                        body = json.dumps(payload).encode() if payload is not None else b''
+                        content_type = 'application/json'
+                    self.send_response(status)
+                    if split.path.endswith('/talkgroups') and status in (200, 304):
+                        self.send_header('ETag', server.talkgroups_etag(split.path.strip('/').split('/')[0]))
+                    self.send_header('Content-Type', content_type)
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the OpenMHz API')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.0, help='Artificial latency per request (s)')
+    parser.add_argument('--systems', default='dcfd', help='Comma-separated system IDs to serve the fixture as')
+    args = parser.parse_args()
+
+    calls = rebase_calls(load_fixture_calls())
+    systems = {sid: {'calls': calls, 'talkgroups': talkgroups_for(calls)} for sid in args.systems.split(',')}
+    server = MockOpenMHzServer(systems, delay=args.delay, port=args.port)
+    print(f"Mock OpenMHz API on {server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Replay Load Harness
+Replays OpenMHz call traffic against ingest_openmhz.py and measures
+call-to-registry latency end to end
+
+A local stand-in API (mock_openmhz_server.py, shared with the test suite) releases each call
+once its (rebased, time-compressed) ``time`` has passed, across N simulated
+systems. ingest_openmhz.py runs unmodified as a subprocess in a polling mode
+and writes to a scratch registry; a watcher polls the registry for new rows.
+
+Reported per run (JSON on stdout):
+    latency    call ``time`` -> first seen in the registry (p50/p90/p99/max)
+    dropped    served calls (len > 0) that never reached the registry
+    duplicates streams the ingester emitted more than once
+    unexpected registry streams that were never served
+
+Usage:
+    python3 replay_load.py --systems 4 --speed 10
+    python3 replay_load.py --source synthetic --calls 20000 --systems 8 --speed 50 --mode follow
+    python3 replay_load.py --mode oneshot --interval 60 -- --rate 10
+"""
+
+import argparse
+import json
+import os
+import shutil
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_right
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.abspath(os.path.join(BENCH_DIR, '..'))
+INGEST_SCRIPT = os.path.join(BACKEND_DIR, 'openmhz', 'ingest_openmhz.py')
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'openmhz'))
+
+from bench_ingest import synth_calls  # noqa: E402
+from ingest_openmhz import format_call_time  # noqa: E402
+from mock_openmhz_server import MockOpenMHzServer, call_time_ms, load_fixture_calls, talkgroups_for  # noqa: E402
+from registry_store import RegistryStore  # noqa: E402
+
+
+# ============================================================================
+# Replay Schedule
+# ============================================================================
+
+def build_schedule(template: List[Dict], system_ids: List[str], start: float, speed: float,
+                   duration: Optional[float] = None) -> Dict[str, List[Tuple[int, Dict]]]:
+    """
+    Per-system (release time in epoch ms, call) lists, oldest first
+
+    The template's call offsets are divided by ``speed`` and shifted to
+    ``start``; each call's ``time`` is rewritten to its release time, so the
+    ingester sees a live system. The template is tiled to fill ``duration``
+    seconds of call time (default: one pass). Every system gets its own call
+    IDs and a small phase offset so systems do not poll in lockstep.
+    """
+    ordered = sorted(template, key=call_time_ms)
+    first = call_time_ms(ordered[0])
+    span = max(call_time_ms(ordered[-1]) - first, 1) + 1000
+    passes = 1 if duration is None else max(1, int(duration * 1000 // span) + 1)
+    limit = duration * 1000 if duration is not None else None
+
+    schedule = {}
+    for index, system_id in enumerate(system_ids):
+        phase = index * 997 / len(system_ids)  # ms, spreads systems across a second
+        items = []
+        for rep in range(passes):
+            for call in ordered:
+                offset = rep * span + call_time_ms(call) - first + phase
+                if limit is not None and offset > limit:
+                    break
+                release_ms = int(start * 1000 + offset / speed)
+                call_id = f"{system_id}{rep:04x}{call['_id']}"
+                items.append((release_ms, dict(call, _id=call_id, time=format_call_time(release_ms))))
+        items.sort(key=lambda item: item[0])
+        schedule[system_id] = items
+    return schedule
+
+
+class ReplayServer(MockOpenMHzServer):
+    """MockOpenMHzServer whose /calls/newer only returns calls already released"""
+
+    def __init__(self, schedule: Dict[str, List[Tuple[int, Dict]]], page_size: int = 50):
+        systems = {}
+        for system_id, items in schedule.items():
+            calls = [call for _, call in items]
+            systems[system_id] = {'calls': calls, 'talkgroups': talkgroups_for(calls)}
+        super().__init__(systems, page_size=page_size)
+        self._release = {sid: [ms for ms, _ in items] for sid, items in schedule.items()}
+
+    def route(self, path: str, query: Dict[str, List[str]], headers=None):
+        parts = [p for p in path.split('/') if p]
+        if parts[1:] == ['calls', 'newer'] and parts[0] in self._release:
+            release = self._release[parts[0]]
+            since = int(query.get('time', ['0'])[0])
+            lo = bisect_right(release, since)
+            hi = bisect_right(release, int(time.time() * 1000))
+            calls = self.systems[parts[0]]['calls'][lo:hi]
+            if 'filter-code' in query:
+                wanted = {int(x) for x in query['filter-code'][0].split(',')}
+                calls = [c for c in calls if c['talkgroupNum'] in wanted]
+            return 200, {'calls': calls[:self.page_size], 'direction': 'newer'}
+        return super().route(path, query, headers)
+
+
+# ============================================================================
+# Observation
+# ============================================================================
+
+class RegistryWatcher:
+    """Polls the registry for new stream rows and records when each first appeared"""
+
+    def __init__(self, db_path: str, poll_interval: float = 0.05):
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        self.first_seen: Dict[str, float] = {}
+        self._last_rowid = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> 'RegistryWatcher':
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.poll()  # Final sweep
+
+    def poll(self):
+        if not os.path.exists(self.db_path):
+            return
+        try:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, timeout=5)
+            try:
+                rows = conn.execute("SELECT rowid, stream_id FROM streams WHERE rowid > ? ORDER BY rowid",
+                                    (self._last_rowid,)).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.OperationalError:
+            return  # Schema not created yet
+        now = time.time()
+        for rowid, stream_id in rows:
+            self.first_seen.setdefault(stream_id, now)
+            self._last_rowid = rowid
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            self.poll()
+
+
+class OutputCounter:
+    """Counts stream IDs on the ingester's NDJSON stdout (duplicates = emitted twice)"""
+
+    def __init__(self, stream):
+        self.emitted: Counter = Counter()
+        self._thread = threading.Thread(target=self._run, args=(stream,), daemon=True)
+        self._thread.start()
+
+    def _run(self, stream):
+        for line in stream:
+            try:
+                item = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(item, dict) and 'stream_id' in item:
+                self.emitted[item['stream_id']] += 1
+
+    def join(self, timeout: float = 5.0):
+        self._thread.join(timeout)
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(-(-q * len(sorted_values) // 1)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+# ============================================================================
+# Harness
+# ============================================================================
+
+def ingest_command(mode: str, system_ids: List[str], api_url: str, workdir: str,
+                   interval: float, extra_args: List[str]) -> List[str]:
+    command = [sys.executable, INGEST_SCRIPT, '--systems', ','.join(system_ids),
+               '--api-url', api_url, '--save-registry',
+               '--registry-db', os.path.join(workdir, 'streams.db'),
+               '--export-registry', os.path.join(workdir, 'streams.json'),
+               '--no-talkgroup-cache', '--format', 'ndjson']
+    if mode == 'follow':
+        command += ['--follow', '--interval', str(interval),
+                    '--state-file', os.path.join(workdir, 'watermarks.json')]
+    return command + list(extra_args)
+
+
+def run_replay(template: List[Dict], systems: int = 4, speed: float = 10.0, mode: str = 'follow',
+               interval: float = 1.0, duration: Optional[float] = None, page_size: int = 50,
+               drain: Optional[float] = None, extra_args: Optional[List[str]] = None,
+               keep: bool = False, verbose: bool = False) -> Dict:
+    """
+    Replay ``template`` calls across ``systems`` systems and measure ingestion
+
+    Args:
+        template: OpenMHz call dicts (any time range; offsets are preserved)
+        systems: Number of simulated systems
+        speed: Replay speed as a multiple of real time
+        mode: 'follow' (one --follow process) or 'oneshot' (a fresh run every interval, like cron)
+        interval: Poll interval in seconds
+        duration: Seconds of call time to replay (template is tiled; default: one pass)
+        page_size: Calls per /calls/newer response
+        drain: Seconds to keep ingesting after the last release (default: 2 intervals + 5s)
+        extra_args: Extra ingest_openmhz.py arguments, e.g. ['--rate', '10']
+        keep: Keep the scratch directory (registry, watermarks) and report its path
+    """
+    system_ids = [f"replay{i:03d}" for i in range(systems)]
+    start = time.time() + 1.0  # Leave time for the ingester to start
+    schedule = build_schedule(template, system_ids, start, speed, duration)
+    release_s = {}
+    for system_id, items in schedule.items():
+        for ms, call in items:
+            if call.get('len', 0) > 0:  # The ingester drops zero-length calls by design
+                release_s[f"{system_id}-{call['talkgroupNum']}-{call['_id']}"] = ms / 1000
+    last_release = max(ms for items in schedule.values() for ms, _ in items) / 1000
+    if drain is None:
+        drain = 2 * interval + 5.0
+
+    server = ReplayServer(schedule, page_size=page_size).start()
+    workdir = tempfile.mkdtemp(prefix='replay-')
+    with RegistryStore(os.path.join(workdir, 'streams.db')) as store:
+        # A non-empty store is not seeded from the legacy streams.json
+        store.upsert_profile({'system_id': '_replay', 'streams': []})
+    watcher = RegistryWatcher(os.path.join(workdir, 'streams.db')).start()
+    command = ingest_command(mode, system_ids, server.url, workdir, interval, extra_args or [])
+    stderr = None if verbose else subprocess.DEVNULL
+    emitted: Counter = Counter()
+    runs = 0
+
+    try:
+        if mode == 'follow':
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr, text=True)
+            output = OutputCounter(process.stdout)
+            try:
+                time.sleep(max(0.0, last_release + drain - time.time()))
+            finally:
+                process.send_signal(signal.SIGINT)
+                try:
+                    process.wait(timeout=30)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+                output.join()
+            emitted = output.emitted
+            runs = 1
+        else:
+            deadline = last_release + drain
+            while time.time() < deadline:
+                started = time.time()
+                result = subprocess.run(command, stdout=subprocess.PIPE, stderr=stderr, text=True)
+                for line in result.stdout.splitlines():
+                    try:
+                        item = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(item, dict) and 'stream_id' in item:
+                        emitted[item['stream_id']] += 1
+                runs += 1
+                time.sleep(max(0.0, interval - (time.time() - started)))
+    finally:
+        watcher.stop()
+        server.stop()
+        requests_served = len(server.request_log)
+        if not keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    latencies = sorted(seen - release_s[sid] for sid, seen in watcher.first_seen.items() if sid in release_s)
+    dropped = sorted(set(release_s) - set(watcher.first_seen))
+    unexpected = sorted(set(watcher.first_seen) - set(release_s))
+    duplicates = {sid: count - 1 for sid, count in emitted.items() if count > 1}
+    wall = max(last_release - start, 1e-9)
+
+    return {
+        'mode': mode,
+        'systems': systems,
+        'speed': speed,
+        'interval': interval,
+        'page_size': page_size,
+        'ingest_runs': runs,
+        'api_requests': requests_served,
+        'calls_served': len(release_s),
+        'calls_ingested': len(latencies),
+        'offered_calls_per_second': round(len(release_s) / wall, 2),
+        'dropped': len(dropped),
+        'dropped_sample': dropped[:10],
+        'duplicates': sum(duplicates.values()),
+        'duplicate_streams': len(duplicates),
+        'unexpected': len(unexpected),
+        'latency_seconds': {
+            'p50': _round(percentile(latencies, 0.50)),
+            'p90': _round(percentile(latencies, 0.90)),
+            'p99': _round(percentile(latencies, 0.99)),
+            'max': _round(latencies[-1] if latencies else None),
+            'mean': _round(sum(latencies) / len(latencies) if latencies else None)
+        },
+        'workdir': workdir if keep else None
+    }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 4) if value is not None else None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Replay OpenMHz traffic against ingest_openmhz.py and measure call-to-registry latency',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # The recorded fixture on 4 systems at 10x real time, --follow every second
+  python3 replay_load.py --systems 4 --speed 10
+
+  # Synthetic traffic (~2 calls/s per system) for sizing, 15 minutes of call time at 60x
+  python3 replay_load.py --source synthetic --systems 16 --speed 60 --duration 900
+
+  # Cron-style one-shot runs; arguments after -- go to ingest_openmhz.py
+  python3 replay_load.py --mode oneshot --interval 30 -- --rate 10
+        """
+    )
+    parser.add_argument('--source', choices=['recorded', 'synthetic'], default='recorded',
+                        help='recorded: Assets/openmhz.json; synthetic: bench_ingest.synth_calls (default: recorded)')
+    parser.add_argument('--input', help='Recorded calls file (OpenMHz /calls response shape)')
+    parser.add_argument('--calls', type=int, default=5000, help='Synthetic calls per template (default: 5000)')
+    parser.add_argument('--systems', type=int, default=4, help='Simulated systems (default: 4)')
+    parser.add_argument('--speed', type=float, default=10.0, help='Multiple of real time (default: 10)')
+    parser.add_argument('--duration', type=float, help='Seconds of call time to replay (default: one pass)')
+    parser.add_argument('--mode', choices=['follow', 'oneshot'], default='follow')
+    parser.add_argument('--interval', type=float, default=1.0, help='Poll interval in seconds (default: 1)')
+    parser.add_argument('--page-size', type=int, default=50, help='Calls per API page (default: 50)')
+    parser.add_argument('--drain', type=float, help='Seconds to keep running after the last call (default: 2 intervals + 5)')
+    parser.add_argument('--output', '-o', help='Write the report here (default: stdout)')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch registry and watermarks')
+    parser.add_argument('--verbose', '-v', action='store_true', help="Show the ingester's stderr")
+    parser.add_argument('ingest_args', nargs=argparse.REMAINDER,
+                        help='Arguments after -- are passed to ingest_openmhz.py')
+    args = parser.parse_args()
+
+    if args.source == 'synthetic':
+        template = synth_calls(args.calls, talkgroups=500, end_time=time.time())
+    elif args.input:
+        with open(args.input, 'r') as f:
+            template = json.load(f)['calls']
+    else:
+        template = load_fixture_calls()
+
+    extra = [a for a in args.ingest_args if a != '--']
+    report = run_replay(template, args.systems, args.speed, args.mode, args.interval,
+                        args.duration, args.page_size, args.drain, extra, args.keep, args.verbose)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+    print(output if not args.output else f"Report written to: {args.output}")
+
+    latency = report['latency_seconds']
+    print(f"{report['calls_ingested']}/{report['calls_served']} calls, "
+          f"p50 {latency['p50']}s p99 {latency['p99']}s, "
+          f"{report['dropped']} dropped, {report['duplicates']} duplicates", file=sys.stderr)
+    if report['dropped']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Audio Cache
+Content-addressed on-disk cache of call audio, filled by a concurrent prefetcher
+
+Files are stored by OpenMHz call ``_id`` (``<dir>/<id[:2]>/<id>.m4a``) so every
+consumer (openmhzServer.js, the libp2p publisher) can serve a call with a
+local read. The least recently used files are evicted to stay under a size
+budget.
+
+Usage:
+    python3 audio_cache.py stats
+    python3 audio_cache.py evict --max-mb 512
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+from metrics import METRICS
+
+OPENMHZ_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_AUDIO_CACHE = os.path.join(OPENMHZ_DIR, 'audio_cache')
+DEFAULT_MAX_MB = 2048.0
+DEFAULT_LOW_WATER = 0.9  # Eviction triggered by a download trims to this fraction of the budget
+
+
+def audio_extension(url: str) -> str:
+    """File extension of an audio URL (default .m4a)"""
+    ext = os.path.splitext(urlsplit(url).path)[1].lower()
+    return ext if ext[1:].isalnum() else '.m4a'
+
+
+class AudioCache:
+    """
+    Content-addressed audio files with an LRU size budget
+
+    Recency is the file mtime, refreshed on every hit (openmhzServer.js does
+    the same when it serves a file), so the order survives restarts. When a
+    download takes the cache over ``max_bytes`` it is trimmed to
+    ``low_water`` of the budget, so the directory scan behind eviction runs
+    once per that much new audio rather than on every download.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_AUDIO_CACHE, max_bytes: int = int(DEFAULT_MAX_MB * 2**20),
+                 low_water: float = DEFAULT_LOW_WATER):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.low_water = low_water
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.total_bytes = sum(size for _, _, size in self._scan())
+
+    def path_for(self, call_id: str, url: str = '') -> str:
+        safe_id = ''.join(c for c in call_id if c.isalnum()) or 'unknown'
+        return os.path.join(self.cache_dir, safe_id[:2], safe_id + audio_extension(url))
+
+    def get(self, call_id: str, url: str = '') -> Optional[str]:
+        """Path of a cached file (marking it recently used), or None"""
+        path = self.path_for(call_id, url)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def fetch(self, call_id: str, url: str, session: requests.Session, timeout: float = 30.0) -> str:
+        """Return the cached path, downloading the file first on a miss"""
+        path = self.get(call_id, url)
+        if path:
+            return path
+
+        path = self.path_for(call_id, url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.part"
+        size = 0
+        try:
+            with session.get(url, stream=True, timeout=timeout) as response:
+                response.raise_for_status()
+                with open(tmp_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        f.write(chunk)
+                        size += len(chunk)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+        with self._lock:
+            self.total_bytes += size
+            over = self.total_bytes > self.max_bytes
+        if over:
+            self.evict(int(self.max_bytes * self.low_water), keep=path)
+        return path
+
+    def _scan(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.part'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_mtime, stat.st_size
+
+    def evict(self, max_bytes: Optional[int] = None, keep: Optional[str] = None) -> Tuple[int, int]:
+        """
+        Delete least recently used files until the cache fits ``max_bytes``
+
+        Returns:
+            (files removed, bytes freed)
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        with self._lock:
+            entries = sorted(self._scan(), key=lambda entry: entry[1])
+            total = sum(size for _, _, size in entries)
+            removed, freed = 0, 0
+            for path, _, size in entries:
+                if total <= limit:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+                freed += size
+            self.total_bytes = total
+        return removed, freed
+
+    def stats(self) -> Dict:
+        files = list(self._scan())
+        return {
+            'cache_dir': self.cache_dir,
+            'files': len(files),
+            'bytes': sum(size for _, _, size in files),
+            'max_bytes': self.max_bytes
+        }
+
+
+class AudioPrefetcher:
+    """
+    Downloads call audio into an AudioCache with bounded parallelism
+
+    ``submit`` returns a Future resolving to the local path, or None if the
+    download failed; a failed download never fails ingestion.
+    """
+
+    def __init__(self, cache: AudioCache, max_workers: int = 4,
+                 session: Optional[requests.Session] = None, verbose: bool = False):
+        self.cache = cache
+        self.verbose = verbose
+        self.session = session or requests.Session()
+        self._owns_session = session is None
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='audio-prefetch')
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'downloads': 0, 'failures': 0}
+
+    def _download(self, call_id: str, url: str) -> Optional[str]:
+        started = time.perf_counter()
+        try:
+            path = self.cache.fetch(call_id, url, self.session)
+            METRICS.observe('audio_download_seconds', time.perf_counter() - started)
+            METRICS.inc('audio_prefetch_total', result='download')
+            with self._lock:
+                self.stats['downloads'] += 1
+            return path
+        except (requests.RequestException, OSError) as e:
+            METRICS.inc('audio_prefetch_total', result='failure')
+            with self._lock:
+                self.stats['failures'] += 1
+            if self.verbose:
+                print(f"Audio prefetch failed for {call_id}: {e}", file=sys.stderr)
+            return None
+        finally:
+            with self._lock:
+                self._inflight.pop(call_id, None)
+
+    def submit(self, call_id: str, url: str) -> Future:
+        """Start fetching a call's audio (cache hits resolve immediately)"""
+        path = self.cache.get(call_id, url) if call_id and url else None
+        if path or not (call_id and url):
+            if path:
+                METRICS.inc('audio_prefetch_total', result='hit')
+                with self._lock:
+                    self.stats['hits'] += 1
+            future = Future()
+            future.set_result(path)
+            return future
+        with self._lock:
+            future = self._inflight.get(call_id)
+            if future is None:
+                future = self._inflight[call_id] = self._pool.submit(self._download, call_id, url)
+            return future
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        if self._owns_session:
+            self.session.close()
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or trim the audio cache')
+    parser.add_argument('--dir', default=DEFAULT_AUDIO_CACHE, help='Cache directory (default: openmhz/audio_cache)')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('stats', help='Print file count and size')
+    evict_cmd = sub.add_parser('evict', help='Delete least recently used files down to a size')
+    evict_cmd.add_argument('--max-mb', type=float, default=DEFAULT_MAX_MB)
+    args = parser.parse_args()
+
+    if args.command == 'stats':
+        stats = AudioCache(args.dir).stats()
+        print(f"{stats['files']} files, {stats['bytes'] / 2**20:.1f} MB in {stats['cache_dir']}")
+    else:
+        started = time.time()
+        removed, freed = AudioCache(args.dir).evict(int(args.max_mb * 2**20))
+        print(f"Removed {removed} files ({freed / 2**20:.1f} MB) in {time.time() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
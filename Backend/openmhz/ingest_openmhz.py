@@ -6,69 +6,456 @@ Fetches streams from OpenMHz.com and assigns blockchain wallets
 Usage:
     python3 ingest_openmhz.py --system rhode-island
     python3 ingest_openmhz.py --system rhode-island --assign-wallets --save-registry
+    python3 ingest_openmhz.py --systems rhode-island,kcers1b,dcfd
 """
 
 import argparse
+import atexit
 import json
 import sys
 import time
 import subprocess
 import os
-from typing import List, Dict, Optional
-from datetime import datetime
+import queue
+import random
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from collections import deque
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from urllib.parse import parse_qs, urlsplit
 import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import METRICS, start_metrics_server
+from audio_cache import DEFAULT_AUDIO_CACHE, DEFAULT_MAX_MB as DEFAULT_AUDIO_CACHE_MB, AudioCache, AudioPrefetcher
+from registry_store import DEFAULT_DB as DEFAULT_REGISTRY_DB, DEFAULT_JSON as DEFAULT_REGISTRY_JSON, RegistryStore, open_registry
+from stream_index import StreamIndex
 
 
 # ============================================================================
 # OpenMHz API Client
 # ============================================================================
 
+DEFAULT_BASE_URL = os.environ.get('OPENMHZ_API_URL', "https://api.openmhz.com")
+
+
+def create_session(pool_size: int = 10) -> requests.Session:
+    """Create an HTTP session whose connection pool can be shared across threads"""
+    session = requests.Session()
+    session.headers.update({'User-Agent': 'Argus-Defense-SDR-Ingest/1.0'})
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class HostLimiter:
+    """Caps the number of in-flight requests per host"""
+
+    def __init__(self, per_host: int = 4):
+        self.per_host = per_host
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+
+    def slot(self, url: str) -> threading.BoundedSemaphore:
+        """Return the semaphore guarding the host of a URL"""
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.per_host)
+            return self._semaphores[host]
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing ``rate`` requests per second on average"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def set_rate(self, rate: float):
+        with self._lock:
+            self._refill()
+            self.rate = rate
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Block until a request may be made"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+
+class RequestScheduler:
+    """
+    Shared request budget, retry policy and throttling state for one API
+
+    The global ``rate`` (requests/second, None for no budget) is split evenly
+    across the systems that use the scheduler, each getting its own token
+    bucket, so one busy system cannot starve the others. Rate limiting is
+    adaptive: a 429 halves every system's share and pauses all requests until
+    its Retry-After has passed; each success then wins back a little of the
+    budget. Retries use full-jitter exponential backoff.
+    """
+
+    def __init__(self, rate: Optional[float] = None, max_retries: int = 4,
+                 base_delay: float = 0.5, max_delay: float = 60.0,
+                 min_factor: float = 1 / 16, recovery: float = 0.05):
+        self.rate = rate
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.min_factor = min_factor
+        self.recovery = recovery
+        self.factor = 1.0
+        self.paused_until = 0.0
+        self.stats = {'requests': 0, 'retries': 0, 'throttled': 0, 'failures': 0}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _share(self) -> float:
+        return self.rate * self.factor / max(1, len(self._buckets))
+
+    def _rebalance(self):
+        share = self._share()
+        for bucket in self._buckets.values():
+            bucket.set_rate(share)
+
+    def register(self, keys: Iterable[str]):
+        """Split the budget across these keys up front (otherwise done as keys appear)"""
+        with self._lock:
+            for key in keys:
+                self._buckets.setdefault(key, TokenBucket(1.0, capacity=1.0))
+            if self.rate:
+                self._rebalance()
+
+    def acquire(self, key: str):
+        """Block until ``key`` may send a request"""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(1.0, capacity=1.0)
+                if self.rate:
+                    self._rebalance()
+            self.stats['requests'] += 1
+        pause = self.paused_until - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+        if self.rate:
+            bucket.acquire()
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for a retry attempt (0-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def on_success(self):
+        if self.rate and self.factor < 1.0:
+            with self._lock:
+                self.factor = min(1.0, self.factor + self.recovery)
+                self._rebalance()
+
+    def on_retry(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Record a retryable failure and return how long to wait before retrying"""
+        delay = self.backoff(attempt)
+        with self._lock:
+            self.stats['retries'] += 1
+            if response is not None and response.status_code == 429:
+                self.stats['throttled'] += 1
+                delay = max(delay, retry_after_seconds(response) or 0.0)
+                self.paused_until = max(self.paused_until, time.monotonic() + delay)
+                if self.rate:
+                    self.factor = max(self.min_factor, self.factor / 2)
+                    self._rebalance()
+        return delay
+
+    def on_failure(self):
+        with self._lock:
+            self.stats['failures'] += 1
+
+
+def retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """Seconds requested by a Retry-After header (delta-seconds or HTTP date)"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
 class OpenMHZClient:
     """Fetches streams and metadata from OpenMHz API"""
 
-    BASE_URL = "https://api.openmhz.com"
+    BASE_URL = DEFAULT_BASE_URL
 
-    def __init__(self, system_id: str, verbose: bool = False):
+    def __init__(self, system_id: str, verbose: bool = False,
+                 session: Optional[requests.Session] = None,
+                 base_url: Optional[str] = None,
+                 limiter: Optional[HostLimiter] = None,
+                 scheduler: Optional[RequestScheduler] = None):
         self.system_id = system_id
         self.verbose = verbose
-        self.session = requests.Session()
-        self.session.headers.update({'User-Agent': 'Argus-Defense-SDR-Ingest/1.0'})
+        self.session = session or create_session()
+        self.base_url = (base_url or self.BASE_URL).rstrip('/')
+        self.limiter = limiter
+        self.scheduler = scheduler or RequestScheduler()
+
+    def _send(self, url: str, params: Optional[Dict], headers: Optional[Dict],
+              endpoint: str) -> requests.Response:
+        started = time.perf_counter()
+        status = 'error'
+        try:
+            if self.limiter is None:
+                response = self.session.get(url, params=params, headers=headers, timeout=10)
+            else:
+                with self.limiter.slot(url):
+                    response = self.session.get(url, params=params, headers=headers, timeout=10)
+            status = str(response.status_code)
+            return response
+        finally:
+            METRICS.observe('openmhz_api_request_seconds', time.perf_counter() - started,
+                            system=self.system_id, endpoint=endpoint)
+            METRICS.inc('openmhz_api_requests_total', system=self.system_id, endpoint=endpoint, status=status)
+
+    def _get(self, path: str, params: Optional[Dict] = None,
+             headers: Optional[Dict] = None) -> requests.Response:
+        """
+        GET a system endpoint through the scheduler
+
+        429/5xx responses, timeouts and connection errors are retried with
+        backoff. The last response is returned (or the last error raised) once
+        retries run out, so callers still see the failure.
+        """
+        url = f"{self.base_url}/{self.system_id}/{path}"
+        endpoint = path.split('/', 1)[0]
+        attempt = 0
+        while True:
+            self.scheduler.acquire(self.system_id)
+            response, error = None, None
+            try:
+                response = self._send(url, params, headers, endpoint)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            if response is not None and response.status_code not in RETRYABLE_STATUS:
+                self.scheduler.on_success()
+                return response
+            if attempt >= self.scheduler.max_retries:
+                self.scheduler.on_failure()
+                METRICS.inc('openmhz_api_failures_total', system=self.system_id, endpoint=endpoint)
+                if error is not None:
+                    raise error
+                return response
+            METRICS.inc('openmhz_api_retries_total', system=self.system_id, endpoint=endpoint)
+            delay = self.scheduler.on_retry(attempt, response)
+            if self.verbose:
+                reason = error or f"HTTP {response.status_code}"
+                print(f"Retrying {path} ({self.system_id}) in {delay:.1f}s: {reason}", file=sys.stderr)
+            time.sleep(delay)
+            attempt += 1
 
     def get_recent_calls(self, talkgroup_ids: Optional[List[int]] = None,
                         since_time: Optional[float] = None) -> List[Dict]:
-        """Fetch recent calls from the system"""
+        """
+        Fetch recent calls from the system
+
+        Raises requests.RequestException once retries are exhausted, so a
+        failed fetch is never mistaken for a quiet system.
+        """
         if since_time is None:
             since_time = time.time() - 300  # Last 5 minutes
 
-        url = f"{self.BASE_URL}/{self.system_id}/calls/newer"
-        params = {'time': str(int(since_time * 1000))}
+        calls = self.get_calls_page(int(since_time * 1000), talkgroup_ids)
+        return [c for c in calls if c.get('len', 0) > 0]  # Filter zero-length
+
+    def get_calls_page(self, since_ms: int, talkgroup_ids: Optional[List[int]] = None) -> List[Dict]:
+        """
+        Fetch one unfiltered page of calls newer than since_ms
+
+        Raises requests.RequestException on failure so callers walking pages
+        can tell an error apart from the end of the data.
+        """
+        params = {'time': str(since_ms)}
 
         if talkgroup_ids:
             params['filter-type'] = 'talkgroup'
             params['filter-code'] = ','.join(map(str, talkgroup_ids))
 
+        response = self._get('calls/newer', params)
+        response.raise_for_status()
         try:
-            response = self.session.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            calls = response.json().get('calls', [])
-            return [c for c in calls if c.get('len', 0) > 0]  # Filter zero-length
-        except requests.RequestException as e:
-            if self.verbose:
-                print(f"API Error: {e}", file=sys.stderr)
-            return []
+            return response.json().get('calls', [])
+        except ValueError as e:
+            raise requests.RequestException(f"Invalid JSON from {response.url}") from e
 
     def get_talkgroups(self) -> List[Dict]:
         """Fetch talkgroup metadata"""
+        status, talkgroups, _ = self.get_talkgroups_conditional()
+        return talkgroups if status == 200 else []
+
+    def get_talkgroups_conditional(self, etag: Optional[str] = None,
+                                   last_modified: Optional[str] = None) -> Tuple[int, Optional[List[Dict]], Dict]:
+        """
+        Fetch talkgroup metadata unless it is unchanged since etag/last_modified
+
+        Returns:
+            (status, talkgroups, validators) - status 200 with the talkgroups,
+            304 when unchanged, or 0 on failure; validators holds the response
+            ETag/Last-Modified headers
+        """
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
         try:
-            url = f"{self.BASE_URL}/{self.system_id}/talkgroups"
-            response = self.session.get(url, timeout=10)
+            response = self._get('talkgroups', headers=headers)
+            validators = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified')
+            }
+            if response.status_code == 304:
+                return 304, None, validators
             if response.status_code == 200:
                 data = response.json()
                 if isinstance(data, list):
-                    return [item for item in data if isinstance(item, dict)]
-            return []
-        except:
-            return []
+                    return 200, [item for item in data if isinstance(item, dict)], validators
+            return 0, None, validators
+        except (requests.RequestException, ValueError) as e:
+            if self.verbose:
+                print(f"API Error: {e}", file=sys.stderr)
+            return 0, None, {}
+
+
+def write_json_atomic(path: str, data) -> None:
+    """Write JSON through a unique temp file and rename it, so concurrent writers never mix their output"""
+    fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix='.tmp',
+                                    dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class TalkgroupCache:
+    """
+    Per-system talkgroup metadata cache with TTL and conditional revalidation
+
+    Entries younger than ``ttl`` are served without a request. Older entries
+    are revalidated with If-None-Match / If-Modified-Since, and a 304 only
+    refreshes the timestamp. Each entry stores the talkgroup list together
+    with its normalized lookup index, so warm runs skip both the download and
+    the rebuild. With ``cache_dir`` None the cache lives in memory only.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl: float = 3600.0):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self._memory: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, system_id: str) -> str:
+        safe_id = ''.join(c if c.isalnum() or c in '-_' else '_' for c in system_id)
+        return os.path.join(self.cache_dir, f"{safe_id}.json")
+
+    def _load(self, system_id: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._memory.get(system_id)
+        if entry is not None or not self.cache_dir or not os.path.exists(self._path(system_id)):
+            return entry
+        try:
+            with open(self._path(system_id), 'r') as f:
+                stored = json.load(f)
+            talkgroups = stored['talkgroups']
+            entry = dict(stored, fetched_at=float(stored['fetched_at']),
+                         lookup={key: talkgroups[index] for key, index in stored['lookup']})
+        except (OSError, LookupError, TypeError, ValueError):
+            return None  # Unreadable or the wrong shape: a miss, and the next fetch overwrites it
+        with self._lock:
+            self._memory[system_id] = entry
+        return entry
+
+    def _store(self, system_id: str, entry: Dict):
+        with self._lock:
+            self._memory[system_id] = entry
+        if not self.cache_dir:
+            return
+        # The lookup is saved as [key, index] pairs so integer keys survive JSON
+        positions = {id(tg): index for index, tg in enumerate(entry['talkgroups'])}
+        stored = dict(entry, lookup=[[key, positions[id(tg)]] for key, tg in entry['lookup'].items()])
+        write_json_atomic(self._path(system_id), stored)
+
+    def get(self, client: OpenMHZClient) -> Tuple[List[Dict], Dict]:
+        """Return (talkgroups, lookup) for the client's system"""
+        system_id = client.system_id
+        entry = self._load(system_id)
+        now = time.time()
+        if entry and now - entry['fetched_at'] < self.ttl:
+            return entry['talkgroups'], entry['lookup']
+
+        status, talkgroups, validators = client.get_talkgroups_conditional(
+            entry.get('etag') if entry else None,
+            entry.get('last_modified') if entry else None
+        )
+        if status == 304 and entry:
+            self._store(system_id, dict(entry, fetched_at=now))
+            return entry['talkgroups'], entry['lookup']
+        if status == 200:
+            entry = {
+                'system_id': system_id,
+                'fetched_at': now,
+                'etag': validators.get('etag'),
+                'last_modified': validators.get('last_modified'),
+                'talkgroups': talkgroups,
+                'lookup': StreamProfileGenerator.build_talkgroup_lookup(talkgroups)
+            }
+            self._store(system_id, entry)
+            return entry['talkgroups'], entry['lookup']
+
+        # Request failed - fall back to stale data rather than nothing
+        if entry:
+            return entry['talkgroups'], entry['lookup']
+        return [], {}
+
+
+def load_talkgroups(client: OpenMHZClient,
+                    cache: Optional[TalkgroupCache] = None) -> Tuple[List[Dict], Dict]:
+    """Return (talkgroups, lookup) from the cache, or fetched directly without one"""
+    with METRICS.timer('ingest_stage_seconds', stage='fetch_talkgroups'):
+        if cache is not None:
+            return cache.get(client)
+        talkgroups = client.get_talkgroups()
+        return talkgroups, StreamProfileGenerator.build_talkgroup_lookup(talkgroups)
 
 
 # ============================================================================
@@ -84,6 +471,13 @@ class WalletAssigner:
 
     def assign_wallet(self, stream_id: str, stream_name: str) -> Optional[Dict]:
         """Generate or retrieve wallet for a stream"""
+        with METRICS.timer('wallet_assign_seconds', backend='subprocess'):
+            wallet = self._run_script(stream_id, stream_name)
+        if wallet is None:
+            METRICS.inc('wallet_assign_failures_total', backend='subprocess')
+        return wallet
+
+    def _run_script(self, stream_id: str, stream_name: str) -> Optional[Dict]:
         if not os.path.exists(self.script_path):
             return None
 
@@ -112,114 +506,671 @@ class WalletAssigner:
         except:
             return None
 
+    def close(self):
+        """Nothing to release - each call runs its own subprocess"""
+
+
+class WalletWorker:
+    """
+    Assigns wallets through one long-lived Node worker process
+
+    Requests are written to the worker as newline-delimited JSON and answered
+    out of band by a reader thread, so many requests can be in flight while
+    the caller keeps generating profiles.
+    """
+
+    def __init__(self, backend_dir: str, timeout: float = 30.0,
+                 command: Optional[List[str]] = None):
+        self.backend_dir = backend_dir
+        self.timeout = timeout
+        self.script_path = os.path.join(backend_dir, "scripts", "streamWalletWorker.ts")
+        self.command = command or ["ts-node", self.script_path]
+        self.process: Optional[subprocess.Popen] = None
+        self._pending: Dict[int, Future] = {}
+        self._started: Dict[int, float] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._reader: Optional[threading.Thread] = None
+
+    def start(self) -> bool:
+        """Spawn the worker and wait for its ready line; False if it cannot start"""
+        try:
+            self.process = subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                bufsize=1,
+                cwd=self.backend_dir
+            )
+        except OSError:
+            return False
+
+        self._reader = threading.Thread(target=self._read_responses, daemon=True)
+        self._reader.start()
+        if not self._ready.wait(self.timeout) or self.process.poll() is not None:
+            self.close()
+            return False
+        return True
+
+    def _read_responses(self):
+        for line in self.process.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if message.get('ready'):
+                self._ready.set()
+                continue
+            with self._lock:
+                future = self._pending.pop(message.get('id'), None)
+                started = self._started.pop(message.get('id'), None)
+            if future:
+                if started is not None:
+                    METRICS.observe('wallet_assign_seconds', time.perf_counter() - started, backend='worker')
+                if not message.get('wallet'):
+                    METRICS.inc('wallet_assign_failures_total', backend='worker')
+                future.set_result(message.get('wallet'))
+
+        # Worker exited - fail everything still waiting
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._started.clear()
+        for future in pending.values():
+            METRICS.inc('wallet_assign_failures_total', backend='worker')
+            future.set_result(None)
+        self._ready.set()
+
+    def submit(self, stream_id: str, stream_name: str) -> Future:
+        """Queue a wallet request; the future resolves to wallet data or None"""
+        future: Future = Future()
+        with self._lock:
+            if self.process is None or self.process.poll() is not None:
+                future.set_result(None)
+                return future
+            self._next_id += 1
+            request_id = self._next_id
+            self._pending[request_id] = future
+            self._started[request_id] = time.perf_counter()
+            try:
+                self.process.stdin.write(json.dumps({
+                    'id': request_id,
+                    'streamId': stream_id,
+                    'streamName': stream_name,
+                    'mode': 'simple'
+                }) + "\n")
+                self.process.stdin.flush()
+            except (BrokenPipeError, OSError):
+                self._pending.pop(request_id, None)
+                self._started.pop(request_id, None)
+                METRICS.inc('wallet_assign_failures_total', backend='worker')
+                future.set_result(None)
+        return future
+
+    def result(self, future: Future) -> Optional[Dict]:
+        """Wait for a submitted request, returning None on timeout"""
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            METRICS.inc('wallet_assign_failures_total', backend='worker')
+            return None
+
+    def assign_wallet(self, stream_id: str, stream_name: str) -> Optional[Dict]:
+        """Generate or retrieve wallet for a stream"""
+        return self.result(self.submit(stream_id, stream_name))
+
+    def close(self):
+        """Stop the worker process"""
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+        self.process = None
+
+
+class WalletCache:
+    """
+    On-disk (sqlite) cache of wallet assignments
+
+    Successful assignments are kept indefinitely; failures are remembered for
+    ``failure_ttl`` seconds so a broken stream is not retried on every call.
+    """
+
+    def __init__(self, path: str, failure_ttl: float = 300.0):
+        self.path = path
+        self.failure_ttl = failure_ttl
+        # Callers serialize access; the resident service uses it from handler threads
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS wallets ("
+            " key TEXT PRIMARY KEY,"
+            " wallet TEXT,"
+            " updated_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def get(self, key: str) -> Tuple[bool, Optional[Dict]]:
+        """Return (hit, wallet); a hit with wallet None is a cached failure"""
+        row = self.conn.execute("SELECT wallet, updated_at FROM wallets WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return False, None
+        wallet, updated_at = row
+        if wallet is not None:
+            return True, json.loads(wallet)
+        if time.time() - updated_at < self.failure_ttl:
+            return True, None
+        return False, None
+
+    def put(self, key: str, wallet: Optional[Dict]):
+        """Store a wallet, or a failure when wallet is None"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO wallets (key, wallet, updated_at) VALUES (?, ?, ?)",
+            (key, json.dumps(wallet) if wallet else None, time.time())
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class CachedWalletAssigner:
+    """
+    Wallet assigner that consults a WalletCache before the real assigner
+
+    With ``granularity='talkgroup'`` every call on a talkgroup shares one
+    wallet keyed ``{system}-{talkgroup}``; with ``'call'`` each stream ID gets
+    its own. The real assigner is only created on the first cache miss, so a
+    fully cached run never starts a subprocess.
+    """
+
+    GRANULARITIES = ('talkgroup', 'call')
+
+    def __init__(self, cache: WalletCache, assigner_factory, granularity: str = 'talkgroup'):
+        if granularity not in self.GRANULARITIES:
+            raise ValueError(f"granularity must be one of {self.GRANULARITIES}")
+        self.cache = cache
+        self.assigner_factory = assigner_factory
+        self.granularity = granularity
+        self.assigner = None
+        self._inflight: Dict[str, Future] = {}
+        self._future_keys: Dict[Future, str] = {}
+        self._readers: Dict[Future, int] = {}  # Callers holding an in-flight future that have not read it yet
+        self._resolved: Dict[Future, Optional[Dict]] = {}  # Outcomes kept until every such caller has read them
+
+    def cache_key(self, stream_id: str) -> str:
+        """Map a stream ID ({system}-{talkgroup}-{call _id}) to its cache key"""
+        if self.granularity == 'talkgroup':
+            return stream_id.rsplit('-', 1)[0]
+        return stream_id
+
+    def submit(self, stream_id: str, stream_name: str) -> Future:
+        """Queue a wallet request, answering from the cache when possible"""
+        key = self.cache_key(stream_id)
+        if key in self._inflight:
+            future = self._inflight[key]
+            self._readers[future] += 1
+            return future
+
+        hit, wallet = self.cache.get(key)
+        METRICS.inc('wallet_cache_lookups_total', result='hit' if hit else 'miss')
+        future: Future
+        if hit:
+            future = Future()
+            future.set_result(wallet)
+            return future
+
+        if self.assigner is None:
+            self.assigner = self.assigner_factory()
+        if hasattr(self.assigner, 'submit'):
+            future = self.assigner.submit(key, stream_name)
+        else:
+            future = Future()
+            future.set_result(self.assigner.assign_wallet(key, stream_name))
+
+        self._inflight[key] = future
+        self._future_keys[future] = key
+        self._readers[future] = 1
+        return future
+
+    def result(self, future: Future) -> Optional[Dict]:
+        """Wait for a submitted request and record the outcome in the cache"""
+        if future in self._resolved:
+            return self._read(future)
+        key = self._future_keys.pop(future, None)
+        if key is None:
+            return future.result()  # Answered from the cache
+
+        if hasattr(self.assigner, 'result'):
+            wallet = self.assigner.result(future)
+        else:
+            wallet = future.result()
+        self.cache.put(key, wallet)
+        self._inflight.pop(key, None)
+        self._resolved[future] = wallet
+        return self._read(future)
+
+    def _read(self, future: Future) -> Optional[Dict]:
+        """Hand out a resolved outcome, forgetting it once the last caller sharing the future has it"""
+        wallet = self._resolved[future]
+        self._readers[future] -= 1
+        if self._readers[future] <= 0:
+            del self._readers[future]
+            del self._resolved[future]
+        return wallet
+
+    def assign_wallet(self, stream_id: str, stream_name: str) -> Optional[Dict]:
+        """Generate or retrieve wallet for a stream"""
+        return self.result(self.submit(stream_id, stream_name))
+
+    def close(self):
+        if self.assigner:
+            self.assigner.close()
+        self.cache.close()
+
 
 # ============================================================================
 # Stream Profile Generation
 # ============================================================================
 
-class StreamProfileGenerator:
-    """Generates stream profiles with metadata and wallet info"""
+def format_call_time(time_ms: int) -> str:
+    """Format epoch milliseconds the way OpenMHz does (ISO 8601, UTC, milliseconds)"""
+    seconds, millis = divmod(time_ms, 1000)
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S") + f".{millis:03d}Z"
 
-    @staticmethod
-    def generate_profile(call: Dict, system_id: str, talkgroup_info: Optional[Dict] = None,
-                        wallet_data: Optional[Dict] = None) -> Dict:
-        """Create a stream profile from call data"""
-        talkgroup_num = call.get('talkgroupNum', 'unknown')
 
-        # Build name from talkgroup info
-        if talkgroup_info:
-            name = talkgroup_info.get('description') or talkgroup_info.get('alpha') or f"Talkgroup {talkgroup_num}"
-        else:
-            name = f"Talkgroup {talkgroup_num}"
+class CallRecord:
+    """
+    Compact in-memory form of one call and, once built, its stream profile
 
-        # Build description
-        duration = call.get('len', 0)
-        num_radios = len(call.get('srcList', []))
-        time_str = call.get('time', '')
+    Holds only the fields a profile needs: epoch-millisecond time, interned
+    system ID, and a shared reference to the talkgroup metadata. Sorting and
+    filtering use ``time_ms``; profile dicts are built by ``to_profile`` only
+    when serializing.
+    """
 
+    __slots__ = ('call_id', 'system_id', 'talkgroup_num', 'time_ms', 'time_text',
+                 'duration', 'num_radios', 'url', 'talkgroup_info', 'wallet', 'audio_path')
+
+    def __init__(self, call_id: str, system_id: str, talkgroup_num, time_ms: int,
+                 duration=0, num_radios: int = 0, url: str = '',
+                 talkgroup_info: Optional[Dict] = None, time_text: Optional[str] = None):
+        self.call_id = call_id
+        self.system_id = sys.intern(system_id)
+        self.talkgroup_num = talkgroup_num
+        self.time_ms = time_ms
+        # Original time string, kept only when format_call_time cannot reproduce it
+        self.time_text = time_text
+        self.duration = duration
+        self.num_radios = num_radios
+        self.url = url
+        self.talkgroup_info = talkgroup_info
+        self.wallet: Optional[Dict] = None
+        self.audio_path: Optional[str] = None
+
+    @classmethod
+    def from_call(cls, call: Dict, system_id: str, talkgroup_info: Optional[Dict] = None) -> 'CallRecord':
+        """Build a record from an OpenMHz API call dict"""
+        time_str = call.get('time', '')
+        time_text = None
+        try:
+            time_ms = call_time_ms(time_str)
+            if len(time_str) != 24:  # Anything but "YYYY-MM-DDTHH:MM:SS.mmmZ"
+                time_text = time_str
+        except ValueError:
+            time_ms, time_text = 0, time_str
+        return cls(call.get('_id', ''), system_id, call.get('talkgroupNum', 'unknown'), time_ms,
+                   call.get('len', 0), len(call.get('srcList', [])), call.get('url', ''),
+                   talkgroup_info, time_text)
+
+    def copy(self) -> 'CallRecord':
+        """Shallow copy, so a shared (cached) record is never annotated in place"""
+        record = CallRecord.__new__(CallRecord)
+        for name in self.__slots__:
+            setattr(record, name, getattr(self, name))
+        return record
+
+    @property
+    def timestamp(self) -> str:
+        return self.time_text if self.time_text is not None else format_call_time(self.time_ms)
+
+    @property
+    def stream_id(self) -> str:
+        return f"{self.system_id}-{self.talkgroup_num}-{self.call_id}"
+
+    @property
+    def name(self) -> str:
+        if self.talkgroup_info:
+            return (self.talkgroup_info.get('description') or self.talkgroup_info.get('alpha')
+                    or f"Talkgroup {self.talkgroup_num}")
+        return f"Talkgroup {self.talkgroup_num}"
+
+    def to_profile(self, stream_id: Optional[str] = None) -> Dict:
+        """Build the stream profile dict (the registry / JSON output shape)"""
         desc_parts = [
-            f"System: {system_id}",
-            f"Duration: {duration}s",
-            f"Radios: {num_radios}"
+            f"System: {self.system_id}",
+            f"Duration: {self.duration}s",
+            f"Radios: {self.num_radios}"
         ]
-        if talkgroup_info and 'tag' in talkgroup_info:
-            desc_parts.insert(1, f"Category: {talkgroup_info['tag']}")
-
-        stream_id = f"{system_id}-{talkgroup_num}-{call.get('_id', '')}"
+        if self.talkgroup_info and 'tag' in self.talkgroup_info:
+            desc_parts.insert(1, f"Category: {self.talkgroup_info['tag']}")
 
         profile = {
-            'stream_id': stream_id,
-            'name': name,
+            'stream_id': stream_id or self.stream_id,
+            'name': self.name,
             'description': " | ".join(desc_parts),
-            'audio_url': call.get('url', ''),
-            'system_name': system_id,
-            'talkgroup_id': talkgroup_num,
-            'timestamp': time_str,
-            'duration': duration,
+            'audio_url': self.url,
+            'system_name': self.system_id,
+            'talkgroup_id': self.talkgroup_num,
+            'timestamp': self.timestamp,
+            'duration': self.duration,
             'metadata': {
-                'call_id': call.get('_id', ''),
-                'talkgroup_info': talkgroup_info
+                'call_id': self.call_id,
+                'talkgroup_info': self.talkgroup_info
             }
         }
 
-        # Add wallet if provided
-        if wallet_data:
-            profile['wallet'] = {
-                'address': wallet_data.get('walletAddress'),
-                'mode': wallet_data.get('mode', 'simple'),
-                'created_at': wallet_data.get('createdAt')
-            }
+        if self.wallet:
+            profile['wallet'] = self.wallet
+        if self.audio_path:
+            profile['audio_path'] = self.audio_path
 
         return profile
 
+
+def to_call_records(calls: Iterable, system_id: str) -> List[CallRecord]:
+    """Convert API call dicts (records pass through) so the raw dicts can be freed"""
+    return [c if isinstance(c, CallRecord) else CallRecord.from_call(c, system_id) for c in calls]
+
+
+class StreamProfileGenerator:
+    """Generates stream profiles with metadata and wallet info"""
+
+    @staticmethod
+    def generate_profile(call: Dict, system_id: str, talkgroup_info: Optional[Dict] = None,
+                        wallet_data: Optional[Dict] = None) -> Dict:
+        """Create a stream profile from call data"""
+        record = CallRecord.from_call(call, system_id, talkgroup_info)
+        if wallet_data:
+            record.wallet = StreamProfileGenerator.wallet_summary(wallet_data)
+        return record.to_profile()
+
     @staticmethod
-    def generate_system_profile(system_id: str, talkgroups: List[Dict], calls: List[Dict],
-                                wallet_assigner: Optional[WalletAssigner] = None) -> Dict:
-        """Generate complete system profile with all streams"""
-        # Build talkgroup lookup
+    def wallet_summary(wallet_data: Dict) -> Dict:
+        """Reduce wallet script output to the fields stored on a profile"""
+        return {
+            'address': wallet_data.get('walletAddress'),
+            'mode': wallet_data.get('mode', 'simple'),
+            'created_at': wallet_data.get('createdAt')
+        }
+
+    @staticmethod
+    def build_talkgroup_lookup(talkgroups: List[Dict]) -> Dict:
+        """Index talkgroup metadata by talkgroup number"""
         tg_lookup = {}
         for tg in talkgroups:
             if isinstance(tg, dict):
                 tg_id = tg.get('num') or tg.get('decimal') or tg.get('id')
                 if tg_id:
                     tg_lookup[tg_id] = tg
+        return tg_lookup
+
+    @staticmethod
+    def iter_records(system_id: str, talkgroups: List[Dict], calls: Iterable,
+                     wallet_assigner=None, window: int = 64,
+                     tg_lookup: Optional[Dict] = None,
+                     audio_prefetcher: Optional[AudioPrefetcher] = None) -> Iterator[CallRecord]:
+        """
+        Yield one CallRecord per call (dicts or records), in call order, with
+        talkgroup info, wallet and local audio path attached
+
+        ``wallet_assigner`` may be any object with ``assign_wallet``. Assigners
+        that also offer ``submit``/``result`` (WalletWorker, CachedWalletAssigner)
+        keep up to ``window`` wallet requests in flight while later records
+        are built, so wallet generation runs in a pipeline alongside profile
+        generation without holding every profile in memory. An
+        ``audio_prefetcher`` downloads call audio through the same window and
+        sets ``audio_path`` (left unset if the download fails).
+
+        A prebuilt ``tg_lookup`` (see TalkgroupCache) skips rebuilding the
+        talkgroup index from ``talkgroups``.
+        """
+        if tg_lookup is None:
+            tg_lookup = StreamProfileGenerator.build_talkgroup_lookup(talkgroups)
+
+        pending: Deque[Tuple[CallRecord, Optional[Future], Optional[Future]]] = deque()
+        pipelined = hasattr(wallet_assigner, 'submit')
+
+        def finish(record: CallRecord, wallet_future: Optional[Future],
+                   audio_future: Optional[Future]) -> CallRecord:
+            if wallet_future is not None:
+                wallet_data = wallet_assigner.result(wallet_future)
+                if wallet_data:
+                    record.wallet = StreamProfileGenerator.wallet_summary(wallet_data)
+            if audio_future is not None:
+                record.audio_path = audio_future.result()
+            return record
 
-        # Generate stream profiles
-        streams = []
         for call in calls:
-            talkgroup_num = call.get('talkgroupNum')
-            tg_info = tg_lookup.get(talkgroup_num)
+            record = call if isinstance(call, CallRecord) else CallRecord.from_call(call, system_id)
+            record.talkgroup_info = tg_lookup.get(record.talkgroup_num)
+            METRICS.inc('ingest_streams_total', system=system_id)
+            audio_future = audio_prefetcher.submit(record.call_id, record.url) if audio_prefetcher else None
 
             # Assign wallet if requested
-            wallet_data = None
+            wallet_future = None
             if wallet_assigner:
-                stream_id = f"{system_id}-{talkgroup_num}-{call.get('_id', '')}"
-                stream_name = tg_info.get('description') if tg_info else f"Talkgroup {talkgroup_num}"
-                wallet_data = wallet_assigner.assign_wallet(stream_id, stream_name)
+                stream_name = record.talkgroup_info.get('description') if record.talkgroup_info \
+                    else f"Talkgroup {record.talkgroup_num}"
+                if pipelined:
+                    wallet_future = wallet_assigner.submit(record.stream_id, stream_name)
+                else:
+                    wallet_data = wallet_assigner.assign_wallet(record.stream_id, stream_name)
+                    if wallet_data:
+                        record.wallet = StreamProfileGenerator.wallet_summary(wallet_data)
+
+            if wallet_future is None and audio_future is None:
+                yield record
+                continue
+            pending.append((record, wallet_future, audio_future))
+            if len(pending) >= window:
+                yield finish(*pending.popleft())
+
+        # Drain pipelined wallet and audio results
+        while pending:
+            yield finish(*pending.popleft())
 
-            profile = StreamProfileGenerator.generate_profile(
-                call, system_id, tg_info, wallet_data
-            )
-            streams.append(profile)
+    @staticmethod
+    def iter_profiles(system_id: str, talkgroups: List[Dict], calls: Iterable,
+                      wallet_assigner=None, window: int = 64,
+                      tg_lookup: Optional[Dict] = None,
+                      audio_prefetcher: Optional[AudioPrefetcher] = None) -> Iterator[Dict]:
+        """Yield one stream profile dict per call as soon as it is ready (see iter_records)"""
+        records = StreamProfileGenerator.iter_records(
+            system_id, talkgroups, calls, wallet_assigner, window, tg_lookup, audio_prefetcher
+        )
+        profiles = (record.to_profile() for record in records)
+        return METRICS.time_iter(profiles, 'ingest_stage_seconds', stage='profiles')
 
-        # Sort by timestamp (newest first)
-        streams.sort(key=lambda x: x['timestamp'], reverse=True)
+    @staticmethod
+    def generate_system_profile(system_id: str, talkgroups: List[Dict], calls: Iterable,
+                                wallet_assigner=None, tg_lookup: Optional[Dict] = None,
+                                audio_prefetcher: Optional[AudioPrefetcher] = None) -> Dict:
+        """Generate complete system profile with all streams (see iter_records)"""
+        with METRICS.timer('ingest_stage_seconds', stage='profiles'):
+            records = list(StreamProfileGenerator.iter_records(
+                system_id, talkgroups, calls, wallet_assigner, tg_lookup=tg_lookup,
+                audio_prefetcher=audio_prefetcher
+            ))
+
+            # Sort by call time (newest first), then build the dicts
+            records.sort(key=lambda r: r.time_ms, reverse=True)
+
+            return {
+                'system_id': system_id,
+                'total_streams': len(records),
+                'streams': [record.to_profile() for record in records],
+                'generated_at': datetime.utcnow().isoformat() + 'Z'
+            }
 
-        return {
-            'system_id': system_id,
-            'total_streams': len(streams),
-            'streams': streams,
-            'generated_at': datetime.utcnow().isoformat() + 'Z'
-        }
+
+# ============================================================================
+# Incremental Polling (high-water marks)
+# ============================================================================
+
+def parse_call_time(time_str: str) -> float:
+    """Convert an OpenMHz call timestamp (ISO 8601, UTC) to epoch seconds"""
+    fmt = "%Y-%m-%dT%H:%M:%S.%fZ" if '.' in time_str else "%Y-%m-%dT%H:%M:%SZ"
+    return datetime.strptime(time_str, fmt).replace(tzinfo=timezone.utc).timestamp()
+
+
+def call_time_ms(time_str: str) -> int:
+    """OpenMHz call timestamp to epoch milliseconds, rounded (float seconds can land just below the millisecond)"""
+    return int(round(parse_call_time(time_str) * 1000))
+
+
+class Watermark:
+    """Per-system cursor: newest call time seen plus the call IDs at that time"""
+
+    def __init__(self, time_ms: int = 0, seen_ids: Optional[List[str]] = None):
+        self.time_ms = time_ms
+        self.seen_ids = set(seen_ids or [])
+
+    def filter_new(self, calls: List[Dict]) -> List[Dict]:
+        """Return calls not yet seen and advance the watermark past them"""
+        new_calls = []
+        for call in calls:
+            call_id = call.get('_id', '')
+            try:
+                call_ms = call_time_ms(call.get('time', ''))
+            except ValueError:
+                continue
+
+            if call_ms < self.time_ms or (call_ms == self.time_ms and call_id in self.seen_ids):
+                continue
+            new_calls.append(call)
+
+            if call_ms > self.time_ms:
+                self.time_ms = call_ms
+                self.seen_ids = {call_id}
+            else:
+                self.seen_ids.add(call_id)
+        return new_calls
+
+    def to_dict(self) -> Dict:
+        return {'time': self.time_ms, 'ids': sorted(self.seen_ids)}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Watermark':
+        return cls(int(data.get('time', 0)), data.get('ids', []))
+
+
+class WatermarkStore:
+    """Persists watermarks for all followed systems in one JSON state file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.watermarks: Dict[str, Watermark] = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.watermarks = {sid: Watermark.from_dict(wm) for sid, wm in json.load(f).items()}
+
+    def get(self, system_id: str, default_since: float) -> Watermark:
+        """Return the system's watermark, starting at default_since if new"""
+        if system_id not in self.watermarks:
+            self.watermarks[system_id] = Watermark(int(default_since * 1000))
+        return self.watermarks[system_id]
+
+    def save(self):
+        """Atomically write all watermarks to disk"""
+        write_json_atomic(self.path, {sid: wm.to_dict() for sid, wm in self.watermarks.items()})
 
 
 # ============================================================================
 # Main Ingestion Function
 # ============================================================================
 
+DEFAULT_TALKGROUP_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'talkgroup_cache')
+
+
+def _create_talkgroup_cache(talkgroup_cache: Optional[str], talkgroup_ttl: float) -> Optional[TalkgroupCache]:
+    """Create the on-disk talkgroup cache, or None when disabled"""
+    return TalkgroupCache(talkgroup_cache, talkgroup_ttl) if talkgroup_cache else None
+
+
+DEFAULT_WALLET_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'wallet_cache.db')
+
+
+def _start_wallet_backend():
+    """
+    Create a wallet assigner rooted at the Backend directory
+
+    Prefers the persistent WalletWorker and falls back to one ts-node
+    subprocess per call when the worker cannot be started.
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    backend_dir = os.path.dirname(script_dir)
+    worker = WalletWorker(backend_dir)
+    if worker.start():
+        return worker
+    print("Wallet worker unavailable, using per-call subprocesses", file=sys.stderr)
+    return WalletAssigner(backend_dir)
+
+
+def _create_wallet_assigner(wallet_cache: Optional[str] = DEFAULT_WALLET_CACHE,
+                            wallet_key: str = 'talkgroup'):
+    """Create the wallet assigner, fronted by the on-disk cache unless disabled"""
+    if not wallet_cache:
+        return _start_wallet_backend()
+    return CachedWalletAssigner(WalletCache(wallet_cache), _start_wallet_backend, wallet_key)
+
+
+def _create_audio_prefetcher(audio_cache: Optional[str], audio_cache_mb: float = DEFAULT_AUDIO_CACHE_MB,
+                             max_workers: int = 4, verbose: bool = False) -> Optional[AudioPrefetcher]:
+    """Create the audio prefetch stage, or None when ``audio_cache`` is unset"""
+    if not audio_cache:
+        return None
+    return AudioPrefetcher(AudioCache(audio_cache, int(audio_cache_mb * 2**20)), max_workers, verbose=verbose)
+
+
+def upsert_profile(store: RegistryStore, profile: Dict):
+    """Write a (partial) system profile to the store, timing the write"""
+    with METRICS.timer('ingest_stage_seconds', stage='registry_write'):
+        store.upsert_profile(profile)
+
+
+def save_to_registry(profiles: Dict[str, Dict], registry_db: str = DEFAULT_REGISTRY_DB,
+                     export_registry: Optional[str] = None) -> str:
+    """
+    Upsert system profiles into the registry store and return its path
+
+    Only the given streams are written. With ``export_registry`` the store is
+    also exported to that path in the legacy streams.json shape.
+    """
+    with open_registry(registry_db) as store:
+        for profile in profiles.values():
+            upsert_profile(store, profile)
+        if export_registry:
+            print(f"Exported to: {store.export_json(export_registry)}", file=sys.stderr)
+    return registry_db
+
+
 def ingest_system(system_id: str, talkgroup_ids: Optional[List[int]] = None,
                  assign_wallets: bool = False, save_registry: bool = False,
-                 verbose: bool = False) -> Dict:
+                 verbose: bool = False, base_url: Optional[str] = None,
+                 wallet_cache: Optional[str] = DEFAULT_WALLET_CACHE,
+                 wallet_key: str = 'talkgroup',
+                 registry_db: str = DEFAULT_REGISTRY_DB,
+                 export_registry: Optional[str] = None,
+                 talkgroup_cache: Optional[str] = DEFAULT_TALKGROUP_CACHE,
+                 talkgroup_ttl: float = 3600.0,
+                 rate: Optional[float] = None,
+                 audio_cache: Optional[str] = None,
+                 audio_cache_mb: float = DEFAULT_AUDIO_CACHE_MB) -> Dict:
     """
     Main ingestion function
 
@@ -227,60 +1178,905 @@ def ingest_system(system_id: str, talkgroup_ids: Optional[List[int]] = None,
         system_id: OpenMHz system ID (e.g., 'rhode-island')
         talkgroup_ids: Optional list of specific talkgroups
         assign_wallets: Whether to assign blockchain wallets
-        save_registry: Whether to save to streams.json
+        save_registry: Whether to upsert streams into the registry store
         verbose: Enable debug output
+        base_url: Optional OpenMHz API base URL override
+        wallet_cache: Wallet cache database path (None disables caching)
+        wallet_key: Wallet cache granularity, 'talkgroup' or 'call'
+        registry_db: Registry store database path
+        export_registry: Also export the registry to this streams.json path
+        talkgroup_cache: Talkgroup cache directory (None disables the on-disk cache)
+        talkgroup_ttl: Seconds before cached talkgroups are revalidated
+        rate: Request budget in requests/second (None for no budget)
+        audio_cache: Prefetch call audio into this directory (None to skip)
+        audio_cache_mb: Size budget of the audio cache
 
     Returns:
-        Dictionary with system profile and streams
+        Dictionary with system profile and streams; if the calls could not be
+        fetched it has no streams and an 'error' message
     """
     print(f"Ingesting: {system_id}", file=sys.stderr)
 
     # Fetch data from OpenMHz
-    client = OpenMHZClient(system_id, verbose)
-    talkgroups = client.get_talkgroups()
-    calls = client.get_recent_calls(talkgroup_ids)
+    client = OpenMHZClient(system_id, verbose, base_url=base_url, scheduler=RequestScheduler(rate))
+    talkgroups, tg_lookup = load_talkgroups(client, _create_talkgroup_cache(talkgroup_cache, talkgroup_ttl))
+    calls, error = fetch_calls(client, talkgroup_ids)
 
-    print(f"Found: {len(calls)} calls", file=sys.stderr)
+    if error:
+        print(f"Failed: {error}", file=sys.stderr)
+    else:
+        print(f"Found: {len(calls)} calls", file=sys.stderr)
 
     # Initialize wallet assigner if requested
     wallet_assigner = None
     if assign_wallets:
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        backend_dir = os.path.dirname(script_dir)
-        wallet_assigner = WalletAssigner(backend_dir)
+        wallet_assigner = _create_wallet_assigner(wallet_cache, wallet_key)
         print(f"Wallet assignment enabled", file=sys.stderr)
+    audio_prefetcher = _create_audio_prefetcher(audio_cache, audio_cache_mb, verbose=verbose)
 
     # Generate profiles
-    profile = StreamProfileGenerator.generate_system_profile(
-        system_id, talkgroups, calls, wallet_assigner
-    )
+    try:
+        profile = StreamProfileGenerator.generate_system_profile(
+            system_id, talkgroups, calls, wallet_assigner, tg_lookup, audio_prefetcher
+        )
+    finally:
+        if wallet_assigner:
+            wallet_assigner.close()
+        if audio_prefetcher:
+            audio_prefetcher.close()
+    if error:
+        profile['error'] = error
+
+    # Save to registry if requested (a failed fetch has nothing to save)
+    if save_registry and not error:
+        registry_file = save_to_registry({system_id: profile}, registry_db, export_registry)
+        print(f"Saved to: {registry_file}", file=sys.stderr)
+
+    return profile
+
+
+def fetch_calls(client: OpenMHZClient, talkgroup_ids: Optional[List[int]] = None,
+                since_time: Optional[float] = None) -> Tuple[List[Dict], Optional[str]]:
+    """Fetch recent calls, returning (calls, None) or ([], error message) on failure"""
+    try:
+        with METRICS.timer('ingest_stage_seconds', stage='fetch_calls'):
+            return client.get_recent_calls(talkgroup_ids, since_time), None
+    except requests.RequestException as e:
+        if client.verbose:
+            print(f"API Error: {e}", file=sys.stderr)
+        return [], str(e) or e.__class__.__name__
+
+
+def fetch_systems(system_ids: List[str], talkgroup_ids: Optional[List[int]] = None,
+                  verbose: bool = False, base_url: Optional[str] = None,
+                  max_workers: int = 8, per_host: int = 4,
+                  talkgroup_cache: Optional[str] = DEFAULT_TALKGROUP_CACHE,
+                  talkgroup_ttl: float = 3600.0,
+                  rate: Optional[float] = None) -> Dict[str, Tuple[List[Dict], List[Dict], Dict, Optional[str]]]:
+    """
+    Fetch (talkgroups, calls, talkgroup lookup, error) for every system concurrently
+
+    Requests are issued from a bounded thread pool over one shared session,
+    with at most ``per_host`` requests in flight per API host and ``rate``
+    requests/second split across the systems. Talkgroups come from the
+    talkgroup cache when it is fresh. ``error`` is None unless the calls could
+    not be fetched.
+    """
+    cache = _create_talkgroup_cache(talkgroup_cache, talkgroup_ttl)
+    session = create_session(pool_size=max(max_workers, per_host))
+    limiter = HostLimiter(per_host)
+    scheduler = RequestScheduler(rate)
+    scheduler.register(system_ids)
+    clients = {
+        sid: OpenMHZClient(sid, verbose, session=session, base_url=base_url,
+                           limiter=limiter, scheduler=scheduler)
+        for sid in system_ids
+    }
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            talkgroup_futures = {sid: pool.submit(load_talkgroups, c, cache) for sid, c in clients.items()}
+            call_futures = {sid: pool.submit(fetch_calls, c, talkgroup_ids) for sid, c in clients.items()}
+            fetched = {}
+            for sid in system_ids:
+                talkgroups, tg_lookup = talkgroup_futures[sid].result()
+                calls, error = call_futures[sid].result()
+                fetched[sid] = (talkgroups, to_call_records(calls, sid), tg_lookup, error)
+            return fetched
+    finally:
+        session.close()
+
+
+def stream_systems(system_ids: List[str], out: TextIO, talkgroup_ids: Optional[List[int]] = None,
+                   assign_wallets: bool = False, save_registry: bool = False,
+                   verbose: bool = False, base_url: Optional[str] = None,
+                   max_workers: int = 8, per_host: int = 4,
+                   wallet_cache: Optional[str] = DEFAULT_WALLET_CACHE,
+                   wallet_key: str = 'talkgroup',
+                   registry_db: str = DEFAULT_REGISTRY_DB,
+                   export_registry: Optional[str] = None,
+                   talkgroup_cache: Optional[str] = DEFAULT_TALKGROUP_CACHE,
+                   talkgroup_ttl: float = 3600.0,
+                   batch_size: int = 500,
+                   rate: Optional[float] = None,
+                   audio_cache: Optional[str] = None,
+                   audio_cache_mb: float = DEFAULT_AUDIO_CACHE_MB) -> Dict:
+    """
+    Ingest systems and write NDJSON: one compact line per stream, then a summary
 
-    # Save to registry if requested
-    if save_registry:
-        registry_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'streams.json')
+    Profiles are written as soon as they are built and are not kept, so memory
+    does not grow with the number of streams. Registry saves are upserted in
+    batches of ``batch_size`` streams. The final line is
+    ``{"type": "summary", ...}`` with per-system and overall totals, and an
+    ``errors`` map for systems whose calls could not be fetched.
 
-        # Load existing registry
-        registry = {}
-        if os.path.exists(registry_file):
-            with open(registry_file, 'r') as f:
-                registry = json.load(f)
+    Returns:
+        The summary record
+    """
+    system_ids = list(dict.fromkeys(system_ids))
+    fetched = fetch_systems(system_ids, talkgroup_ids, verbose, base_url, max_workers, per_host,
+                            talkgroup_cache, talkgroup_ttl, rate)
+    wallet_assigner = _create_wallet_assigner(wallet_cache, wallet_key) if assign_wallets else None
+    audio_prefetcher = _create_audio_prefetcher(audio_cache, audio_cache_mb, max_workers, verbose)
+    store = open_registry(registry_db) if save_registry else None
+
+    totals: Dict[str, int] = {}
+    errors: Dict[str, str] = {}
+    try:
+        for sid in system_ids:
+            talkgroups, calls, tg_lookup, error = fetched.pop(sid)
+            if error:
+                print(f"Failed: {error} ({sid})", file=sys.stderr)
+                errors[sid] = error
+                totals[sid] = 0
+                continue
+            print(f"Found: {len(calls)} calls ({sid})", file=sys.stderr)
+            generated_at = datetime.utcnow().isoformat() + 'Z'
+            totals[sid] = 0
+            batch = []
+            profiles = StreamProfileGenerator.iter_profiles(
+                sid, talkgroups, calls, wallet_assigner, tg_lookup=tg_lookup,
+                audio_prefetcher=audio_prefetcher
+            )
+            for profile in profiles:
+                out.write(json.dumps(profile, separators=(',', ':')) + "\n")
+                out.flush()
+                totals[sid] += 1
+                if store:
+                    batch.append(profile)
+                    if len(batch) >= batch_size:
+                        upsert_profile(store, {'system_id': sid, 'streams': batch, 'generated_at': generated_at})
+                        batch = []
+            if store and (batch or not totals[sid]):
+                upsert_profile(store, {'system_id': sid, 'streams': batch, 'generated_at': generated_at})
+
+        if store and export_registry:
+            print(f"Exported to: {store.export_json(export_registry)}", file=sys.stderr)
+    finally:
+        if wallet_assigner:
+            wallet_assigner.close()
+        if audio_prefetcher:
+            audio_prefetcher.close()
+        if store:
+            store.close()
+
+    summary = {
+        'type': 'summary',
+        'total_systems': len(totals),
+        'total_streams': sum(totals.values()),
+        'systems': totals,
+        'errors': errors,
+        'generated_at': datetime.utcnow().isoformat() + 'Z'
+    }
+    out.write(json.dumps(summary, separators=(',', ':')) + "\n")
+    out.flush()
+    return summary
+
+
+def ingest_systems(system_ids: List[str], talkgroup_ids: Optional[List[int]] = None,
+                   assign_wallets: bool = False, save_registry: bool = False,
+                   verbose: bool = False, base_url: Optional[str] = None,
+                   max_workers: int = 8, per_host: int = 4,
+                   wallet_cache: Optional[str] = DEFAULT_WALLET_CACHE,
+                   wallet_key: str = 'talkgroup',
+                   registry_db: str = DEFAULT_REGISTRY_DB,
+                   export_registry: Optional[str] = None,
+                   talkgroup_cache: Optional[str] = DEFAULT_TALKGROUP_CACHE,
+                   talkgroup_ttl: float = 3600.0,
+                   rate: Optional[float] = None,
+                   audio_cache: Optional[str] = None,
+                   audio_cache_mb: float = DEFAULT_AUDIO_CACHE_MB) -> Dict:
+    """
+    Ingest many systems concurrently over a shared connection pool
+
+    Talkgroup and call requests for every system are issued from a bounded
+    thread pool, with at most ``per_host`` requests in flight per API host.
+    Profiles are then generated and written to the registry in one pass.
+
+    Args:
+        system_ids: OpenMHz system IDs
+        talkgroup_ids: Optional list of specific talkgroups (applied to every system)
+        assign_wallets: Whether to assign blockchain wallets
+        save_registry: Whether to upsert streams into the registry store
+        verbose: Enable debug output
+        base_url: Optional OpenMHz API base URL override
+        max_workers: Size of the fetch thread pool
+        per_host: Maximum concurrent requests per API host
+        wallet_cache: Wallet cache database path (None disables caching)
+        wallet_key: Wallet cache granularity, 'talkgroup' or 'call'
+        registry_db: Registry store database path
+        export_registry: Also export the registry to this streams.json path
+        talkgroup_cache: Talkgroup cache directory (None disables the on-disk cache)
+        talkgroup_ttl: Seconds before cached talkgroups are revalidated
+        rate: Request budget in requests/second, split across systems (None for no budget)
+        audio_cache: Prefetch call audio into this directory (None to skip)
+        audio_cache_mb: Size budget of the audio cache
 
-        # Update and save
-        registry[system_id] = profile
-        registry['last_updated'] = datetime.utcnow().isoformat() + 'Z'
+    Returns:
+        Combined dictionary with one profile per system; systems whose calls
+        could not be fetched are listed in 'errors' and left out of the registry
+    """
+    system_ids = list(dict.fromkeys(system_ids))  # De-duplicate, keep order
+    print(f"Ingesting {len(system_ids)} systems", file=sys.stderr)
+    fetched = fetch_systems(system_ids, talkgroup_ids, verbose, base_url, max_workers, per_host,
+                            talkgroup_cache, talkgroup_ttl, rate)
 
-        with open(registry_file, 'w') as f:
-            json.dump(registry, f, indent=2)
+    wallet_assigner = _create_wallet_assigner(wallet_cache, wallet_key) if assign_wallets else None
+    audio_prefetcher = _create_audio_prefetcher(audio_cache, audio_cache_mb, max_workers, verbose)
 
+    profiles = {}
+    errors = {}
+    try:
+        for sid in system_ids:
+            talkgroups, calls, tg_lookup, error = fetched[sid]
+            if error:
+                print(f"Failed: {error} ({sid})", file=sys.stderr)
+                errors[sid] = error
+                continue
+            print(f"Found: {len(calls)} calls ({sid})", file=sys.stderr)
+            profiles[sid] = StreamProfileGenerator.generate_system_profile(
+                sid, talkgroups, calls, wallet_assigner, tg_lookup, audio_prefetcher
+            )
+    finally:
+        if wallet_assigner:
+            wallet_assigner.close()
+        if audio_prefetcher:
+            audio_prefetcher.close()
+
+    if save_registry and profiles:
+        registry_file = save_to_registry(profiles, registry_db, export_registry)
         print(f"Saved to: {registry_file}", file=sys.stderr)
 
-    return profile
+    return {
+        'total_systems': len(profiles),
+        'total_streams': sum(p['total_streams'] for p in profiles.values()),
+        'systems': profiles,
+        'errors': errors,
+        'generated_at': datetime.utcnow().isoformat() + 'Z'
+    }
+
+
+def follow_systems(system_ids: List[str], talkgroup_ids: Optional[List[int]] = None,
+                   assign_wallets: bool = False, save_registry: bool = False,
+                   verbose: bool = False, base_url: Optional[str] = None,
+                   interval: float = 30.0, state_file: Optional[str] = None,
+                   lookback: float = 300.0, max_pages: int = 20,
+                   max_workers: int = 8, per_host: int = 4,
+                   wallet_cache: Optional[str] = DEFAULT_WALLET_CACHE,
+                   wallet_key: str = 'talkgroup',
+                   registry_db: str = DEFAULT_REGISTRY_DB,
+                   export_registry: Optional[str] = None,
+                   talkgroup_cache: Optional[str] = DEFAULT_TALKGROUP_CACHE,
+                   talkgroup_ttl: float = 3600.0,
+                   max_cycles: Optional[int] = None,
+                   on_profile=None,
+                   rate: Optional[float] = None,
+                   audio_cache: Optional[str] = None,
+                   audio_cache_mb: float = DEFAULT_AUDIO_CACHE_MB) -> None:
+    """
+    Poll systems forever, processing only calls newer than each system's watermark
+
+    Each cycle asks ``/calls/newer`` from the stored cursor and keeps paging
+    while pages still contain unseen calls, so per-cycle work tracks new
+    traffic rather than a fixed lookback window. Watermarks are saved after
+    every cycle, so a restarted follower resumes where it left off. A system
+    whose fetch fails keeps its watermark and is retried on the next cycle.
+
+    Args:
+        system_ids: OpenMHz system IDs
+        interval: Seconds between the start of consecutive polls
+        state_file: Watermark state file (default: watermarks.json next to this script)
+        lookback: Seconds of history to fetch for systems with no watermark yet
+        max_pages: Upper bound on pages fetched per system per cycle
+        wallet_cache: Wallet cache database path (None disables caching)
+        wallet_key: Wallet cache granularity, 'talkgroup' or 'call'
+        registry_db: Registry store database path
+        export_registry: Also export the registry to this streams.json path
+        talkgroup_cache: Talkgroup cache directory (None disables the on-disk cache)
+        talkgroup_ttl: Seconds before cached talkgroups are revalidated
+        max_cycles: Stop after this many cycles (default: run forever)
+        on_profile: Callback receiving each system profile that has new streams
+        rate: Request budget in requests/second, split across systems (None for no budget)
+        audio_cache: Prefetch call audio into this directory (None to skip)
+        audio_cache_mb: Size budget of the audio cache
+    """
+    if state_file is None:
+        state_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'watermarks.json')
+    store = WatermarkStore(state_file)
+    system_ids = list(dict.fromkeys(system_ids))
+
+    session = create_session(pool_size=max(max_workers, per_host))
+    limiter = HostLimiter(per_host)
+    scheduler = RequestScheduler(rate)
+    scheduler.register(system_ids)
+    clients = {
+        sid: OpenMHZClient(sid, verbose, session=session, base_url=base_url,
+                           limiter=limiter, scheduler=scheduler)
+        for sid in system_ids
+    }
+    wallet_assigner = _create_wallet_assigner(wallet_cache, wallet_key) if assign_wallets else None
+    audio_prefetcher = _create_audio_prefetcher(audio_cache, audio_cache_mb, max_workers, verbose)
+    tg_cache = TalkgroupCache(talkgroup_cache, talkgroup_ttl)
+
+    def poll(system_id: str) -> List[Dict]:
+        watermark = store.get(system_id, time.time() - lookback)
+        new_calls = []
+        for _ in range(max_pages):
+            # Ask from 1 ms before the cursor so calls sharing the newest
+            # timestamp are returned and de-duplicated by ID
+            page, error = fetch_calls(clients[system_id], talkgroup_ids, (watermark.time_ms - 1) / 1000)
+            if error:
+                # Calls already taken from earlier pages are kept; the rest
+                # are fetched from the watermark next cycle
+                print(f"Failed: {error} ({system_id})", file=sys.stderr)
+                break
+            fresh = watermark.filter_new(page)
+            if not fresh:
+                break
+            new_calls.extend(to_call_records(fresh, system_id))
+        return new_calls
+
+    print(f"Following {len(system_ids)} systems every {interval}s", file=sys.stderr)
+    cycle = 0
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while max_cycles is None or cycle < max_cycles:
+                started = time.time()
+
+                # Served from memory until the TTL expires, then revalidated
+                talkgroups = dict(zip(system_ids, pool.map(lambda sid: tg_cache.get(clients[sid]), system_ids)))
+                new_calls = dict(zip(system_ids, pool.map(poll, system_ids)))
+
+                profiles = {}
+                for sid in system_ids:
+                    if not new_calls[sid]:
+                        continue
+                    print(f"New: {len(new_calls[sid])} calls ({sid})", file=sys.stderr)
+                    tg_list, tg_lookup = talkgroups[sid]
+                    profiles[sid] = StreamProfileGenerator.generate_system_profile(
+                        sid, tg_list, new_calls[sid], wallet_assigner, tg_lookup, audio_prefetcher
+                    )
+                    if on_profile:
+                        on_profile(profiles[sid])
+
+                if save_registry and profiles:
+                    save_to_registry(profiles, registry_db, export_registry)
+                store.save()
+
+                cycle += 1
+                if max_cycles is None or cycle < max_cycles:
+                    time.sleep(max(0.0, interval - (time.time() - started)))
+    finally:
+        session.close()
+        if wallet_assigner:
+            wallet_assigner.close()
+        if audio_prefetcher:
+            audio_prefetcher.close()
+
+
+# ============================================================================
+# Historical Backfill
+# ============================================================================
+
+def parse_time_arg(value: str) -> float:
+    """Parse epoch seconds or an ISO 8601 time (UTC if no offset) to epoch seconds"""
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def parse_backfill_range(value: str) -> Tuple[float, float]:
+    """Parse 'START..END' (END may be empty for now) to epoch seconds"""
+    if '..' not in value:
+        raise ValueError("Backfill range must look like START..END")
+    start, end = value.split('..', 1)
+    start_time = parse_time_arg(start)
+    end_time = parse_time_arg(end) if end else time.time()
+    if end_time <= start_time:
+        raise ValueError("Backfill END must be after START")
+    return start_time, end_time
+
+
+class BackfillCheckpoint:
+    """
+    Progress of a backfill, split into (system, time slice) units of work
+
+    Each slice records its page cursor as a Watermark and whether it is done.
+    A checkpoint only resumes a run over the same range and systems; anything
+    else starts over.
+    """
+
+    def __init__(self, path: str, system_ids: List[str], start_ms: int, end_ms: int, slice_ms: int):
+        self.path = path
+        self.slices: Dict[str, Dict] = {}
+        signature = {'systems': sorted(system_ids), 'range': [start_ms, end_ms]}
+
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                stored = json.load(f)
+            if stored.get('signature') == signature:
+                self.slices = stored['slices']
+        self.signature = signature
+
+        if not self.slices:
+            for sid in system_ids:
+                for slice_start in range(start_ms, end_ms, slice_ms):
+                    slice_end = min(slice_start + slice_ms, end_ms)
+                    self.slices[f"{sid}|{slice_start}"] = {
+                        'system_id': sid, 'start': slice_start, 'end': slice_end,
+                        'cursor': Watermark(slice_start).to_dict(), 'done': False
+                    }
+
+    def pending(self) -> Dict[str, Dict]:
+        return {key: sl for key, sl in self.slices.items() if not sl['done']}
+
+    def update(self, key: str, cursor: Dict, done: bool):
+        self.slices[key]['cursor'] = cursor
+        self.slices[key]['done'] = done
+
+    def save(self):
+        write_json_atomic(self.path, {'signature': self.signature, 'slices': self.slices})
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def backfill_systems(system_ids: List[str], start_time: float, end_time: float, out: TextIO,
+                     talkgroup_ids: Optional[List[int]] = None,
+                     assign_wallets: bool = False, save_registry: bool = False,
+                     verbose: bool = False, base_url: Optional[str] = None,
+                     max_workers: int = 4, per_host: int = 4, rate: float = 5.0,
+                     slice_seconds: float = 900.0, checkpoint_file: Optional[str] = None,
+                     wallet_cache: Optional[str] = DEFAULT_WALLET_CACHE,
+                     wallet_key: str = 'talkgroup',
+                     registry_db: str = DEFAULT_REGISTRY_DB,
+                     export_registry: Optional[str] = None,
+                     talkgroup_cache: Optional[str] = DEFAULT_TALKGROUP_CACHE,
+                     talkgroup_ttl: float = 3600.0,
+                     audio_cache: Optional[str] = None,
+                     audio_cache_mb: float = DEFAULT_AUDIO_CACHE_MB) -> Dict:
+    """
+    Recover calls between start_time and end_time by walking /calls/newer pages
+
+    The range is split into ``slice_seconds`` slices per system. Slices are
+    walked concurrently (page after page within a slice) while a shared
+    RequestScheduler keeps the total request rate under ``rate`` per second,
+    split across the systems and backing off when throttled. Calls are
+    de-duplicated by ``_id`` and written as NDJSON (see stream_systems) page by
+    page; the checkpoint is saved after each page, so an interrupted backfill
+    resumes where it stopped. The checkpoint is removed once every slice is done.
+
+    Returns:
+        The summary record (also written as the last line)
+    """
+    system_ids = list(dict.fromkeys(system_ids))
+    if checkpoint_file is None:
+        checkpoint_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backfill_checkpoint.json')
+    start_ms, end_ms = int(start_time * 1000), int(end_time * 1000)
+    checkpoint = BackfillCheckpoint(checkpoint_file, system_ids, start_ms, end_ms, max(1, int(slice_seconds * 1000)))
+    pending = checkpoint.pending()
+    print(f"Backfilling {len(system_ids)} systems: {len(pending)} of {len(checkpoint.slices)} slices left",
+          file=sys.stderr)
+
+    session = create_session(pool_size=max(max_workers, per_host))
+    limiter = HostLimiter(per_host)
+    scheduler = RequestScheduler(rate)
+    scheduler.register(system_ids)
+    clients = {
+        sid: OpenMHZClient(sid, verbose, session=session, base_url=base_url,
+                           limiter=limiter, scheduler=scheduler)
+        for sid in system_ids
+    }
+    tg_cache = _create_talkgroup_cache(talkgroup_cache, talkgroup_ttl)
+    talkgroups = {sid: load_talkgroups(clients[sid], tg_cache) for sid in system_ids}
+    wallet_assigner = _create_wallet_assigner(wallet_cache, wallet_key) if assign_wallets else None
+    audio_prefetcher = _create_audio_prefetcher(audio_cache, audio_cache_mb, max_workers, verbose)
+    store = open_registry(registry_db) if save_registry else None
+
+    results: "queue.Queue[Tuple]" = queue.Queue(maxsize=max_workers * 2)
+    stop = threading.Event()  # Set when the main thread stops draining results
+
+    def hand_off(item: Tuple) -> bool:
+        """Queue an item for the main thread; False once it has stopped listening"""
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def split_page(page: List[Dict], end_ms: int) -> Tuple[List[Dict], bool]:
+        """(calls before the slice end, whether the page reached it); calls without a valid time are skipped"""
+        in_range, reached_end = [], False
+        for call in page:
+            try:
+                call_ms = call_time_ms(call.get('time', ''))
+            except ValueError:
+                continue  # As in Watermark.filter_new
+            if call_ms < end_ms:
+                in_range.append(call)
+            else:
+                reached_end = True
+        return in_range, reached_end
+
+    def walk(key: str, slice_info: Dict):
+        """Fetch a slice page by page, handing each page to the main thread"""
+        try:
+            client = clients[slice_info['system_id']]
+            watermark = Watermark.from_dict(slice_info['cursor'])
+            while not stop.is_set():
+                page = client.get_calls_page(watermark.time_ms - 1, talkgroup_ids)
+                in_range, reached_end = split_page(page, slice_info['end'])
+                fresh = watermark.filter_new(in_range)
+                done = not fresh or reached_end
+                if not hand_off(('page', key, fresh, watermark.to_dict(), done)) or done:
+                    break
+            hand_off(('end', key, None, None, True))
+        except Exception as e:
+            hand_off(('end', key, None, None, e))
+
+    totals = {sid: 0 for sid in system_ids}
+    seen_ids = {sid: set() for sid in system_ids}
+    failed = 0
+    try:
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            for key, slice_info in pending.items():
+                pool.submit(walk, key, slice_info)
+
+            remaining = len(pending)
+            while remaining:
+                kind, key, calls, cursor, status = results.get()
+                sid = checkpoint.slices[key]['system_id']
+                if kind == 'end':
+                    remaining -= 1
+                    if status is not True:
+                        failed += 1
+                        print(f"Backfill slice {key} failed: {status}", file=sys.stderr)
+                    continue
+
+                calls = [c for c in calls if c.get('_id') not in seen_ids[sid]]
+                seen_ids[sid].update(c.get('_id') for c in calls)
+                calls = [c for c in calls if c.get('len', 0) > 0]  # Filter zero-length
+
+                tg_list, tg_lookup = talkgroups[sid]
+                profiles = list(StreamProfileGenerator.iter_profiles(
+                    sid, tg_list, calls, wallet_assigner, tg_lookup=tg_lookup,
+                    audio_prefetcher=audio_prefetcher
+                ))
+                for profile in profiles:
+                    out.write(json.dumps(profile, separators=(',', ':')) + "\n")
+                out.flush()
+                if store and profiles:
+                    upsert_profile(store, {'system_id': sid, 'streams': profiles,
+                                           'generated_at': datetime.utcnow().isoformat() + 'Z'})
+                totals[sid] += len(profiles)
+
+                checkpoint.update(key, cursor, status)
+                checkpoint.save()
+        finally:
+            # On an error (BrokenPipe on ``out``, a locked registry, Ctrl-C) walkers must not stay
+            # blocked on the full queue, or the executor would never shut down
+            stop.set()
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        complete = not checkpoint.pending()
+        if complete:
+            checkpoint.remove()
+        if store and export_registry:
+            print(f"Exported to: {store.export_json(export_registry)}", file=sys.stderr)
+    finally:
+        session.close()
+        if wallet_assigner:
+            wallet_assigner.close()
+        if audio_prefetcher:
+            audio_prefetcher.close()
+        if store:
+            store.close()
+
+    summary = {
+        'type': 'summary',
+        'mode': 'backfill',
+        'range': [start_ms, end_ms],
+        'total_systems': len(totals),
+        'total_streams': sum(totals.values()),
+        'systems': totals,
+        'complete': complete,
+        'failed_slices': failed,
+        'generated_at': datetime.utcnow().isoformat() + 'Z'
+    }
+    out.write(json.dumps(summary, separators=(',', ':')) + "\n")
+    out.flush()
+    return summary
+
+
+def load_systems_file(path: str) -> List[str]:
+    """Read system IDs from a JSON list or a one-per-line text file"""
+    with open(path, 'r') as f:
+        content = f.read()
+
+    if content.lstrip().startswith('['):
+        return [str(sid).strip() for sid in json.loads(content) if str(sid).strip()]
+
+    system_ids = []
+    for line in content.splitlines():
+        line = line.split('#', 1)[0].strip()
+        if line:
+            system_ids.append(line)
+    return system_ids
+
+
+# ============================================================================
+# Resident Ingestion Service
+# ============================================================================
+
+class IngestService:
+    """
+    Warm ingestion state shared by all requests of a long-lived server
+
+    Keeps one connection pool, one client per system, a TalkgroupCache
+    (``talkgroup_ttl``, persisted to ``talkgroup_cache`` if given) and a
+    short-lived call cache (``call_ttl``) so repeated
+    lookups are answered from memory. Concurrent misses on the same call
+    cache key share one upstream fetch, and expired keys are dropped. Every ingested stream is also added to
+    a StreamIndex holding the last ``index_retention`` seconds, served by
+    /streams.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, verbose: bool = False,
+                 talkgroup_ttl: float = 3600.0, call_ttl: float = 10.0,
+                 per_host: int = 4, wallet_assigner=None,
+                 talkgroup_cache: Optional[str] = None,
+                 rate: Optional[float] = None,
+                 index_retention: Optional[float] = 86400.0,
+                 audio_prefetcher: Optional[AudioPrefetcher] = None):
+        self.base_url = base_url
+        self.verbose = verbose
+        self.talkgroup_cache = TalkgroupCache(talkgroup_cache, talkgroup_ttl)
+        self.call_ttl = call_ttl
+        self.session = create_session(pool_size=max(per_host, 10))
+        self.limiter = HostLimiter(per_host)
+        self.scheduler = RequestScheduler(rate)
+        self.wallet_assigner = wallet_assigner
+        self.audio_prefetcher = audio_prefetcher
+        self.index = StreamIndex(index_retention)
+        self._clients: Dict[str, OpenMHZClient] = {}
+        self._calls: Dict[Tuple[str, Tuple[int, ...]], Tuple[float, List[CallRecord]]] = {}
+        self._fetching: Dict[Tuple[str, Tuple[int, ...]], Future] = {}
+        self._lock = threading.Lock()
+        self._wallet_lock = threading.Lock()
+
+    def client(self, system_id: str) -> OpenMHZClient:
+        with self._lock:
+            if system_id not in self._clients:
+                self._clients[system_id] = OpenMHZClient(
+                    system_id, self.verbose, session=self.session,
+                    base_url=self.base_url, limiter=self.limiter, scheduler=self.scheduler
+                )
+            return self._clients[system_id]
+
+    def talkgroups(self, system_id: str) -> Tuple[List[Dict], Dict]:
+        """(talkgroups, lookup) for a system, revalidated after talkgroup_ttl"""
+        return self.talkgroup_cache.get(self.client(system_id))
+
+    def calls(self, system_id: str, talkgroup_ids: Optional[List[int]] = None) -> List[CallRecord]:
+        """
+        Recent calls for a system as CallRecords, reused for call_ttl seconds
+
+        Returns copies: profile generation annotates records in place, and
+        the cached ones are shared by every request.
+        """
+        key = (system_id, tuple(sorted(talkgroup_ids or [])))
+        with self._lock:
+            cached = self._calls.get(key)
+            if cached and time.time() - cached[0] < self.call_ttl:
+                return [record.copy() for record in cached[1]]
+            future = self._fetching.get(key)
+            fetching = future is None
+            if fetching:
+                future = self._fetching[key] = Future()
+
+        if fetching:
+            try:
+                calls = to_call_records(self.client(system_id).get_recent_calls(talkgroup_ids), system_id)
+            except BaseException as e:
+                with self._lock:
+                    del self._fetching[key]
+                future.set_exception(e)
+                raise
+            now = time.time()
+            with self._lock:
+                del self._fetching[key]
+                # Every distinct talkgroup filter is a key; drop the expired ones
+                for stale in [k for k, (fetched_at, _) in self._calls.items() if now - fetched_at >= self.call_ttl]:
+                    del self._calls[stale]
+                self._calls[key] = (now, calls)
+            future.set_result(calls)
+        return [record.copy() for record in future.result()]
+
+    def ingest(self, system_id: str, talkgroup_ids: Optional[List[int]] = None) -> Dict:
+        """Same result as ingest_system(), served from the warm caches"""
+        talkgroups, tg_lookup = self.talkgroups(system_id)
+        calls = self.calls(system_id, talkgroup_ids)
+        if self.wallet_assigner is None:
+            profile = StreamProfileGenerator.generate_system_profile(
+                system_id, talkgroups, calls, tg_lookup=tg_lookup, audio_prefetcher=self.audio_prefetcher
+            )
+        else:
+            # Wallet assigners are not thread-safe; serialize requests that use one
+            with self._wallet_lock:
+                profile = StreamProfileGenerator.generate_system_profile(
+                    system_id, talkgroups, calls, self.wallet_assigner, tg_lookup, self.audio_prefetcher
+                )
+        self.index.add_system_profile(profile)
+        return profile
+
+    def streams(self, query: Dict[str, List[str]]) -> Tuple[int, object]:
+        """Query the stream index (system, talkgroup, tag, since, until, minutes, limit)"""
+        def param(name: str) -> Optional[str]:
+            return query.get(name, [''])[0] or None
+
+        try:
+            since = float(param('since')) if param('since') else None
+            if param('minutes'):
+                since = time.time() - float(param('minutes')) * 60
+            until = float(param('until')) if param('until') else None
+            talkgroup_id = int(param('talkgroup')) if param('talkgroup') else None
+            limit = int(param('limit') or 100)
+        except ValueError:
+            return 400, {'error': 'since/until/minutes must be numbers, talkgroup/limit integers'}
+
+        streams = self.index.query(param('system'), talkgroup_id, param('tag'), since, until, limit)
+        return 200, {'total_streams': len(streams), 'indexed_streams': len(self.index), 'streams': streams}
+
+    def handle(self, path: str, query: Dict[str, List[str]]) -> Tuple[int, object]:
+        """Route a request to (status, JSON payload); /metrics returns Prometheus text"""
+        if path == '/metrics':
+            return 200, METRICS.render_prometheus()
+
+        if path == '/health':
+            return 200, {'status': 'ok', 'systems': sorted(self._clients),
+                         'indexed_streams': len(self.index),
+                         'requests': dict(self.scheduler.stats)}
+
+        if path == '/streams':
+            return self.streams(query)
+
+        system_id = query.get('system', [''])[0]
+        if path not in ('/ingest', '/talkgroups'):
+            return 404, {'error': f"Unknown endpoint: {path}"}
+        if not system_id:
+            return 400, {'error': 'system is required'}
+
+        if path == '/talkgroups':
+            talkgroups, _ = self.talkgroups(system_id)
+            return 200, {'system_id': system_id, 'total_talkgroups': len(talkgroups), 'talkgroups': talkgroups}
+
+        talkgroup_ids = None
+        if query.get('talkgroups', [''])[0]:
+            try:
+                talkgroup_ids = [int(tid) for tid in query['talkgroups'][0].split(',')]
+            except ValueError:
+                return 400, {'error': 'Talkgroup IDs must be integers'}
+        try:
+            return 200, self.ingest(system_id, talkgroup_ids)
+        except requests.RequestException as e:
+            # Upstream failure, not an empty system
+            return 502, {'error': f"OpenMHz request failed: {e}", 'system_id': system_id}
+
+    def close(self):
+        self.session.close()
+        if self.wallet_assigner:
+            self.wallet_assigner.close()
+        if self.audio_prefetcher:
+            self.audio_prefetcher.close()
+
+
+class ThreadingUnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    """HTTP server listening on a Unix domain socket"""
+    daemon_threads = True
+
+
+def make_service_handler(service: IngestService):
+    """Build a request handler class bound to an IngestService"""
+
+    class ServiceHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            split = urlsplit(self.path)
+            try:
+                status, payload = service.handle(split.path, parse_qs(split.query))
+            except Exception as e:
+                status, payload = 500, {'error': str(e)}
+            if isinstance(payload, str):
+                body, content_type = payload.encode(), 'text/plain; version=0.0.4; charset=utf-8'
+            else:
+                body, content_type = json.dumps(payload).encode(), 'application/json'
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def address_string(self):
+            # Unix socket peers have no (host, port) address
+            return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+        def log_message(self, format, *args):
+            if service.verbose:
+                super().log_message(format, *args)
+
+    return ServiceHandler
+
+
+def create_server(service: IngestService, host: str = '127.0.0.1', port: int = 8790,
+                  socket_path: Optional[str] = None):
+    """Create an HTTP server for the service on a TCP port or a Unix socket"""
+    handler = make_service_handler(service)
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        return ThreadingUnixHTTPServer(socket_path, handler)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(service: IngestService, host: str = '127.0.0.1', port: int = 8790,
+          socket_path: Optional[str] = None):
+    """Run the resident ingestion service until interrupted"""
+    server = create_server(service, host, port, socket_path)
+    where = socket_path or f"http://{host}:{port}"
+    print(f"Ingestion service listening on {where}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        service.close()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
 
 
 # ============================================================================
 # CLI
 # ============================================================================
 
+def write_stats(path: str = '-'):
+    """Write METRICS.summary() as JSON to a file, or to stderr for '-'"""
+    stats = json.dumps(METRICS.summary(), indent=2)
+    if path == '-':
+        print(stats, file=sys.stderr)
+    else:
+        with open(path, 'w') as f:
+            f.write(stats + "\n")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Ingest radio streams from OpenMHz.com',
@@ -290,28 +2086,164 @@ Examples:
   # Basic ingestion
   python3 ingest_openmhz.py --system rhode-island
 
-  # With blockchain wallets and registry
-  python3 ingest_openmhz.py --system rhode-island --assign-wallets --save-registry
+  # With blockchain wallets and registry (plus a streams.json export)
+  python3 ingest_openmhz.py --system rhode-island --assign-wallets --save-registry --export-registry
 
   # Filter specific talkgroups
   python3 ingest_openmhz.py --system kcers1b --talkgroups 3344,3408
+
+  # Many systems at once (concurrent fetch, single combined result)
+  python3 ingest_openmhz.py --systems rhode-island,kcers1b,dcfd --save-registry
+  python3 ingest_openmhz.py --systems-file systems.txt
+
+  # Resident service for openmhzServer.js (GET /ingest?system=..., /talkgroups?system=...)
+  python3 ingest_openmhz.py --serve --port 8790
+
+  # Talkgroup list only (the service's /talkgroups response)
+  python3 ingest_openmhz.py --system rhode-island --list-talkgroups
+
+  # Stream profiles as NDJSON (one line per stream, then a summary line)
+  python3 ingest_openmhz.py --system rhode-island --format ndjson
+
+  # Recover an outage window page by page (NDJSON, resumable)
+  python3 ingest_openmhz.py --system dcfd --backfill 2025-10-23T12:00:00Z..2025-10-23T18:00:00Z --save-registry
+
+  # Long-running follower: only new calls since the last poll
+  python3 ingest_openmhz.py --systems rhode-island,kcers1b --follow --interval 30 --save-registry
+
+  # Prometheus metrics while following; JSON timing summary after a one-shot run
+  python3 ingest_openmhz.py --system dcfd --follow --metrics-port 9108
+  python3 ingest_openmhz.py --system dcfd --stats stats.json
         """
     )
 
-    parser.add_argument('--system', '-s', required=True,
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--system', '-s',
                        help='System ID (e.g., "rhode-island")')
+    source.add_argument('--systems',
+                       help='Comma-separated system IDs to ingest concurrently')
+    source.add_argument('--systems-file',
+                       help='File listing system IDs (JSON list or one per line)')
     parser.add_argument('--talkgroups', '-t',
                        help='Comma-separated talkgroup IDs')
+    parser.add_argument('--list-talkgroups', action='store_true',
+                       help='Print the talkgroup list of --system as JSON instead of ingesting calls')
     parser.add_argument('--assign-wallets', action='store_true',
                        help='Assign blockchain wallets to streams')
+    parser.add_argument('--wallet-cache', default=DEFAULT_WALLET_CACHE,
+                       help='Wallet cache database (default: openmhz/wallet_cache.db)')
+    parser.add_argument('--no-wallet-cache', action='store_true',
+                       help='Always ask the wallet script, bypassing the cache')
+    parser.add_argument('--wallet-key', choices=CachedWalletAssigner.GRANULARITIES, default='talkgroup',
+                       help='One wallet per talkgroup or per call (default: talkgroup)')
     parser.add_argument('--save-registry', action='store_true',
-                       help='Save to streams.json registry')
+                       help='Upsert streams into the registry store (streams.db) and export streams.json')
+    parser.add_argument('--registry-db', default=DEFAULT_REGISTRY_DB,
+                       help='Registry store database (default: openmhz/streams.db)')
+    parser.add_argument('--export-registry', nargs='?', const=DEFAULT_REGISTRY_JSON,
+                       help='Where --save-registry exports streams.json (default: openmhz/streams.json)')
+    parser.add_argument('--no-export-registry', action='store_true',
+                       help='With --save-registry, update only streams.db')
+    parser.add_argument('--talkgroup-cache', default=DEFAULT_TALKGROUP_CACHE,
+                       help='Talkgroup cache directory (default: openmhz/talkgroup_cache)')
+    parser.add_argument('--no-talkgroup-cache', action='store_true',
+                       help='Always download talkgroup metadata')
+    parser.add_argument('--talkgroup-ttl', type=float, default=3600.0,
+                       help='Seconds before cached talkgroups are revalidated (default: 3600)')
+    parser.add_argument('--prefetch-audio', action='store_true',
+                       help='Download call audio into the local cache and add audio_path to profiles')
+    parser.add_argument('--audio-cache', default=DEFAULT_AUDIO_CACHE,
+                       help='Audio cache directory (default: openmhz/audio_cache)')
+    parser.add_argument('--audio-cache-mb', type=float, default=DEFAULT_AUDIO_CACHE_MB,
+                       help=f'Audio cache size budget; least recently used files are evicted (default: {DEFAULT_AUDIO_CACHE_MB:.0f})')
     parser.add_argument('--output', '-o',
                        help='Output file (default: stdout)')
+    parser.add_argument('--format', '-f', choices=['json', 'ndjson'], default='json',
+                       help='json: one document at the end; ndjson: one line per stream as it is built, '
+                            'then a summary line (default: json)')
+    parser.add_argument('--api-url', default=None,
+                       help=f'OpenMHz API base URL (default: {DEFAULT_BASE_URL})')
+    parser.add_argument('--max-workers', type=int, default=8,
+                       help='Concurrent fetch threads for multi-system mode (default: 8)')
+    parser.add_argument('--per-host', type=int, default=4,
+                       help='Maximum concurrent requests per API host (default: 4)')
+    parser.add_argument('--follow', action='store_true',
+                       help='Keep polling and emit only calls newer than the stored watermark')
+    parser.add_argument('--interval', type=float, default=30.0,
+                       help='Seconds between polls in --follow mode (default: 30)')
+    parser.add_argument('--state-file',
+                       help='Watermark state file for --follow (default: openmhz/watermarks.json)')
+    parser.add_argument('--backfill', metavar='START..END',
+                       help='Fetch all calls in a time range (ISO 8601 or epoch seconds; empty END = now). '
+                            'Always writes NDJSON')
+    parser.add_argument('--rate', type=float, default=None,
+                       help='API request budget in requests/second, split across systems; '
+                            'lowered automatically on 429 (default: unlimited, 5 for --backfill)')
+    parser.add_argument('--slice', type=float, default=900.0,
+                       help='Backfill slice length in seconds; slices are fetched concurrently (default: 900)')
+    parser.add_argument('--checkpoint-file',
+                       help='Backfill checkpoint (default: openmhz/backfill_checkpoint.json)')
+    parser.add_argument('--serve', action='store_true',
+                       help='Run as a resident HTTP ingestion service')
+    parser.add_argument('--host', default='127.0.0.1',
+                       help='Service bind address for --serve (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8790,
+                       help='Service port for --serve (default: 8790)')
+    parser.add_argument('--index-retention', type=float, default=86400.0,
+                       help='Seconds of ingested streams kept in the --serve query index (default: 86400)')
+    parser.add_argument('--socket',
+                       help='Serve on this Unix socket path instead of a TCP port')
+    parser.add_argument('--metrics-port', type=int,
+                       help='Serve Prometheus metrics on this port at /metrics (--serve also has /metrics)')
+    parser.add_argument('--stats', nargs='?', const='-', metavar='PATH',
+                       help='On exit, write per-stage timings and counters as JSON to PATH (default: stderr)')
     parser.add_argument('--debug', '-d', action='store_true',
                        help='Enable debug output')
 
     args = parser.parse_args()
+    if args.no_export_registry:
+        args.export_registry = None
+    elif args.save_registry and args.export_registry is None:
+        args.export_registry = DEFAULT_REGISTRY_JSON  # streams.json stays current for apiServer.js
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port, args.host)
+    if args.stats:
+        atexit.register(write_stats, args.stats)
+    wallet_cache = None if args.no_wallet_cache else args.wallet_cache
+    talkgroup_cache = None if args.no_talkgroup_cache else args.talkgroup_cache
+    audio_cache = args.audio_cache if args.prefetch_audio else None
+
+    if args.serve:
+        wallet_assigner = _create_wallet_assigner(wallet_cache, args.wallet_key) if args.assign_wallets else None
+        service = IngestService(base_url=args.api_url, verbose=args.debug,
+                                talkgroup_ttl=args.talkgroup_ttl, per_host=args.per_host,
+                                wallet_assigner=wallet_assigner,
+                                talkgroup_cache=None if args.no_talkgroup_cache else args.talkgroup_cache,
+                                rate=args.rate,
+                                index_retention=args.index_retention,
+                                audio_prefetcher=_create_audio_prefetcher(
+                                    audio_cache, args.audio_cache_mb, args.max_workers, args.debug))
+        try:
+            serve(service, args.host, args.port, args.socket)
+        except KeyboardInterrupt:
+            print("\nService stopped", file=sys.stderr)
+        return
+
+    if not (args.system or args.systems or args.systems_file):
+        parser.error("one of --system, --systems, --systems-file or --serve is required")
+
+    if args.list_talkgroups:
+        if not args.system:
+            parser.error("--list-talkgroups needs a single --system")
+        client = OpenMHZClient(args.system, args.debug, base_url=args.api_url)
+        talkgroups, _ = load_talkgroups(client, TalkgroupCache(talkgroup_cache, args.talkgroup_ttl))
+        if not talkgroups:
+            # Never pass off a failed fetch as a system without talkgroups
+            print(f"Error: No talkgroups for {args.system}", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps({'system_id': args.system, 'total_talkgroups': len(talkgroups),
+                          'talkgroups': talkgroups}))
+        return
 
     # Parse talkgroup IDs
     talkgroup_ids = None
@@ -322,15 +2254,168 @@ Examples:
             print("Error: Talkgroup IDs must be integers", file=sys.stderr)
             sys.exit(1)
 
+    if args.system:
+        system_ids = [args.system]
+    elif args.systems_file:
+        system_ids = load_systems_file(args.systems_file)
+    else:
+        system_ids = [sid.strip() for sid in args.systems.split(',') if sid.strip()]
+    if not system_ids:
+        print("Error: No systems given", file=sys.stderr)
+        sys.exit(1)
+
+    if args.backfill:
+        try:
+            start_time, end_time = parse_backfill_range(args.backfill)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+        out = open(args.output, 'w') if args.output else sys.stdout
+        try:
+            summary = backfill_systems(
+                system_ids, start_time, end_time, out,
+                talkgroup_ids=talkgroup_ids,
+                assign_wallets=args.assign_wallets,
+                save_registry=args.save_registry,
+                verbose=args.debug,
+                base_url=args.api_url,
+                max_workers=args.max_workers,
+                per_host=args.per_host,
+                rate=args.rate or 5.0,
+                slice_seconds=args.slice,
+                checkpoint_file=args.checkpoint_file,
+                wallet_cache=wallet_cache,
+                wallet_key=args.wallet_key,
+                registry_db=args.registry_db,
+                export_registry=args.export_registry,
+                talkgroup_cache=talkgroup_cache,
+                talkgroup_ttl=args.talkgroup_ttl,
+                audio_cache=audio_cache,
+                audio_cache_mb=args.audio_cache_mb
+            )
+        except KeyboardInterrupt:
+            print("\nBackfill interrupted - rerun the same command to resume", file=sys.stderr)
+            sys.exit(1)
+        finally:
+            if args.output:
+                out.close()
+        status = "Complete" if summary['complete'] else "Incomplete (rerun to resume)"
+        print(f"\n{status}: {summary['total_streams']} streams", file=sys.stderr)
+        if not summary['complete']:
+            sys.exit(1)
+        return
+
+    if args.follow:
+        def emit(profile: Dict):
+            if args.format == 'ndjson':
+                for stream in profile['streams']:
+                    print(json.dumps(stream, separators=(',', ':')))
+            else:
+                print(json.dumps(profile))
+            sys.stdout.flush()
+
+        try:
+            follow_systems(
+                system_ids,
+                talkgroup_ids=talkgroup_ids,
+                assign_wallets=args.assign_wallets,
+                save_registry=args.save_registry,
+                verbose=args.debug,
+                base_url=args.api_url,
+                interval=args.interval,
+                state_file=args.state_file,
+                max_workers=args.max_workers,
+                per_host=args.per_host,
+                wallet_cache=wallet_cache,
+                wallet_key=args.wallet_key,
+                registry_db=args.registry_db,
+                export_registry=args.export_registry,
+                talkgroup_cache=talkgroup_cache,
+                talkgroup_ttl=args.talkgroup_ttl,
+                on_profile=emit,
+                rate=args.rate,
+                audio_cache=audio_cache,
+                audio_cache_mb=args.audio_cache_mb
+            )
+        except KeyboardInterrupt:
+            print("\nStopped following", file=sys.stderr)
+        return
+
     # Run ingestion
     try:
-        profile = ingest_system(
-            args.system,
-            talkgroup_ids=talkgroup_ids,
-            assign_wallets=args.assign_wallets,
-            save_registry=args.save_registry,
-            verbose=args.debug
-        )
+        if args.format == 'ndjson':
+            out = open(args.output, 'w') if args.output else sys.stdout
+            try:
+                summary = stream_systems(
+                    system_ids,
+                    out,
+                    talkgroup_ids=talkgroup_ids,
+                    assign_wallets=args.assign_wallets,
+                    save_registry=args.save_registry,
+                    verbose=args.debug,
+                    base_url=args.api_url,
+                    max_workers=args.max_workers,
+                    per_host=args.per_host,
+                    wallet_cache=wallet_cache,
+                    wallet_key=args.wallet_key,
+                    registry_db=args.registry_db,
+                    export_registry=args.export_registry,
+                    talkgroup_cache=talkgroup_cache,
+                    talkgroup_ttl=args.talkgroup_ttl,
+                    rate=args.rate,
+                    audio_cache=audio_cache,
+                    audio_cache_mb=args.audio_cache_mb
+                )
+            finally:
+                if args.output:
+                    out.close()
+            print(f"\nComplete: {summary['total_streams']} streams", file=sys.stderr)
+            if summary['errors']:
+                print(f"Failed systems: {', '.join(summary['errors'])}", file=sys.stderr)
+                sys.exit(2)
+            return
+
+        if args.system:
+            profile = ingest_system(
+                args.system,
+                talkgroup_ids=talkgroup_ids,
+                assign_wallets=args.assign_wallets,
+                save_registry=args.save_registry,
+                verbose=args.debug,
+                base_url=args.api_url,
+                wallet_cache=wallet_cache,
+                wallet_key=args.wallet_key,
+                registry_db=args.registry_db,
+                export_registry=args.export_registry,
+                talkgroup_cache=talkgroup_cache,
+                talkgroup_ttl=args.talkgroup_ttl,
+                rate=args.rate,
+                audio_cache=audio_cache,
+                audio_cache_mb=args.audio_cache_mb
+            )
+            failed = [args.system] if 'error' in profile else []
+        else:
+            profile = ingest_systems(
+                system_ids,
+                talkgroup_ids=talkgroup_ids,
+                assign_wallets=args.assign_wallets,
+                save_registry=args.save_registry,
+                verbose=args.debug,
+                base_url=args.api_url,
+                max_workers=args.max_workers,
+                per_host=args.per_host,
+                wallet_cache=wallet_cache,
+                wallet_key=args.wallet_key,
+                registry_db=args.registry_db,
+                export_registry=args.export_registry,
+                talkgroup_cache=talkgroup_cache,
+                talkgroup_ttl=args.talkgroup_ttl,
+                rate=args.rate,
+                audio_cache=audio_cache,
+                audio_cache_mb=args.audio_cache_mb
+            )
+            failed = list(profile['errors'])
 
         # Output JSON
         output = json.dumps(profile, indent=2)
@@ -343,6 +2428,10 @@ Examples:
             print(output)
 
         print(f"\nComplete: {profile['total_streams']} streams", file=sys.stderr)
+        if failed:
+            # Distinguish "could not fetch" from "no calls" for cron and callers
+            print(f"Failed systems: {', '.join(failed)}", file=sys.stderr)
+            sys.exit(2)
 
     except KeyboardInterrupt:
         print("\nCancelled", file=sys.stderr)
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Ingestion Metrics
+Counters and latency histograms shared by the ingestion modules
+
+Long-running modes expose them in the Prometheus text format (/metrics);
+one-shot runs print ``summary()`` as JSON.
+
+Usage:
+    from metrics import METRICS
+
+    with METRICS.timer('ingest_stage_seconds', stage='fetch_calls'):
+        ...
+    METRICS.inc('openmhz_api_requests_total', system='dcfd', status='200')
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Latency buckets in seconds (upper bounds; +Inf is implicit)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HELP = {
+    'ingest_stage_seconds': 'Wall-clock time per ingestion stage',
+    'ingest_streams_total': 'Stream profiles produced',
+    'openmhz_api_requests_total': 'OpenMHz API responses (and transport errors) per attempt',
+    'openmhz_api_request_seconds': 'OpenMHz API request latency per attempt',
+    'openmhz_api_retries_total': 'OpenMHz API requests retried after a 429/5xx or connection error',
+    'openmhz_api_failures_total': 'OpenMHz API requests that failed after all retries',
+    'wallet_assign_seconds': 'Wallet assignment latency (request to answer)',
+    'wallet_assign_failures_total': 'Wallet assignments that returned no wallet',
+    'wallet_cache_lookups_total': 'Wallet cache lookups by result',
+    'audio_prefetch_total': 'Audio prefetch requests by result',
+    'audio_download_seconds': 'Audio download time per file',
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+class Histogram:
+    """Bucketed observations (cumulative on export), plus count/sum/max"""
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum', 'max')
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Approximate quantile: upper bound of the bucket holding it (capped at max)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self) -> Dict:
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else 0.0,
+            'p50': round(self.quantile(0.5), 6),
+            'p95': round(self.quantile(0.95), 6),
+            'max': round(self.max, 6)
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe set of labelled counters and histograms"""
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.started = time.time()
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram()
+            series[key].observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """Observe the wall-clock time of a block (also when it raises)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def time_iter(self, iterable, name: str, **labels) -> Iterator:
+        """Yield from ``iterable``, observing only the time spent producing items"""
+        iterator = iter(iterable)
+        busy = 0.0
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    busy += time.perf_counter() - started
+                yield item
+        finally:
+            self.observe(name, busy, **labels)
+
+    def counter_value(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0)
+
+    def histogram(self, name: str, **labels) -> Optional[Histogram]:
+        with self._lock:
+            return self._histograms.get(name, {}).get(_label_key(labels))
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(self._counters):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+            for name in sorted(self._histograms):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, hist in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', f'{bound:g}'))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {hist.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {hist.sum:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict:
+        """JSON-friendly snapshot: counters by label set, histogram stats by label set"""
+        def label_text(key: LabelKey) -> str:
+            return ','.join(f"{k}={v}" for k, v in key) or 'all'
+
+        with self._lock:
+            return {
+                'elapsed_seconds': round(time.time() - self.started, 3),
+                'counters': {
+                    name: {label_text(key): value for key, value in sorted(series.items())}
+                    for name, series in sorted(self._counters.items())
+                },
+                'timings': {
+                    name: {label_text(key): hist.summary() for key, hist in sorted(series.items())}
+                    for name, series in sorted(self._histograms.items())
+                }
+            }
+
+
+# Process-wide registry used by ingest_openmhz, audio_cache and friends
+METRICS = MetricsRegistry()
+
+
+def start_metrics_server(port: int, host: str = '127.0.0.1',
+                         registry: MetricsRegistry = METRICS) -> ThreadingHTTPServer:
+    """Serve /metrics from a background thread; returns the server (call shutdown() to stop)"""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -6,6 +6,7 @@
 
 const { spawn } = require("child_process");
 const WebSocket = require("ws");
+const fs = require("fs");
 const path = require("path");
 const http = require("http");
 const https = require("https");
@@ -22,8 +23,63 @@ const connections = new Map();
 // Path to Python ingestion script
 const pythonScript = path.join(__dirname, 'ingest_openmhz.py');
 
+// Resident ingestion service (python3 ingest_openmhz.py --serve)
+const ingestServiceUrl = process.env.INGEST_SERVICE_URL || 'http://127.0.0.1:8790';
+const ingestServiceSocket = process.env.INGEST_SERVICE_SOCKET;
+// A service that accepts the connection but stops answering counts as unavailable
+const ingestServiceTimeoutMs = Number(process.env.INGEST_SERVICE_TIMEOUT_MS) || 30000;
+
+// Audio prefetched by ingest_openmhz.py --prefetch-audio (see audio_cache.py)
+const audioCacheDir = process.env.AUDIO_CACHE_DIR || path.join(__dirname, 'audio_cache');
+
 /**
- * Ingest a system and get stream profiles by calling Python script
+ * Query the resident ingestion service
+ * @param {string} endpoint - Service path (e.g., '/ingest')
+ * @param {Object} query - Query string parameters
+ * @returns {Promise<Object>} Parsed JSON response
+ */
+function queryIngestService(endpoint, query) {
+  return new Promise((resolve, reject) => {
+    const search = new URLSearchParams(query).toString();
+    const requestPath = `${endpoint}?${search}`;
+    const options = ingestServiceSocket
+      ? { socketPath: ingestServiceSocket, path: requestPath }
+      : new URL(requestPath, ingestServiceUrl);
+
+    const request = http.get(options, (response) => {
+      let body = '';
+      response.on('data', (chunk) => {
+        body += chunk;
+      });
+      response.on('end', () => {
+        try {
+          const payload = JSON.parse(body);
+          if (response.statusCode !== 200) {
+            reject(new Error(payload.error || `Service returned ${response.statusCode}`));
+            return;
+          }
+          resolve(payload);
+        } catch (error) {
+          reject(new Error(`Failed to parse service response: ${error.message}`));
+        }
+      });
+    });
+
+    request.setTimeout(ingestServiceTimeoutMs, () => {
+      request.destroy(new Error(`Service did not answer within ${ingestServiceTimeoutMs} ms`));
+    });
+
+    request.on('error', (error) => {
+      error.serviceUnavailable = true;
+      reject(error);
+    });
+  });
+}
+
+/**
+ * Ingest a system and get stream profiles
+ * Uses the resident ingestion service when it is running and falls back to
+ * spawning the Python script otherwise
  * @param {string} systemId - The OpenMHz system ID (e.g., 'rhode-island')
  * @param {Object} options - Ingestion options
  * @param {Array<number>} options.talkgroupIds - Optional talkgroup IDs to filter
@@ -31,8 +87,30 @@ const pythonScript = path.join(__dirname, 'ingest_openmhz.py');
  * @returns {Promise<Object>} System profile with available streams
  */
 async function ingestSystem(systemId, options = {}) {
+  const query = { system: systemId };
+  if (options.talkgroupIds && options.talkgroupIds.length > 0) {
+    query.talkgroups = options.talkgroupIds.join(',');
+  }
+
+  try {
+    return await queryIngestService('/ingest', query);
+  } catch (error) {
+    if (!error.serviceUnavailable) {
+      throw error;
+    }
+    return spawnIngestion(systemId, options);
+  }
+}
+
+/**
+ * Ingest a system by spawning the Python script
+ * @param {string} systemId - The OpenMHz system ID (e.g., 'rhode-island')
+ * @param {Object} options - Ingestion options (see ingestSystem)
+ * @returns {Promise<Object>} System profile with available streams
+ */
+function spawnIngestion(systemId, options = {}) {
   return new Promise((resolve, reject) => {
-    const args = ['--system', systemId, '--format', 'json'];
+    const args = ['--system', systemId, '--format', 'ndjson'];
 
     // Add optional filters
     if (options.talkgroupIds && options.talkgroupIds.length > 0) {
@@ -45,11 +123,31 @@ async function ingestSystem(systemId, options = {}) {
     // Spawn Python process
     const process = spawn('python3', [pythonScript, ...args]);
 
-    let stdout = '';
+    // NDJSON: parse each stream line as it arrives, the last line is a summary
+    const streams = [];
+    let summary = null;
+    let pending = '';
+    let parseError = null;
     let stderr = '';
 
+    const parseLine = (line) => {
+      if (!line.trim() || parseError) return;
+      try {
+        const record = JSON.parse(line);
+        if (record.type === 'summary') {
+          summary = record;
+        } else {
+          streams.push(record);
+        }
+      } catch (error) {
+        parseError = error;
+      }
+    };
+
     process.stdout.on('data', (data) => {
-      stdout += data.toString();
+      const lines = (pending + data.toString()).split('\n');
+      pending = lines.pop();
+      lines.forEach(parseLine);
     });
 
     process.stderr.on('data', (data) => {
@@ -62,12 +160,20 @@ async function ingestSystem(systemId, options = {}) {
         return;
       }
 
-      try {
-        const profile = JSON.parse(stdout);
-        resolve(profile);
-      } catch (error) {
-        reject(new Error(`Failed to parse output: ${error.message}`));
+      parseLine(pending);
+      if (parseError || !summary) {
+        reject(new Error(`Failed to parse output: ${parseError ? parseError.message : 'missing summary'}`));
+        return;
       }
+
+      // Newest first, matching the JSON output
+      streams.sort((a, b) => (a.timestamp < b.timestamp ? 1 : a.timestamp > b.timestamp ? -1 : 0));
+      resolve({
+        system_id: systemId,
+        total_streams: streams.length,
+        streams,
+        generated_at: summary.generated_at
+      });
     });
 
     process.on('error', (error) => {
@@ -82,8 +188,114 @@ async function ingestSystem(systemId, options = {}) {
  * @returns {Promise<Array>} List of talkgroups
  */
 async function getTalkgroups(systemId) {
-  const profile = await ingestSystem(systemId);
-  return profile.talkgroups;
+  try {
+    const response = await queryIngestService('/talkgroups', { system: systemId });
+    return response.talkgroups;
+  } catch (error) {
+    if (!error.serviceUnavailable) {
+      throw error;
+    }
+    return spawnTalkgroups(systemId);
+  }
+}
+
+/**
+ * Get talkgroups for a system by spawning the Python script
+ * @param {string} systemId - The OpenMHz system ID
+ * @returns {Promise<Array>} List of talkgroups (rejects if none could be fetched)
+ */
+function spawnTalkgroups(systemId) {
+  return new Promise((resolve, reject) => {
+    const process = spawn('python3', [pythonScript, '--system', systemId, '--list-talkgroups']);
+    let stdout = '';
+    let stderr = '';
+
+    process.stdout.on('data', (data) => {
+      stdout += data.toString();
+    });
+
+    process.stderr.on('data', (data) => {
+      stderr += data.toString();
+    });
+
+    process.on('close', (code) => {
+      if (code !== 0) {
+        reject(new Error(`Talkgroup lookup failed: ${stderr}`));
+        return;
+      }
+      try {
+        resolve(JSON.parse(stdout).talkgroups);
+      } catch (error) {
+        reject(new Error(`Failed to parse output: ${error.message}`));
+      }
+    });
+
+    process.on('error', (error) => {
+      reject(new Error(`Failed to start talkgroup lookup: ${error.message}`));
+    });
+  });
+}
+
+/**
+ * Locate a call's audio in the content-addressed cache
+ * Mirrors AudioCache.path_for: <dir>/<id[:2]>/<id><ext>
+ * @param {string} callId - OpenMHz call _id
+ * @param {string} audioUrl - The audio URL (for the file extension)
+ * @returns {string|null} Local path, or null when the call is not cached
+ */
+function cachedAudioPath(callId, audioUrl) {
+  const safeId = (callId || '').replace(/[^A-Za-z0-9]/g, '');
+  if (!safeId) return null;
+
+  let ext = '.m4a';
+  try {
+    const urlExt = path.extname(new URL(audioUrl).pathname).toLowerCase();
+    if (/^\.[a-z0-9]+$/.test(urlExt)) ext = urlExt;
+  } catch (error) {
+    // Keep the default extension
+  }
+
+  const filePath = path.join(audioCacheDir, safeId.slice(0, 2), safeId + ext);
+  return fs.existsSync(filePath) ? filePath : null;
+}
+
+/**
+ * Stream a cached audio file to a WebSocket client
+ * @param {string} filePath - Local audio file
+ * @param {WebSocket} ws - WebSocket connection to stream to
+ * @returns {void}
+ */
+function streamLocalAudio(filePath, ws) {
+  // Mark as recently used for the cache's LRU eviction
+  const now = new Date();
+  fs.utimes(filePath, now, now, () => {});
+
+  ws.send(JSON.stringify({
+    type: 'stream_start',
+    contentType: 'audio/mp4',
+    cached: true
+  }));
+
+  const stream = fs.createReadStream(filePath, { highWaterMark: 64 * 1024 });
+  stream.on('data', (chunk) => {
+    if (ws.readyState === WebSocket.OPEN) {
+      ws.send(chunk);
+    }
+  });
+  stream.on('end', () => {
+    if (ws.readyState === WebSocket.OPEN) {
+      ws.send(JSON.stringify({ type: 'stream_end' }));
+    }
+  });
+  stream.on('error', (error) => {
+    if (ws.readyState === WebSocket.OPEN) {
+      ws.send(JSON.stringify({
+        type: 'error',
+        message: error.message
+      }));
+    }
+  });
+  ws.on('close', () => stream.destroy());
 }
 
 /**
@@ -223,6 +435,10 @@ async function handleClientMessage(clientId, ws, data) {
       await handleGetTalkgroups(clientId, ws, payload);
       break;
 
+    case "query_streams":
+      await handleQueryStreams(clientId, ws, payload);
+      break;
+
     default:
       ws.send(JSON.stringify({
         type: "error",
@@ -269,11 +485,42 @@ async function handleGetStreams(clientId, ws, payload) {
   }
 }
 
+/**
+ * Handle a query against the ingestion service's stream index
+ * (e.g. the last 10 minutes of Fire Dispatch calls across systems)
+ */
+async function handleQueryStreams(clientId, ws, payload = {}) {
+  const { systemId, talkgroupId, tag, since, until, minutes, limit } = payload;
+  const query = {};
+  if (systemId) query.system = systemId;
+  if (talkgroupId !== undefined) query.talkgroup = talkgroupId;
+  if (tag) query.tag = tag;
+  if (since !== undefined) query.since = since;
+  if (until !== undefined) query.until = until;
+  if (minutes !== undefined) query.minutes = minutes;
+  if (limit !== undefined) query.limit = limit;
+
+  try {
+    const result = await queryIngestService('/streams', query);
+    ws.send(JSON.stringify({
+      type: "streams_query",
+      totalStreams: result.total_streams,
+      streams: result.streams
+    }));
+  } catch (error) {
+    console.error(`Error querying streams:`, error);
+    ws.send(JSON.stringify({
+      type: "error",
+      message: `Failed to query streams: ${error.message}`
+    }));
+  }
+}
+
 /**
  * Handle request to start streaming
  */
 async function handleStartStream(clientId, ws, payload) {
-  const { streamType, streamId, systemId, audioUrl } = payload;
+  const { streamType, streamId, systemId, audioUrl, callId } = payload;
 
   const connection = connections.get(clientId);
   if (!connection) return;
@@ -318,8 +565,13 @@ async function handleStartStream(clientId, ws, payload) {
     connection.streamType = "openmhz";
     connection.streamId = streamId;
 
-    // Stream the audio
-    streamAudio(audioUrl, ws);
+    // Serve from the prefetch cache when possible; stream IDs end with the call _id
+    const localPath = cachedAudioPath(callId || (streamId || '').split('-').pop(), audioUrl);
+    if (localPath) {
+      streamLocalAudio(localPath, ws);
+    } else {
+      streamAudio(audioUrl, ws);
+    }
 
   } else {
     ws.send(JSON.stringify({
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Stream Registry Store
+Incremental, indexed storage for ingested stream profiles (sqlite, WAL mode)
+
+streams.json is kept as an export of this store for existing consumers
+(apiServer.js, updateStreamsJson.js, the libp2p publisher).
+
+Usage:
+    python3 registry_store.py export                      # streams.db -> streams.json
+    python3 registry_store.py import --input streams.json # streams.json -> streams.db
+    python3 registry_store.py query --system dcfd --talkgroup 729 --limit 10
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+OPENMHZ_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB = os.path.join(OPENMHZ_DIR, 'streams.db')
+DEFAULT_JSON = os.path.join(OPENMHZ_DIR, 'streams.json')
+DEFAULT_KEEP_PER_SYSTEM = 500  # Newest streams kept (and exported) per system
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS systems (
+    system_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS streams (
+    stream_id TEXT PRIMARY KEY,
+    system_id TEXT NOT NULL,
+    talkgroup_id INTEGER,
+    timestamp REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_streams_system ON streams (system_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_streams_talkgroup ON streams (system_id, talkgroup_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_streams_timestamp ON streams (timestamp);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def timestamp_to_epoch(timestamp: str) -> float:
+    """Convert a profile timestamp (ISO 8601, usually with a Z suffix) to epoch seconds"""
+    try:
+        return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return 0.0
+
+
+class RegistryStore:
+    """
+    Stream registry backed by sqlite in WAL mode
+
+    Each ``upsert_profile`` touches only the streams it is given, inside one
+    ``BEGIN IMMEDIATE`` transaction, so concurrent ingest processes serialize
+    their writes instead of overwriting each other. The same transaction
+    prunes the system to its newest ``keep_per_system`` streams (and, with
+    ``max_age``, drops streams older than that many seconds), so the store
+    and the streams.json export stay bounded.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB, timeout: float = 30.0,
+                 keep_per_system: int = DEFAULT_KEEP_PER_SYSTEM, max_age: Optional[float] = None):
+        self.path = path
+        self.keep_per_system = keep_per_system
+        self.max_age = max_age
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def is_empty(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM systems LIMIT 1").fetchone() is None
+
+    def upsert_profile(self, profile: Dict):
+        """Insert or update a system profile and its streams atomically"""
+        system_id = profile['system_id']
+        now = time.time()
+        system_data = dict(profile, streams=[])
+        rows = [
+            (s['stream_id'], system_id, s.get('talkgroup_id'),
+             timestamp_to_epoch(s.get('timestamp', '')), json.dumps(s))
+            for s in profile.get('streams', [])
+        ]
+
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(
+                "INSERT INTO systems (system_id, data, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(system_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                (system_id, json.dumps(system_data), now)
+            )
+            self.conn.executemany(
+                "INSERT INTO streams (stream_id, system_id, talkgroup_id, timestamp, data) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(stream_id) DO UPDATE SET system_id = excluded.system_id, "
+                "talkgroup_id = excluded.talkgroup_id, timestamp = excluded.timestamp, data = excluded.data",
+                rows
+            )
+            self._prune(system_id, now)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_updated', ?)",
+                (datetime.utcnow().isoformat() + 'Z',)
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def _prune(self, system_id: str, now: float):
+        """Drop a system's streams outside the retention window (inside the caller's transaction)"""
+        if self.max_age is not None:
+            self.conn.execute("DELETE FROM streams WHERE system_id = ? AND timestamp < ?",
+                              (system_id, now - self.max_age))
+        self.conn.execute(
+            "DELETE FROM streams WHERE system_id = ? AND stream_id NOT IN "
+            "(SELECT stream_id FROM streams WHERE system_id = ? ORDER BY timestamp DESC LIMIT ?)",
+            (system_id, system_id, self.keep_per_system)
+        )
+
+    def query(self, system_id: Optional[str] = None, talkgroup_id: Optional[int] = None,
+              since: Optional[float] = None, until: Optional[float] = None,
+              limit: Optional[int] = None) -> List[Dict]:
+        """Return stream profiles newest first, filtered through the indexes"""
+        clauses, params = [], []
+        if system_id is not None:
+            clauses.append("system_id = ?")
+            params.append(system_id)
+        if talkgroup_id is not None:
+            clauses.append("talkgroup_id = ?")
+            params.append(talkgroup_id)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+
+        sql = "SELECT data FROM streams"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [json.loads(row[0]) for row in self.conn.execute(sql, params)]
+
+    def export(self) -> Dict:
+        """Build the streams.json shape: {system_id: profile, ..., 'last_updated': ...} of the retained streams"""
+        registry = {}
+        since = time.time() - self.max_age if self.max_age is not None else None
+        for system_id, data in self.conn.execute("SELECT system_id, data FROM systems ORDER BY system_id"):
+            profile = json.loads(data)
+            streams = self.query(system_id=system_id, since=since, limit=self.keep_per_system)
+            profile['total_streams'] = len(streams)
+            profile['streams'] = streams
+            registry[system_id] = profile
+
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'last_updated'").fetchone()
+        registry['last_updated'] = row[0] if row else datetime.utcnow().isoformat() + 'Z'
+        return registry
+
+    def export_json(self, path: str = DEFAULT_JSON) -> str:
+        """Write the export atomically (unique temp file + rename, safe with concurrent exporters)"""
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix='.tmp',
+                                        dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.export(), f, separators=(',', ':'))
+            os.chmod(tmp_path, 0o644)  # mkstemp creates it private; consumers such as apiServer.js read it
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return path
+
+    def import_json(self, path: str = DEFAULT_JSON) -> int:
+        """Load an existing streams.json into the store; returns systems imported"""
+        with open(path, 'r') as f:
+            registry = json.load(f)
+
+        count = 0
+        for key, profile in registry.items():
+            if isinstance(profile, dict) and 'streams' in profile:
+                self.upsert_profile(dict(profile, system_id=profile.get('system_id', key)))
+                count += 1
+        return count
+
+
+def open_registry(path: str = DEFAULT_DB, legacy_json: str = DEFAULT_JSON, **kwargs) -> RegistryStore:
+    """Open the store (``kwargs`` as for RegistryStore), seeding a new one from the legacy streams.json if present"""
+    store = RegistryStore(path, **kwargs)
+    if store.is_empty() and os.path.exists(legacy_json):
+        store.import_json(legacy_json)
+    return store
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the stream registry store')
+    parser.add_argument('--db', default=DEFAULT_DB, help='Registry database (default: openmhz/streams.db)')
+    parser.add_argument('--keep', type=int, default=DEFAULT_KEEP_PER_SYSTEM,
+                        help=f'Newest streams kept and exported per system (default: {DEFAULT_KEEP_PER_SYSTEM})')
+    parser.add_argument('--max-age', type=float, help='Also drop streams older than this many seconds')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    export_cmd = sub.add_parser('export', help='Write streams.json from the store')
+    export_cmd.add_argument('--output', '-o', default=DEFAULT_JSON)
+
+    import_cmd = sub.add_parser('import', help='Load a streams.json into the store')
+    import_cmd.add_argument('--input', '-i', default=DEFAULT_JSON)
+
+    query_cmd = sub.add_parser('query', help='Print matching streams as JSON')
+    query_cmd.add_argument('--system', '-s')
+    query_cmd.add_argument('--talkgroup', '-t', type=int)
+    query_cmd.add_argument('--since', type=float, help='Epoch seconds (inclusive)')
+    query_cmd.add_argument('--until', type=float, help='Epoch seconds (exclusive)')
+    query_cmd.add_argument('--limit', type=int)
+
+    args = parser.parse_args()
+
+    with RegistryStore(args.db, keep_per_system=args.keep, max_age=args.max_age) as store:
+        if args.command == 'export':
+            print(f"Exported to: {store.export_json(args.output)}", file=sys.stderr)
+        elif args.command == 'import':
+            print(f"Imported {store.import_json(args.input)} systems", file=sys.stderr)
+        else:
+            streams = store.query(args.system, args.talkgroup, args.since, args.until, args.limit)
+            print(json.dumps(streams, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Stream Index
+In-memory time indexes over stream profiles (StreamProfileGenerator output)
+
+Answers "newest N streams" and time-range queries by system, talkgroup or
+category (talkgroup tag) without scanning streams.json.
+
+Usage:
+    python3 stream_index.py --tag "Fire Dispatch" --minutes 10
+    python3 stream_index.py --system dcfd --talkgroup 729 --limit 5
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from registry_store import DEFAULT_JSON, timestamp_to_epoch
+
+IndexKey = Tuple
+
+
+def stream_tag(profile: Dict) -> Optional[str]:
+    """Category of a stream: the tag of its talkgroup, if known"""
+    tg_info = profile.get('metadata', {}).get('talkgroup_info') or {}
+    return tg_info.get('tag')
+
+
+class StreamIndex:
+    """
+    Sorted time indexes over stream profiles
+
+    Every stream is listed, as a (timestamp, stream_id) pair, in a global
+    index and in its system, (system, talkgroup) and tag indexes. Lookups
+    bisect the most selective index, so range and top-N queries cost
+    O(log n + results). Streams usually arrive in time order, which makes
+    inserts appends. With ``retention`` (seconds) set, streams older than
+    the window are evicted whenever new ones are added.
+    """
+
+    def __init__(self, retention: Optional[float] = None):
+        self.retention = retention
+        self._streams: Dict[str, Dict] = {}
+        self._entries: Dict[str, Tuple[float, Tuple[IndexKey, ...]]] = {}
+        self._indexes: Dict[IndexKey, List[Tuple[float, str]]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._streams)
+
+    def __contains__(self, stream_id: str) -> bool:
+        return stream_id in self._streams
+
+    @staticmethod
+    def _keys(profile: Dict) -> Tuple[IndexKey, ...]:
+        system_id = profile.get('system_name')
+        keys = [('all',), ('system', system_id), ('talkgroup', system_id, profile.get('talkgroup_id'))]
+        tag = stream_tag(profile)
+        if tag:
+            keys.append(('tag', tag))
+        return tuple(keys)
+
+    def _remove(self, stream_id: str):
+        timestamp, keys = self._entries.pop(stream_id)
+        del self._streams[stream_id]
+        entry = (timestamp, stream_id)
+        for key in keys:
+            index = self._indexes[key]
+            pos = bisect_left(index, entry)
+            if pos < len(index) and index[pos] == entry:
+                del index[pos]
+            if not index:
+                del self._indexes[key]
+
+    def _add(self, profile: Dict):
+        stream_id = profile['stream_id']
+        if stream_id in self._entries:
+            self._remove(stream_id)
+
+        timestamp = timestamp_to_epoch(profile.get('timestamp', ''))
+        keys = self._keys(profile)
+        entry = (timestamp, stream_id)
+        for key in keys:
+            index = self._indexes.setdefault(key, [])
+            if not index or index[-1] < entry:
+                index.append(entry)
+            else:
+                insort(index, entry)
+        self._streams[stream_id] = profile
+        self._entries[stream_id] = (timestamp, keys)
+
+    def add(self, profiles: Iterable[Dict]) -> int:
+        """Insert or replace stream profiles; returns the number evicted afterwards"""
+        with self._lock:
+            for profile in profiles:
+                self._add(profile)
+            return self._evict(time.time() - self.retention) if self.retention else 0
+
+    def add_system_profile(self, system_profile: Dict) -> int:
+        """Index the streams of a generate_system_profile() result"""
+        return self.add(system_profile.get('streams', []))
+
+    def _evict(self, cutoff: float) -> int:
+        index = self._indexes.get(('all',), [])
+        expired = [stream_id for _, stream_id in index[:bisect_left(index, (cutoff, ''))]]
+        for stream_id in expired:
+            self._remove(stream_id)
+        return len(expired)
+
+    def evict(self, before: Optional[float] = None) -> int:
+        """Drop streams older than ``before`` (default: now - retention)"""
+        if before is None:
+            if not self.retention:
+                return 0
+            before = time.time() - self.retention
+        with self._lock:
+            return self._evict(before)
+
+    def _select(self, system_id: Optional[str], talkgroup_id: Optional[int],
+                tag: Optional[str]) -> Tuple[List[Tuple[float, str]], bool]:
+        """Pick the most selective index; also say whether other filters still apply"""
+        if system_id is not None and talkgroup_id is not None:
+            return self._indexes.get(('talkgroup', system_id, talkgroup_id), []), tag is not None
+        if tag is not None:
+            return self._indexes.get(('tag', tag), []), system_id is not None or talkgroup_id is not None
+        if system_id is not None:
+            return self._indexes.get(('system', system_id), []), False
+        return self._indexes.get(('all',), []), talkgroup_id is not None
+
+    @staticmethod
+    def _bounds(index: List[Tuple[float, str]], since: Optional[float],
+                until: Optional[float]) -> Tuple[int, int]:
+        lo = bisect_left(index, (since, '')) if since is not None else 0
+        hi = bisect_left(index, (until, '')) if until is not None else len(index)
+        return lo, max(lo, hi)
+
+    def _iter(self, system_id: Optional[str] = None, talkgroup_id: Optional[int] = None,
+              tag: Optional[str] = None, since: Optional[float] = None,
+              until: Optional[float] = None) -> Iterator[Dict]:
+        index, filtered = self._select(system_id, talkgroup_id, tag)
+        lo, hi = self._bounds(index, since, until)
+
+        for pos in range(hi - 1, lo - 1, -1):
+            profile = self._streams[index[pos][1]]
+            if filtered and not (
+                (system_id is None or profile.get('system_name') == system_id)
+                and (talkgroup_id is None or profile.get('talkgroup_id') == talkgroup_id)
+                and (tag is None or stream_tag(profile) == tag)
+            ):
+                continue
+            yield profile
+
+    def query(self, system_id: Optional[str] = None, talkgroup_id: Optional[int] = None,
+              tag: Optional[str] = None, since: Optional[float] = None,
+              until: Optional[float] = None, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Streams newest first, filtered by system/talkgroup/tag and time
+
+        Args:
+            system_id: Only this system
+            talkgroup_id: Only this talkgroup (used with system_id)
+            tag: Only talkgroups with this category, e.g. 'Fire Dispatch'
+            since: Epoch seconds (inclusive)
+            until: Epoch seconds (exclusive)
+            limit: Return at most this many (top-N newest)
+        """
+        with self._lock:
+            results = []
+            for profile in self._iter(system_id, talkgroup_id, tag, since, until):
+                if limit is not None and len(results) >= limit:
+                    break
+                results.append(profile)
+            return results
+
+    def latest(self, limit: int = 10, **filters) -> List[Dict]:
+        """The ``limit`` newest streams matching the query() filters"""
+        return self.query(limit=limit, **filters)
+
+    def count(self, system_id: Optional[str] = None, talkgroup_id: Optional[int] = None,
+              tag: Optional[str] = None, since: Optional[float] = None,
+              until: Optional[float] = None) -> int:
+        """Number of matching streams (two bisects when one index covers the filters)"""
+        with self._lock:
+            index, filtered = self._select(system_id, talkgroup_id, tag)
+            if not filtered:
+                lo, hi = self._bounds(index, since, until)
+                return hi - lo
+            return sum(1 for _ in self._iter(system_id, talkgroup_id, tag, since, until))
+
+    def talkgroups(self, system_id: str) -> List:
+        """Talkgroups of a system that currently have indexed streams, numbers first ('unknown' last)"""
+        with self._lock:
+            talkgroups = [key[2] for key in self._indexes if key[0] == 'talkgroup' and key[1] == system_id]
+        return sorted(talkgroups, key=lambda tg: (0, tg) if isinstance(tg, int) else (1, str(tg)))
+
+    def tags(self) -> List[str]:
+        with self._lock:
+            return sorted(key[1] for key in self._indexes if key[0] == 'tag')
+
+    @classmethod
+    def from_registry(cls, registry: Dict, retention: Optional[float] = None) -> 'StreamIndex':
+        """Build an index from the streams.json shape ({system_id: profile, ...})"""
+        index = cls(retention)
+        for profile in registry.values():
+            if isinstance(profile, dict):
+                index.add_system_profile(profile)
+        return index
+
+    @classmethod
+    def load_json(cls, path: str = DEFAULT_JSON, retention: Optional[float] = None) -> 'StreamIndex':
+        with open(path, 'r') as f:
+            return cls.from_registry(json.load(f), retention)
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Query streams.json through the stream index')
+    parser.add_argument('--input', '-i', default=DEFAULT_JSON, help='Registry export (default: openmhz/streams.json)')
+    parser.add_argument('--system', '-s')
+    parser.add_argument('--talkgroup', '-t', type=int)
+    parser.add_argument('--tag', help='Talkgroup category, e.g. "Fire Dispatch"')
+    parser.add_argument('--minutes', type=float, help='Only streams from the last N minutes')
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    index = StreamIndex.load_json(args.input)
+    since = time.time() - args.minutes * 60 if args.minutes else None
+    streams = index.query(args.system, args.talkgroup, args.tag, since=since, limit=args.limit)
+    print(f"{len(streams)} of {len(index)} streams", file=sys.stderr)
+    print(json.dumps(streams, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env ts-node
+/**
+ * streamWalletWorker.ts
+ *
+ * Long-lived wallet worker for the Python ingestion script.
+ * Keeps one Node process (and the wallet registry) warm and answers
+ * newline-delimited JSON requests on stdin with one JSON line per response on stdout.
+ *
+ * Protocol:
+ *   stdout (on start):  {"ready": true}
+ *   stdin:              {"id": 1, "streamId": "rhode-island-3344-abc", "streamName": "Fire Dispatch", "mode": "simple"}
+ *   stdout:             {"id": 1, "wallet": {...StreamWalletData}}
+ *                       {"id": 1, "error": "..."}
+ *
+ * Usage:
+ *   ts-node scripts/streamWalletWorker.ts
+ */
+
+import * as readline from "readline";
+import { createSimpleWallet, loadRegistry, saveRegistry } from "./generateStreamWallet";
+
+interface WalletRequest {
+  id: number | string;
+  streamId?: string;
+  streamName?: string;
+  metadata?: string;
+  mode?: "simple" | "contract";
+}
+
+// stdout carries the protocol only - route all logging to stderr
+console.log = (...args: unknown[]) => console.error(...args);
+
+function respond(message: object): void {
+  process.stdout.write(JSON.stringify(message) + "\n");
+}
+
+function main(): void {
+  const registry = loadRegistry();
+
+  const rl = readline.createInterface({ input: process.stdin, terminal: false });
+
+  rl.on("line", line => {
+    if (!line.trim()) return;
+
+    let request: WalletRequest;
+    try {
+      request = JSON.parse(line);
+    } catch (error) {
+      respond({ id: null, error: `Invalid request: ${(error as Error).message}` });
+      return;
+    }
+
+    try {
+      if (!request.streamId) {
+        throw new Error("streamId is required");
+      }
+
+      // Reuse the existing wallet for this stream if there is one
+      const existing = registry[request.streamId];
+      if (existing) {
+        respond({ id: request.id, wallet: existing });
+        return;
+      }
+
+      // Contract deployment is not implemented yet and falls back to simple mode
+      const walletData = createSimpleWallet(request.streamId, request.streamName || "Unknown Stream", request.metadata);
+      registry[request.streamId] = walletData;
+      saveRegistry(registry);
+
+      respond({ id: request.id, wallet: walletData });
+    } catch (error) {
+      respond({ id: request.id, error: (error as Error).message });
+    }
+  });
+
+  rl.on("close", () => process.exit(0));
+
+  respond({ ready: true });
+}
+
+if (require.main === module) {
+  main();
+}
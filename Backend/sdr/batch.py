@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""
+Batch Analysis
+Statistics, Welch PSD, peaks and occupancy for many IQ recordings on a process pool, as one table
+
+Each recording (raw complex64 or framed, see iqframe.py) is split into
+chunks of whole spectrogram rows, and every chunk is a separate task, so
+one huge capture keeps all cores busy as well as many small ones. Workers
+memory-map their own slice of the file: no samples are sent between
+processes. Their results (PSD sum, max-hold, occupancy counts and
+spectrogram rows, several MB per file) are written straight into one
+shared-memory block per recording; only a few scalars come back pickled.
+The parent then reassembles a SpectrumAnalyzer with exactly the frames a
+single pass would have seen, so the summary (and the optional plot) match
+decode-sim.py.
+
+Usage:
+    python3 batch.py captures/                         # every *.cf32 / *.iq in the directory
+    python3 batch.py 'archive/*.iq' --workers 8 --output summary.csv
+    python3 batch.py captures/ --json --plot-dir plots/
+
+    from batch import analyze_recordings
+
+    rows = analyze_recordings(['a.cf32', 'b.iq'], workers=4)   # one dict per recording
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from iqframe import FrameReader, is_framed
+from spectrum import (DEFAULT_BLOCK_SIZE, DEFAULT_MAX_ROWS, DEFAULT_NFFT, SpectrumAnalyzer, _close_map, _map_file,
+                      _release_pages, iter_file_blocks, plot)
+
+DEFAULT_CHUNK_SAMPLES = 1 << 23  # 8M samples = 64 MB of complex64 per task
+DEFAULT_PATTERNS = ('*.cf32', '*.iq')
+
+COLUMNS = [
+    'file', 'format', 'sample_rate', 'center_freq', 'samples', 'duration_s', 'power_db', 'mean_amplitude',
+    'max_amplitude', 'dc_i', 'dc_q', 'noise_floor_db', 'occupancy_pct', 'lost_frames', 'peak_freqs_hz',
+    'peak_levels_db', 'chunks', 'seconds', 'plot', 'error',
+]
+
+
+# ============================================================================
+# Inputs
+# ============================================================================
+
+def expand_inputs(inputs: Sequence[str], patterns: Sequence[str] = DEFAULT_PATTERNS) -> List[str]:
+    """Files, directories (their recordings matching ``patterns``) and globs -> sorted unique paths"""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for pattern in patterns:
+                paths.extend(glob.glob(os.path.join(item, pattern)))
+        elif glob.has_magic(item):
+            paths.extend(p for p in glob.glob(item) if os.path.isfile(p))
+        else:
+            paths.append(item)
+    return sorted(set(paths))
+
+
+class Recording:
+    """Sample count, rate and (for framed files) the frame index of one recording"""
+
+    def __init__(self, path: str, sample_rate: float, center_freq: Optional[float] = None):
+        self.path = path
+        self.framed = is_framed(path)
+        self.sample_rate = float(sample_rate)
+        self.center_freq = center_freq
+        self.lost_frames = 0
+        self.frame_starts = self.frame_bytes = None
+        if not self.framed:
+            self.format = 'raw'
+            self.count = os.path.getsize(path) // 8
+            return
+        # One pass over the headers only: byte offset and first sample of every frame
+        mm = _map_file(path)
+        try:
+            reader = FrameReader(mm)
+            starts, ends, frame = [0], [0], None
+            for frame in reader:
+                starts.append(starts[-1] + len(frame))
+                ends.append(reader.position)
+            self.format = reader.dtype
+            self.sample_rate = reader.sample_rate or sample_rate
+            self.center_freq = reader.center_freq if center_freq is None else center_freq
+            self.lost_frames = reader.stats['lost_frames']
+            del reader, frame
+        finally:
+            _close_map(mm)
+        self.count = starts[-1]
+        self.frame_starts = np.array(starts, np.int64)   # Frame i holds samples [starts[i], starts[i+1])
+        self.frame_bytes = np.array(ends, np.int64)      # and bytes [ends[i], ends[i+1])
+
+
+def iter_range(recording: Recording, start: int, stop: int,
+               block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[np.ndarray]:
+    """complex64 blocks of samples [start, stop) of a recording, read from its memory map"""
+    if not recording.framed:
+        yield from iter_file_blocks(recording.path, block_size, start, stop)
+        return
+    first = int(np.searchsorted(recording.frame_starts, start, 'right')) - 1
+    last = int(np.searchsorted(recording.frame_starts, stop, 'left'))
+    if stop <= start or first >= last:
+        return
+    mm = _map_file(recording.path)
+    offset = int(recording.frame_bytes[first])
+    reader = FrameReader(memoryview(mm)[offset:int(recording.frame_bytes[last])])
+    position, done = int(recording.frame_starts[first]), 0
+    try:
+        for block in reader.blocks():
+            lo, hi = max(start - position, 0), min(stop - position, len(block))
+            position += len(block)
+            if lo < hi:
+                yield block[lo:hi]
+            done = _release_pages(mm, done, offset + reader.position)
+    finally:
+        del reader
+        _close_map(mm)
+
+
+# ============================================================================
+# Shared Memory
+# ============================================================================
+
+class SharedArrays:
+    """
+    Named NumPy arrays laid out in one shared memory block
+
+    The parent creates it from a layout ({name: (shape, dtype)}); workers
+    attach with the same layout and the block's ``name``, and write their
+    part in place.
+    """
+
+    def __init__(self, layout: Dict[str, Tuple[Tuple[int, ...], str]], name: Optional[str] = None):
+        self.layout = layout
+        offsets, size = {}, 0
+        for key, (shape, dtype) in layout.items():
+            offsets[key] = size
+            size += -(-int(np.prod(shape)) * np.dtype(dtype).itemsize // 64) * 64  # 64-byte aligned
+        if name is None:
+            self.shm = SharedMemory(create=True, size=max(size, 1))
+        else:
+            try:
+                self.shm = SharedMemory(name=name, track=False)  # The creator owns (and unlinks) it
+            except TypeError:  # Python < 3.13
+                self.shm = SharedMemory(name=name)
+        self.name = self.shm.name
+        self.arrays = {key: np.ndarray(shape, dtype, buffer=self.shm.buf, offset=offsets[key])
+                       for key, (shape, dtype) in layout.items()}
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        return self.arrays[key]
+
+    def close(self, unlink: bool = False):
+        self.arrays.clear()
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+# ============================================================================
+# Planning and Workers
+# ============================================================================
+
+def plan_chunks(count: int, nfft: int, hop: int, max_rows: int = DEFAULT_MAX_ROWS,
+                chunk_samples: int = DEFAULT_CHUNK_SAMPLES) -> Tuple[int, int, List[Tuple[int, int, int]]]:
+    """
+    Split ``count`` samples into tasks that together see exactly the frames of one pass
+
+    Returns (frames_per_row, total_rows, chunks). The row width is the one a
+    single-pass Spectrogram ends up with; chunks cover whole rows of frames,
+    as (first_frame, frame_count, first_row).
+    """
+    total_frames = (count - nfft) // hop + 1 if count >= nfft else 0
+    frames_per_row = 1
+    while total_frames // frames_per_row >= max_rows:
+        frames_per_row *= 2
+    per_chunk = max(frames_per_row, chunk_samples // hop // frames_per_row * frames_per_row)
+    chunks = [(first, min(per_chunk, total_frames - first), first // frames_per_row)
+              for first in range(0, total_frames, per_chunk)] or [(0, 0, 0)]
+    return frames_per_row, total_frames // frames_per_row, chunks
+
+
+def _analyze_chunk(task: Dict) -> Dict:
+    """Worker: one chunk of one recording into its rows of the shared arrays"""
+    started = time.perf_counter()
+    recording, options = task['recording'], task['options']
+    first_frame, frames, first_row = task['chunk']
+    hop, nfft = options['hop'], options['nfft']
+    rows = frames // options['frames_per_row']
+    analyzer = SpectrumAnalyzer(recording.sample_rate, nfft, options['overlap'], max_rows=rows + 2 + rows % 2,
+                                keep_samples=1000 if task['index'] == 0 else 0,
+                                occupancy_db=options['occupancy_db'], frames_per_row=options['frames_per_row'])
+
+    # Samples this chunk counts, then the overlap its last frames need from the next chunk
+    start = first_frame * hop
+    stop = recording.count if task['last'] else (first_frame + frames) * hop
+    for block in iter_range(recording, start, stop, options['block_size']):
+        analyzer.update(block)
+    if not task['last'] and nfft > hop:
+        for block in iter_range(recording, stop, stop + nfft - hop, options['block_size']):
+            analyzer.update(block, stats=False)
+
+    shared = SharedArrays(task['layout'], task['shm'])
+    try:
+        i = task['index']
+        shared['psd_sum'][i] = analyzer.psd_sum
+        shared['max_hold'][i] = analyzer.max_hold
+        shared['occupied'][i] = analyzer.occupied_bins
+        shared['spectrogram'][first_row:first_row + rows] = analyzer.spectrogram.power()[:rows]
+    finally:
+        shared.close()
+    return {
+        'index': task['index'],
+        'stats': analyzer.stats,
+        'frames': analyzer.frames,
+        'head': analyzer.head,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+# ============================================================================
+# Batch
+# ============================================================================
+
+class _Job:
+    """One recording in flight: its shared arrays and the chunk results received so far"""
+
+    def __init__(self, order: int, recording: Recording, options: Dict):
+        self.order = order
+        self.recording = recording
+        self.options = dict(options)
+        hop = options['hop']
+        self.frames_per_row, self.total_rows, self.chunks = plan_chunks(
+            recording.count, options['nfft'], hop, options['max_rows'], options['chunk_samples'])
+        self.options['frames_per_row'] = self.frames_per_row
+        n, nfft = len(self.chunks), options['nfft']
+        self.layout = {
+            'psd_sum': ((n, nfft), 'float64'),
+            'max_hold': ((n, nfft), 'float32'),
+            'occupied': ((n, nfft), 'int64'),
+            'spectrogram': ((max(self.total_rows, 1), nfft), 'float32'),
+        }
+        self.shared = SharedArrays(self.layout)
+        self.results: List[Dict] = []
+        self.outstanding = len(self.chunks)
+        self.error: Optional[str] = None
+        self.started = time.perf_counter()
+
+    def tasks(self) -> Iterator[Dict]:
+        for index, chunk in enumerate(self.chunks):
+            yield {'recording': self.recording, 'options': self.options, 'chunk': chunk, 'index': index,
+                   'last': index == len(self.chunks) - 1, 'layout': self.layout, 'shm': self.shared.name}
+
+    def assemble(self) -> SpectrumAnalyzer:
+        """A SpectrumAnalyzer holding the merged chunks, as if the file had been read in one pass"""
+        o = self.options
+        analyzer = SpectrumAnalyzer(self.recording.sample_rate, o['nfft'], o['overlap'], o['max_rows'],
+                                    occupancy_db=o['occupancy_db'], frames_per_row=self.frames_per_row)
+        for result in sorted(self.results, key=lambda r: r['index']):
+            analyzer.stats.merge(result['stats'])
+            analyzer.frames += result['frames']
+            if result['index'] == 0:
+                analyzer.head = result['head']
+        analyzer.psd_sum[:] = self.shared['psd_sum'].sum(axis=0)
+        analyzer.max_hold[:] = self.shared['max_hold'].max(axis=0)
+        analyzer.occupied_bins[:] = self.shared['occupied'].sum(axis=0)
+        analyzer.spectrogram.rows[:self.total_rows] = self.shared['spectrogram'][:self.total_rows]
+        analyzer.spectrogram.n_rows = self.total_rows
+        return analyzer
+
+    def release(self):
+        self.shared.close(unlink=True)
+
+
+def summary_row(path: str, recording: Optional[Recording], analyzer: Optional[SpectrumAnalyzer],
+                peak_count: int, min_spacing_hz: Optional[float]) -> Dict:
+    """One line of the batch table"""
+    row: Dict = {column: None for column in COLUMNS}
+    row['file'] = path
+    if recording is not None:
+        row.update(format=recording.format, sample_rate=recording.sample_rate, center_freq=recording.center_freq,
+                   lost_frames=recording.lost_frames)
+    if analyzer is None:
+        return row
+    summary = analyzer.summary(peak_count, min_spacing_hz)
+    offset = recording.center_freq or 0.0
+    psd_db = analyzer.psd_db()[1] if analyzer.frames else None
+    row.update(
+        samples=summary['samples'],
+        duration_s=round(summary['duration_s'], 6),
+        power_db=None if summary['power_db'] is None else round(summary['power_db'], 2),
+        mean_amplitude=round(summary['mean_amplitude'], 6),
+        max_amplitude=round(summary['max_amplitude'], 6),
+        dc_i=round(summary['dc_offset'][0], 6),
+        dc_q=round(summary['dc_offset'][1], 6),
+        noise_floor_db=None if psd_db is None else round(float(np.median(psd_db)), 2),
+        occupancy_pct=summary.get('occupancy_pct'),
+        peak_freqs_hz=[round(p['freq_hz'] + offset, 1) for p in summary['peaks']],
+        peak_levels_db=[p['max_db'] for p in summary['peaks']],
+    )
+    return row
+
+
+def analyze_recordings(paths: Sequence[str], workers: Optional[int] = None, sample_rate: float = 2e6,
+                       center_freq: Optional[float] = None, nfft: int = DEFAULT_NFFT, overlap: float = 0.5,
+                       max_rows: int = DEFAULT_MAX_ROWS, occupancy_db: float = 10.0, peak_count: int = 10,
+                       min_spacing_hz: Optional[float] = None, chunk_samples: int = DEFAULT_CHUNK_SAMPLES,
+                       block_size: int = DEFAULT_BLOCK_SIZE, plot_dir: Optional[str] = None,
+                       on_analyzer: Optional[Callable[[str, SpectrumAnalyzer], None]] = None,
+                       verbose: bool = False) -> List[Dict]:
+    """
+    Analyze recordings on a pool of ``workers`` processes (default: all cores); one summary dict per path
+
+    ``sample_rate``/``center_freq`` apply to raw files (framed files carry
+    their own). A recording that cannot be read gets a row with ``error``
+    set instead of stopping the batch. At most two recordings per worker
+    are in flight, which bounds the shared memory in use. ``on_analyzer``
+    is called with (path, SpectrumAnalyzer) for every recording analyzed.
+    """
+    workers = workers or os.cpu_count() or 1
+    options = {'nfft': nfft, 'overlap': overlap, 'hop': max(1, int(round(nfft * (1 - overlap)))),
+               'max_rows': max_rows, 'occupancy_db': occupancy_db, 'chunk_samples': chunk_samples,
+               'block_size': block_size}
+    if plot_dir:
+        os.makedirs(plot_dir, exist_ok=True)
+    rows: Dict[int, Dict] = {}
+    pending: Dict = {}  # future -> job
+    jobs_in_flight = 0
+    plot_warned = False
+
+    def finish(job: _Job):
+        nonlocal plot_warned
+        row = summary_row(job.recording.path, job.recording, None, peak_count, min_spacing_hz)
+        try:
+            if job.error is None:
+                analyzer = job.assemble()
+                row = summary_row(job.recording.path, job.recording, analyzer, peak_count, min_spacing_hz)
+                if on_analyzer:
+                    on_analyzer(job.recording.path, analyzer)
+                if plot_dir and analyzer.frames:
+                    target = os.path.join(plot_dir, os.path.basename(job.recording.path) + '.png')
+                    try:
+                        plot(analyzer, target, title=job.recording.path)
+                        row['plot'] = target
+                    except ImportError:
+                        if not plot_warned:
+                            print("matplotlib not installed; skipping plots", file=sys.stderr)
+                            plot_warned = True
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+        finally:
+            job.release()
+        row['error'] = job.error
+        row['chunks'] = len(job.chunks)
+        row['seconds'] = round(time.perf_counter() - job.started, 3)
+        rows[job.order] = row
+        if verbose:
+            outcome = job.error or f"{row['duration_s']:.2f}s of IQ in {row['chunks']} chunks"
+            print(f"{job.recording.path}: {outcome} ({row['seconds']:.2f}s)", file=sys.stderr)
+
+    def collect():
+        nonlocal jobs_in_flight
+        done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+        for future in done:
+            job = pending.pop(future)
+            job.outstanding -= 1
+            if job.error is None:
+                try:
+                    job.results.append(future.result())
+                except Exception as e:  # Reported in the recording's row; its other chunks still run
+                    job.error = f"{type(e).__name__}: {e}"
+            if job.outstanding == 0:
+                finish(job)
+                jobs_in_flight -= 1
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        try:
+            for order, path in enumerate(paths):
+                recording = None
+                try:
+                    recording = Recording(path, sample_rate, center_freq)
+                    job = _Job(order, recording, options)  # Fails when /dev/shm cannot hold its arrays
+                except Exception as e:
+                    rows[order] = dict(summary_row(path, recording, None, peak_count, None),
+                                       error=f"{type(e).__name__}: {e}")
+                    continue
+                jobs_in_flight += 1
+                for task in job.tasks():
+                    pending[pool.submit(_analyze_chunk, task)] = job
+                while jobs_in_flight >= 2 * workers:
+                    collect()
+            while pending:
+                collect()
+        finally:
+            # Interrupted (Ctrl-C, a failing callback): stop the queued chunks and unlink every
+            # recording still in flight instead of leaving its segment to the resource tracker
+            pool.shutdown(wait=True, cancel_futures=True)
+            for job in {id(job): job for job in pending.values()}.values():
+                job.release()
+    return [rows[i] for i in sorted(rows)]
+
+
+# ============================================================================
+# Output
+# ============================================================================
+
+def write_table(rows: List[Dict], f, as_json: bool = False):
+    """CSV (lists joined with ';') or a JSON array"""
+    if as_json:
+        json.dump(rows, f, indent=2)
+        f.write("\n")
+        return
+    writer = csv.DictWriter(f, fieldnames=COLUMNS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({key: ';'.join(str(v) for v in value) if isinstance(value, list) else
+                         ('' if value is None else value) for key, value in row.items()})
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Analyze many IQ recordings in parallel into one summary table',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Every *.cf32 and *.iq in a directory, CSV on stdout
+  python3 batch.py captures/
+
+  # A glob, 8 processes, JSON to a file, with a PNG per recording
+  python3 batch.py 'archive/2024-*/*.iq' --workers 8 --json --output summary.json --plot-dir plots/
+        """
+    )
+    parser.add_argument('inputs', nargs='+', help='Recordings, directories or quoted globs')
+    parser.add_argument('--workers', '-j', type=int, help='Worker processes (default: all cores)')
+    parser.add_argument('--rate', type=float, default=2e6, help='Sample rate of raw files in S/s (default: 2e6)')
+    parser.add_argument('--center', type=float, help='Center frequency of raw files in Hz (peaks become absolute)')
+    parser.add_argument('--nfft', type=int, default=DEFAULT_NFFT, help=f'FFT size (default: {DEFAULT_NFFT})')
+    parser.add_argument('--overlap', type=float, default=0.5, help='Frame overlap, 0-1 (default: 0.5)')
+    parser.add_argument('--rows', type=int, default=DEFAULT_MAX_ROWS,
+                        help=f'Max spectrogram rows (default: {DEFAULT_MAX_ROWS})')
+    parser.add_argument('--occupancy', type=float, default=10.0,
+                        help='A bin is occupied this many dB above its frame median (default: 10)')
+    parser.add_argument('--peaks', type=int, default=10, help='Peaks per recording (default: 10)')
+    parser.add_argument('--spacing', type=float, help='Min Hz between reported peaks (default: 3 FFT bins)')
+    parser.add_argument('--chunk', type=int, default=DEFAULT_CHUNK_SAMPLES,
+                        help=f'Samples per task (default: {DEFAULT_CHUNK_SAMPLES})')
+    parser.add_argument('--pattern', action='append', help='File pattern for directories (default: *.cf32, *.iq)')
+    parser.add_argument('--json', action='store_true', help='Write a JSON array instead of CSV')
+    parser.add_argument('--output', '-o', help='Write the table here (default: stdout)')
+    parser.add_argument('--plot-dir', help='Also write <dir>/<file>.png per recording (needs matplotlib)')
+    args = parser.parse_args()
+
+    paths = expand_inputs(args.inputs, args.pattern or DEFAULT_PATTERNS)
+    if not paths:
+        parser.error("no recordings found")
+    workers = args.workers or os.cpu_count() or 1
+    total_bytes = sum(os.path.getsize(p) for p in paths if os.path.isfile(p))
+    print(f"Analyzing {len(paths)} recordings ({total_bytes / 1e6:.1f} MB) on {workers} processes", file=sys.stderr)
+
+    started = time.time()
+    rows = analyze_recordings(paths, workers, args.rate, args.center, args.nfft, args.overlap, args.rows,
+                              args.occupancy, args.peaks, args.spacing, args.chunk, plot_dir=args.plot_dir,
+                              verbose=True)
+    out = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        write_table(rows, out, args.json)
+    finally:
+        if args.output:
+            out.close()
+
+    elapsed = time.time() - started
+    failed = sum(1 for row in rows if row['error'])
+    print(f"Done in {elapsed:.2f}s ({total_bytes / 1e6 / max(elapsed, 1e-9):.1f} MB/s)"
+          f"{f', {failed} failed' if failed else ''}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,22 +1,407 @@
-import SoapySDR
-from SoapySDR import * # SOAPY_SDR_ constants
+#!/usr/bin/env python3
+"""
+SDR Capture Engine
+Streams IQ from a radio (SoapySDR), the simulator or a file to stdout/a file,
+as raw complex64 or framed and optionally quantized (see iqframe.py)
+
+Samples are read into a preallocated ring of large blocks; a writer thread
+writes each filled block as a zero-copy memoryview, so the read loop never
+waits on the sink. If the sink falls behind and the ring is full, the source
+is still drained (into a scratch block) and the loss is counted instead of
+letting the radio overflow silently. In framed output every block read
+takes a sequence number, dropped ones included, so the loss is also visible
+to whoever reads the stream.
+
+Usage:
+    python3 capture.py --freq 99.9e6 --rate 2e6 > capture.cf32        # RTL-SDR via SoapySDR
+    python3 capture.py --source sim --duration 5 --output capture.cf32
+    python3 capture.py --source file --input old.cf32 --block-size 1048576 | python3 decode-sim.py
+    python3 capture.py --freq 851e6 --format cs8 --output capture.iq      # framed, 4x smaller
+"""
+
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+from typing import BinaryIO, Dict, Optional
+
 import numpy as np
-import sys, time
 
-# Device setup (example: LimeSDR or RTL-SDR)
-args = dict(driver="rtlsdr")
-sdr = SoapySDR.Device(args)
-sdr.setSampleRate(SOAPY_SDR_RX, 0, 2e6)
-sdr.setFrequency(SOAPY_SDR_RX, 0, 99.9e6)
-sdr.setGain(SOAPY_SDR_RX, 0, 30)
+from iqframe import DTYPES, FrameWriter
+from simulator import SCENARIOS, IQSimulator, Pacer, build_scenario
+
+# readStream status codes (same values as SoapySDR's SOAPY_SDR_* errors)
+TIMEOUT = -1
+OVERFLOW = -4
+
+DEFAULT_BLOCK_SIZE = 1 << 18  # 256k samples = 2 MB, ~131 ms at 2 MS/s
+DEFAULT_RING_BLOCKS = 16
+
+
+class CaptureError(Exception):
+    """The source reported an unrecoverable error"""
+
+
+# ============================================================================
+# Sources
+# ============================================================================
+
+class Source:
+    """
+    Sample source interface
+
+    ``read`` fills the start of ``buf`` and returns the number of samples
+    written, or a negative status (TIMEOUT, OVERFLOW, other SoapySDR errors).
+    It raises EOFError when a finite source is exhausted. A ``live`` source
+    (a radio) keeps producing whether or not it is read, so the engine drops
+    blocks rather than stall it; other sources are simply read more slowly.
+    """
+
+    sample_rate: float = 2e6
+    center_freq: float = 0.0
+    live: bool = False
+
+    def start(self):
+        pass
+
+    def read(self, buf: np.ndarray) -> int:
+        raise NotImplementedError
+
+    def stop(self):
+        pass
+
+
+class SoapySource(Source):
+    """SoapySDR receive stream (CF32), e.g. an RTL-SDR or LimeSDR"""
+
+    live = True
+
+    def __init__(self, driver: str = 'rtlsdr', sample_rate: float = 2e6, center_freq: float = 99.9e6,
+                 gain: float = 30.0, channel: int = 0, timeout: float = 1.0, device_args: Optional[Dict] = None):
+        import SoapySDR  # Only needed with a radio attached
+        from SoapySDR import SOAPY_SDR_CF32, SOAPY_SDR_RX
+
+        self.sample_rate = sample_rate
+        self.center_freq = center_freq
+        self.channel = channel
+        self.timeout_us = int(timeout * 1e6)
+        self.device = SoapySDR.Device(dict(device_args or {}, driver=driver))
+        self.device.setSampleRate(SOAPY_SDR_RX, channel, sample_rate)
+        self.device.setFrequency(SOAPY_SDR_RX, channel, center_freq)
+        self.device.setGain(SOAPY_SDR_RX, channel, gain)
+        self.stream = self.device.setupStream(SOAPY_SDR_RX, SOAPY_SDR_CF32, [channel])
+
+    def start(self):
+        self.device.activateStream(self.stream)
+
+    def read(self, buf: np.ndarray) -> int:
+        return self.device.readStream(self.stream, [buf], len(buf), timeoutUs=self.timeout_us).ret
+
+    def stop(self):
+        self.device.deactivateStream(self.stream)
+        self.device.closeStream(self.stream)
+
+
+class SimSource(Source):
+    """
+    Samples from the IQ simulator (see simulator.py)
+
+    With ``realtime`` the output is paced to the sample rate and the source
+    counts as live, so a slow sink causes counted drops as with a radio.
+    """
+
+    def __init__(self, sample_rate: float = 2e6, center_freq: float = 99.9e6, tone_freq: float = 1e3,
+                 amplitude: float = 0.5, scenario: str = 'tone', duration: Optional[float] = None,
+                 realtime: bool = False, seed: int = 0):
+        self.sample_rate = sample_rate
+        self.center_freq = center_freq
+        self.live = realtime
+        self.simulator = IQSimulator(build_scenario(scenario, sample_rate, seed, tone_freq, amplitude), sample_rate)
+        self.remaining = None if duration is None else int(round(duration * sample_rate))
+        self._pacer = Pacer(sample_rate) if realtime else None
+
+    def read(self, buf: np.ndarray) -> int:
+        n = len(buf) if self.remaining is None else min(len(buf), self.remaining)
+        if n == 0:
+            raise EOFError
+        self.simulator.generate(buf[:n])
+        if self._pacer:
+            self._pacer.wait(n)
+        if self.remaining is not None:
+            self.remaining -= n
+        return n
+
+
+class FileSource(Source):
+    """Raw complex64 samples from a file or pipe, read straight into the block"""
+
+    def __init__(self, f: BinaryIO, sample_rate: float = 2e6, center_freq: float = 0.0):
+        self.f = f
+        self.sample_rate = sample_rate
+        self.center_freq = center_freq
+        self._tail = b''
+
+    def read(self, buf: np.ndarray) -> int:
+        raw = buf.view(np.uint8)
+        got = len(self._tail)
+        raw[:got] = np.frombuffer(self._tail, np.uint8)
+        while got < len(raw):
+            n = self.f.readinto(memoryview(raw)[got:])
+            if not n:
+                break
+            got += n
+        whole = got - got % 8
+        self._tail = bytes(raw[whole:got])
+        if whole == 0:
+            raise EOFError
+        return whole // 8
+
+
+# ============================================================================
+# Engine
+# ============================================================================
+
+class CaptureEngine:
+    """
+    Reads a Source into a ring of preallocated blocks; a writer thread drains them to ``sink``
+
+    Counters (``stats``):
+        blocks / samples / bytes_written  delivered to the sink
+        overflows     source-reported overflows (samples lost in the radio)
+        timeouts      reads that returned no data in time
+        dropped_blocks / dropped_samples  read but discarded because the ring was full
+        max_queued    high-water mark of filled blocks waiting for the writer
+
+    Blocks are only dropped for live sources; ``drop_when_full`` overrides that.
+    With a ``frame_writer`` blocks go to its stream as frames instead of raw
+    to ``sink``, timestamped from the start of the run at the sample rate.
+    """
+
+    def __init__(self, source: Source, sink: Optional[BinaryIO], block_size: int = DEFAULT_BLOCK_SIZE,
+                 ring_blocks: int = DEFAULT_RING_BLOCKS, max_errors: int = 10, on_block=None,
+                 drop_when_full: Optional[bool] = None, frame_writer: Optional[FrameWriter] = None):
+        self.source = source
+        self.frame_writer = frame_writer
+        if frame_writer is not None:
+            sink = frame_writer.f
+        self.drop_when_full = source.live if drop_when_full is None else drop_when_full
+        self.sink = sink
+        self.block_size = block_size
+        self.max_errors = max_errors
+        self.on_block = on_block
+        self.ring = [np.empty(block_size, np.complex64) for _ in range(ring_blocks)]
+        self._views = [memoryview(block.view(np.uint8)) for block in self.ring]
+        self._scratch = np.empty(block_size, np.complex64)
+        self._free: queue.Queue = queue.Queue()
+        self._filled: queue.Queue = queue.Queue()
+        for index in range(ring_blocks):
+            self._free.put(index)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.stats = {
+            'blocks': 0, 'samples': 0, 'bytes_written': 0,
+            'overflows': 0, 'timeouts': 0, 'errors': 0,
+            'dropped_blocks': 0, 'dropped_samples': 0, 'max_queued': 0
+        }
+        self.write_error: Optional[BaseException] = None
+
+    def stop(self):
+        """Ask run() to finish after the current block"""
+        self._stop.set()
+
+    def _fill(self, block: np.ndarray, limit: int) -> int:
+        """Read until ``limit`` samples are in the block; returns the count (short only at EOF/stop)"""
+        filled = 0
+        errors = 0
+        while filled < limit and not self._stop.is_set():
+            try:
+                ret = self.source.read(block[filled:limit])
+            except EOFError:
+                if filled == 0:
+                    raise
+                break
+            if ret > 0:
+                filled += ret
+                errors = 0
+            elif ret == OVERFLOW:
+                self.stats['overflows'] += 1
+            elif ret == TIMEOUT:
+                self.stats['timeouts'] += 1
+            elif ret < 0:
+                self.stats['errors'] += 1
+                errors += 1
+                if errors >= self.max_errors:
+                    raise CaptureError(f"readStream failed {errors} times in a row (last status {ret})")
+        return filled
+
+    def _writer(self):
+        while True:
+            item = self._filled.get()
+            if item is None:
+                return
+            index, n, sequence, timestamp = item
+            try:
+                if self.write_error is None:
+                    if self.on_block:
+                        self.on_block(self.ring[index][:n])
+                    written = n * 8
+                    if self.frame_writer is not None:
+                        written = self.frame_writer.write(self.ring[index][:n], sequence, timestamp)
+                    elif self.sink is not None:
+                        self.sink.write(self._views[index][:n * 8])
+                    with self._lock:
+                        self.stats['blocks'] += 1
+                        self.stats['samples'] += n
+                        self.stats['bytes_written'] += written
+            except BaseException as e:  # Broken pipe etc.: stop reading, report after join
+                self.write_error = e
+                self._stop.set()
+            finally:
+                self._free.put(index)
+
+    def _next_free(self) -> Optional[int]:
+        """A free ring slot; None if the ring is full (drop mode) or on stop()"""
+        if self.drop_when_full:
+            try:
+                return self._free.get_nowait()
+            except queue.Empty:
+                return None
+        while not self._stop.is_set():
+            try:
+                return self._free.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def run(self, max_samples: Optional[int] = None) -> Dict:
+        """Capture until the source ends, ``max_samples`` are read or stop() is called"""
+        writer = threading.Thread(target=self._writer, name='capture-writer', daemon=True)
+        writer.start()
+        self.source.start()
+        remaining = max_samples
+        started = time.time()
+        sequence = 0
+        samples_read = 0  # Including dropped blocks, for frame timestamps
+        try:
+            while not self._stop.is_set() and (remaining is None or remaining > 0):
+                limit = self.block_size if remaining is None else min(self.block_size, remaining)
+                index = self._next_free()
+                if index is None and not self.drop_when_full:
+                    break  # Stopped while waiting for the writer
+
+                block = self.ring[index] if index is not None else self._scratch
+                try:
+                    n = self._fill(block, limit)
+                except EOFError:
+                    if index is not None:
+                        self._free.put(index)
+                    break
+
+                if remaining is not None:
+                    remaining -= n
+                timestamp = started + samples_read / self.source.sample_rate
+                samples_read += n
+                if index is None:
+                    # Writer is behind: keep the radio drained, count the loss
+                    self.stats['dropped_blocks'] += 1
+                    self.stats['dropped_samples'] += n
+                    sequence += 1
+                elif n:
+                    self._filled.put((index, n, sequence, timestamp))
+                    sequence += 1
+                    self.stats['max_queued'] = max(self.stats['max_queued'], self._filled.qsize())
+                else:
+                    self._free.put(index)
+        finally:
+            self.source.stop()
+            self._filled.put(None)
+            writer.join()
+            if self.sink is not None and self.write_error is None:
+                try:
+                    self.sink.flush()
+                except (BrokenPipeError, OSError) as e:
+                    self.write_error = e
+        if self.write_error is not None and not isinstance(self.write_error, BrokenPipeError):
+            raise self.write_error
+        return dict(self.stats)
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Capture IQ samples to stdout or a file',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # RTL-SDR at 99.9 MHz, 2 MS/s, to a file
+  python3 capture.py --freq 99.9e6 --rate 2e6 --output capture.cf32
+
+  # No radio: simulated tone for 10 seconds, piped into the analyzer
+  python3 capture.py --source sim --duration 10 | python3 decode-sim.py
+
+  # Framed 8-bit IQ (a quarter of the bytes); readers take rate and frequency from the headers
+  python3 capture.py --freq 851e6 --format cs8 --output capture.iq
+        """
+    )
+    parser.add_argument('--source', choices=['soapy', 'sim', 'file'], default='soapy')
+    parser.add_argument('--driver', default='rtlsdr', help='SoapySDR driver (default: rtlsdr)')
+    parser.add_argument('--rate', type=float, default=2e6, help='Sample rate in S/s (default: 2e6)')
+    parser.add_argument('--freq', type=float, default=99.9e6, help='Center frequency in Hz (default: 99.9e6)')
+    parser.add_argument('--gain', type=float, default=30.0, help='Gain in dB (default: 30)')
+    parser.add_argument('--scenario', choices=SCENARIOS, default='tone',
+                        help='Simulator scenario for --source sim (default: tone)')
+    parser.add_argument('--realtime', action='store_true',
+                        help='Pace --source sim to the sample rate (behaves like a radio)')
+    parser.add_argument('--input', '-i', help='Input file for --source file (default: stdin)')
+    parser.add_argument('--output', '-o', help='Output file (default: stdout)')
+    parser.add_argument('--format', choices=['raw'] + list(DTYPES), default='raw',
+                        help='raw = headerless complex64, else framed cf32/cs16/cs8 (default: raw)')
+    parser.add_argument('--duration', type=float, help='Stop after this many seconds of samples')
+    parser.add_argument('--block-size', type=int, default=DEFAULT_BLOCK_SIZE,
+                        help=f'Samples per block (default: {DEFAULT_BLOCK_SIZE})')
+    parser.add_argument('--ring', type=int, default=DEFAULT_RING_BLOCKS,
+                        help=f'Blocks in the buffer ring (default: {DEFAULT_RING_BLOCKS})')
+    parser.add_argument('--stats', action='store_true', help='Print capture counters as JSON on exit')
+    args = parser.parse_args()
+
+    input_file = None
+    if args.source == 'soapy':
+        source = SoapySource(args.driver, args.rate, args.freq, args.gain)
+    elif args.source == 'sim':
+        source = SimSource(args.rate, args.freq, scenario=args.scenario, duration=args.duration,
+                           realtime=args.realtime)
+    else:
+        input_file = open(args.input, 'rb') if args.input else sys.stdin.buffer
+        source = FileSource(input_file, args.rate, args.freq)
+
+    sink = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    frame_writer = None if args.format == 'raw' else FrameWriter(sink, args.rate, args.freq, args.format)
+    engine = CaptureEngine(source, sink, args.block_size, args.ring, frame_writer=frame_writer)
+    max_samples = int(args.duration * args.rate) if args.duration else None
+    started = time.time()
+    try:
+        stats = engine.run(max_samples)
+    except KeyboardInterrupt:
+        engine.stop()
+        stats = dict(engine.stats)
+    finally:
+        if args.output:
+            sink.close()
+        if args.input:
+            input_file.close()
 
-rxStream = sdr.setupStream(SOAPY_SDR_RX, SOAPY_SDR_CF32)
-sdr.activateStream(rxStream)
+    elapsed = time.time() - started
+    lost = stats['overflows'] + stats['dropped_blocks']
+    print(f"Captured {stats['samples'] / args.rate:.2f}s of samples in {elapsed:.2f}s"
+          f"{f' ({lost} overflow/drop events)' if lost else ''}", file=sys.stderr)
+    if args.stats:
+        print(json.dumps(dict(stats, elapsed_seconds=round(elapsed, 3))), file=sys.stderr)
 
-buff = np.array([0]*1024, np.complex64)
 
-while True:
-    sr = sdr.readStream(rxStream, [buff], len(buff))
-    iq = buff.tobytes()  # Convert to bytes
-    sys.stdout.buffer.write(iq)
-    sys.stdout.flush()
+if __name__ == '__main__':
+    main()
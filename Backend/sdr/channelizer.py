@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Polyphase Channelizer
+Splits one wideband complex64 IQ stream into many decimated narrowband channels at once
+
+A uniform polyphase filterbank divides the band into ``M = sample_rate /
+channel_spacing`` channels. Every output step costs one pass over the
+prototype filter plus one M-point FFT, which produces all M channels; the ones
+nearest the requested center frequencies are kept and shifted by a small
+phase-continuous correction so each lands exactly at 0 Hz. Channels are 2x
+oversampled by default (output rate = 2 * channel_spacing), so signals near
+a channel edge are not aliased.
+
+The filter history is carried between blocks: feeding a stream in blocks of
+any size gives the same output as feeding it all at once.
+
+Usage:
+    python3 capture.py --freq 99.9e6 | python3 channelizer.py --center 99.9e6 \
+        --freqs 99.4125e6,99.9e6,100.5e6 --output-dir channels/
+
+    from channelizer import Channelizer
+
+    ch = Channelizer(2e6, [99.4125e6, 99.9e6, 100.5e6], center_freq=99.9e6)
+    for block in blocks:
+        out = ch.process(block)     # (3, len(block) / 80) complex64 at ch.output_rate
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import List, Sequence
+
+import numpy as np
+import scipy.fft
+from scipy.signal import firwin
+
+from spectrum import DEFAULT_BLOCK_SIZE, open_iq
+
+DEFAULT_SPACING = 12.5e3
+DEFAULT_TAPS_PER_CHANNEL = 12
+
+
+class Channelizer:
+    """
+    Stateful polyphase analysis filterbank
+
+    sample_rate        input rate in S/s
+    channel_freqs      channel centers in Hz (absolute, relative to ``center_freq``)
+    channel_spacing    filterbank channel width in Hz; ``num_channels`` overrides it
+    oversample         output samples per channel width (1 = critically sampled)
+    taps_per_channel   prototype filter length / M: sharper edges, more work
+    """
+
+    def __init__(self, sample_rate: float, channel_freqs: Sequence[float], center_freq: float = 0.0,
+                 channel_spacing: float = DEFAULT_SPACING, num_channels: int = None, oversample: int = 2,
+                 taps_per_channel: int = DEFAULT_TAPS_PER_CHANNEL, kaiser_beta: float = 8.0):
+        M = num_channels or int(round(sample_rate / channel_spacing))
+        if M < 2 or M % oversample:
+            raise ValueError(f"channel count {M} must be >= 2 and divisible by oversample={oversample}")
+        self.sample_rate = sample_rate
+        self.center_freq = center_freq
+        self.num_channels = M
+        self.oversample = oversample
+        self.decimation = M // oversample
+        self.output_rate = sample_rate / self.decimation
+        self.channel_freqs: List[float] = [float(f) for f in channel_freqs]
+
+        offsets = np.asarray(self.channel_freqs, np.float64) - center_freq
+        if offsets.size == 0:
+            raise ValueError("no channel frequencies given")
+        if np.any(np.abs(offsets) > sample_rate / 2):
+            raise ValueError(f"channel frequencies must lie within {center_freq:.0f} +/- {sample_rate / 2:.0f} Hz")
+        nearest = np.round(offsets / (sample_rate / M))
+        self.bins = nearest.astype(np.int64) % M
+        self.residual_hz = offsets - nearest * sample_rate / M
+
+        # Prototype lowpass, -6 dB at the channel edge, unity gain at DC
+        self.taps_per_channel = taps_per_channel
+        taps = firwin(M * taps_per_channel, 1.0 / M, window=('kaiser', kaiser_beta))
+        self.taps = taps
+        # Reversed and cut into rows of ``decimation`` samples: row i weights input row i of the window
+        self._rows = taps[::-1].reshape(taps_per_channel * oversample, self.decimation).astype(np.float32)
+        self._rotation = np.exp(-2j * np.pi * np.arange(oversample) / oversample).astype(np.complex64)
+        self._nco_step = -2 * np.pi * self.residual_hz / self.output_rate
+        self.reset()
+
+    def reset(self):
+        """Forget the filter history (start of a new, unrelated stream)"""
+        self._history = np.zeros((self.decimation, len(self._rows) - 1), np.complex64)
+        self._pending = np.empty(0, np.complex64)
+        self._nco_phase = np.zeros(len(self.bins), np.float64)
+        self.outputs = 0
+        self.samples_in = 0
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Consume wideband samples; returns (channels, n) complex64, one row per requested frequency"""
+        self.samples_in += len(block)
+        D = self.decimation
+        data = np.concatenate((self._pending, block)) if len(self._pending) else block
+        n = len(data) // D
+        self._pending = np.array(data[n * D:], np.complex64)
+        if n == 0:
+            return np.empty((len(self.bins), 0), np.complex64)
+
+        # Input rows of D samples, stored transposed (D, rows) so the inner loops run along time
+        h = self._history.shape[1]
+        rows = np.empty((D, h + n), np.complex64)
+        rows[:, :h] = self._history
+        rows[:, h:] = data[:n * D].reshape(n, D).T
+        Q = self.oversample
+        branches = np.zeros((Q, D, n), np.complex64)
+        product = np.empty((D, n), np.complex64)
+        for i, weights in enumerate(self._rows):
+            np.multiply(rows[:, i:i + n], weights[:, None], out=product)
+            branches[i % Q] += product
+        self._history = rows[:, n:].copy()
+
+        spectra = scipy.fft.fft(branches.reshape(self.num_channels, n), axis=0, overwrite_x=True)
+        out = spectra[self.bins]
+
+        steps = np.arange(n)
+        if Q > 1:
+            # Mixer phase at each output instant: exp(-2j*pi*k*(t+1)/M), t+1 a multiple of D
+            out *= self._rotation[(self.bins[:, None] * (self.outputs + 1 + steps)) % Q]
+        if np.any(self.residual_hz):
+            phase = self._nco_phase[:, None] + self._nco_step[:, None] * steps
+            out *= np.exp(1j * phase).astype(np.complex64)
+            self._nco_phase = (self._nco_phase + self._nco_step * n) % (2 * np.pi)
+        self.outputs += n
+        return out
+
+    def delay(self) -> float:
+        """Filter group delay in output samples"""
+        return (len(self.taps) - 1) / 2 / self.decimation
+
+
+def parse_freqs(text: str) -> List[float]:
+    """'99.4125e6,99.9e6' -> [99412500.0, 99900000.0]"""
+    return [float(f) for f in text.split(',') if f.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Split wideband complex64 IQ into narrowband channel files',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Three channels out of a live 2 MS/s capture, one .cf32 file each
+  python3 capture.py --freq 99.9e6 | python3 channelizer.py --center 99.9e6 \\
+      --freqs 99.4125e6,99.9e6,100.5e6 --output-dir channels/
+
+  # Offsets from the center of a simulated recording
+  python3 sim-capture.py --scenario bursty | python3 channelizer.py --freqs=-500e3,-125e3,200e3,450e3
+        """
+    )
+    parser.add_argument('input', nargs='?', help='IQ file, raw complex64 or framed (default: stdin)')
+    parser.add_argument('--freqs', required=True, type=parse_freqs, help='Comma-separated channel centers in Hz')
+    parser.add_argument('--center', type=float,
+                        help='Center frequency of the input in Hz (default: from the frame headers, else 0)')
+    parser.add_argument('--rate', type=float,
+                        help='Input sample rate in S/s (default: from the frame headers, else 2e6)')
+    parser.add_argument('--spacing', type=float, default=DEFAULT_SPACING,
+                        help=f'Channel spacing in Hz (default: {DEFAULT_SPACING:g})')
+    parser.add_argument('--oversample', type=int, default=2, help='Output oversampling factor (default: 2)')
+    parser.add_argument('--taps', type=int, default=DEFAULT_TAPS_PER_CHANNEL,
+                        help=f'Filter taps per channel (default: {DEFAULT_TAPS_PER_CHANNEL})')
+    parser.add_argument('--block-size', type=int, default=DEFAULT_BLOCK_SIZE,
+                        help=f'Samples per block (default: {DEFAULT_BLOCK_SIZE})')
+    parser.add_argument('--output-dir', '-o', default='channels', help='Directory for <freq>.cf32 files')
+    args = parser.parse_args()
+
+    blocks, reader = open_iq(args.input, args.block_size, sys.stdin.buffer)
+    rate = args.rate or (reader and reader.sample_rate) or 2e6
+    center = args.center if args.center is not None else (reader and reader.center_freq) or 0.0
+    try:
+        channelizer = Channelizer(rate, args.freqs, center, args.spacing,
+                                  oversample=args.oversample, taps_per_channel=args.taps)
+    except ValueError as e:
+        parser.error(str(e))
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    outputs = [open(os.path.join(args.output_dir, f"{int(round(freq))}.cf32"), 'wb') for freq in args.freqs]
+    print(f"{len(outputs)} channels of {channelizer.num_channels} at {channelizer.output_rate:g} S/s "
+          f"-> {args.output_dir}/", file=sys.stderr)
+
+    started = time.time()
+    try:
+        for block in blocks:
+            for f, channel in zip(outputs, channelizer.process(block)):
+                f.write(memoryview(channel.view(np.uint8)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for f in outputs:
+            f.close()
+
+    elapsed = time.time() - started
+    print(f"Channelized {channelizer.samples_in / rate:.2f}s of samples in {elapsed:.2f}s "
+          f"({channelizer.samples_in / max(elapsed, 1e-9) / 1e6:.1f} MS/s)", file=sys.stderr)
+    if reader and reader.stats['lost_frames']:
+        print(f"{reader.stats['lost_frames']} input blocks lost upstream "
+              f"({reader.stats['gaps']} sequence gaps)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
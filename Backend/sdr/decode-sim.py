@@ -1,69 +1,106 @@
 #!/usr/bin/env python3
-import numpy as np
-import matplotlib.pyplot as plt
+"""
+Analyze IQ from a file or stdin: statistics, Welch spectrum, spectrogram and peaks
+
+Input is raw complex64 or framed IQ (iqframe.py, any sample type); framed
+input carries its own sample rate and center frequency.
+
+The recording is processed block by block (files are memory-mapped), so
+multi-GB captures are analyzed in constant memory. For many recordings at
+once, on all cores, see batch.py.
+
+Usage:
+    python3 sim-capture.py | python3 decode-sim.py
+    python3 decode-sim.py capture.cf32 --rate 2e6 --json
+    python3 sim-capture.py --format cs8 | python3 decode-sim.py
+"""
+
+import argparse
+import json
 import sys
 
-# Read IQ samples from stdin or file
-if len(sys.argv) > 1:
-    with open(sys.argv[1], 'rb') as f:
-        iq_bytes = f.read()
-else:
-    iq_bytes = sys.stdin.buffer.read()
-
-# Convert bytes back to complex samples
-iq = np.frombuffer(iq_bytes, dtype=np.complex64)
-sample_rate = 2e6  # Must match the generator
-
-print(f"Loaded {len(iq)} samples ({len(iq)/sample_rate:.2f} seconds)")
-
-# Analysis
-print(f"\nSignal Statistics:")
-print(f"  Mean amplitude: {np.mean(np.abs(iq)):.4f}")
-print(f"  Max amplitude: {np.max(np.abs(iq)):.4f}")
-print(f"  Power: {np.mean(np.abs(iq)**2):.4f}")
-
-# FFT to find the tone frequency
-fft_size = 8192
-fft_result = np.fft.fft(iq[:fft_size])
-fft_freq = np.fft.fftfreq(fft_size, 1/sample_rate)
-fft_mag = np.abs(fft_result)
-
-# Find peak frequency
-peak_idx = np.argmax(fft_mag)
-detected_freq = fft_freq[peak_idx]
-print(f"\nDetected tone frequency: {detected_freq/1e3:.2f} kHz")
-
-# Plot
-fig, axes = plt.subplots(3, 1, figsize=(12, 10))
-
-# Time domain
-samples_to_plot = min(1000, len(iq))
-axes[0].plot(np.real(iq[:samples_to_plot]), label='I (Real)', alpha=0.7)
-axes[0].plot(np.imag(iq[:samples_to_plot]), label='Q (Imaginary)', alpha=0.7)
-axes[0].set_xlabel('Sample')
-axes[0].set_ylabel('Amplitude')
-axes[0].set_title('Time Domain - I/Q Components')
-axes[0].legend()
-axes[0].grid(True)
-
-# Constellation diagram
-axes[1].scatter(np.real(iq[::100]), np.imag(iq[::100]), alpha=0.1, s=1)
-axes[1].set_xlabel('I (In-phase)')
-axes[1].set_ylabel('Q (Quadrature)')
-axes[1].set_title('Constellation Diagram')
-axes[1].axis('equal')
-axes[1].grid(True)
-
-# Frequency domain (spectrum)
-axes[2].plot(fft_freq[:fft_size//2]/1e3, 20*np.log10(fft_mag[:fft_size//2]))
-axes[2].set_xlabel('Frequency (kHz)')
-axes[2].set_ylabel('Magnitude (dB)')
-axes[2].set_title('Frequency Spectrum')
-axes[2].grid(True)
-axes[2].axvline(detected_freq/1e3, color='r', linestyle='--', label=f'Peak: {detected_freq/1e3:.2f} kHz')
-axes[2].legend()
-
-plt.tight_layout()
-plt.savefig('decoded_signal.png', dpi=150)
-print("\nPlot saved to decoded_signal.png")
-# plt.show()  # Comment out to avoid GUI popup
+from spectrum import DEFAULT_BLOCK_SIZE, DEFAULT_MAX_ROWS, DEFAULT_NFFT, analyze_blocks, open_iq, plot
+
+
+def print_report(summary):
+    print(f"Loaded {summary['samples']} samples ({summary['duration_s']:.2f} seconds)")
+    framing = summary.get('framing')
+    if framing:
+        print(f"Framed {framing['dtype']} at {framing['sample_rate'] / 1e6:g} MS/s, "
+              f"center {framing['center_freq'] / 1e6:.4f} MHz: {framing['frames']} frames, "
+              f"{framing['lost_frames']} lost in {framing['gaps']} gaps")
+
+    print("\nSignal Statistics:")
+    print(f"  Mean amplitude: {summary['mean_amplitude']:.4f}")
+    print(f"  Max amplitude: {summary['max_amplitude']:.4f}")
+    print(f"  Power: {summary['power']:.4f}")
+    print(f"  DC offset: {summary['dc_offset'][0]:+.4f} {summary['dc_offset'][1]:+.4f}j")
+
+    print(f"\nSpectrum: {summary['frames']} frames of {summary['nfft']} points, "
+          f"{summary['spectrogram_rows']} spectrogram rows of {summary['seconds_per_row']*1e3:.1f} ms")
+    peaks = summary['peaks']
+    if not peaks:
+        print("\nNo peaks above the noise floor")
+        return
+    print(f"\nDetected tone frequency: {peaks[0]['freq_hz']/1e3:.2f} kHz")
+    print("\nPeaks (whole capture):")
+    print(f"  {'Freq (kHz)':>12} {'Avg (dBFS)':>11} {'Max (dBFS)':>11}")
+    for peak in peaks:
+        print(f"  {peak['freq_hz']/1e3:>12.2f} {peak['avg_db']:>11.1f} {peak['max_db']:>11.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Streaming spectrum analysis of IQ recordings (raw complex64 or framed)',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Analyze the simulator output
+  python3 sim-capture.py | python3 decode-sim.py
+
+  # A large capture, finer resolution, machine-readable output
+  python3 decode-sim.py capture.cf32 --nfft 16384 --json > summary.json
+
+  # Skip the PNG (or when matplotlib is not installed)
+  python3 decode-sim.py capture.cf32 --no-plot
+        """
+    )
+    parser.add_argument('input', nargs='?', help='IQ file (default: stdin)')
+    parser.add_argument('--rate', type=float,
+                        help='Sample rate in S/s (default: from the frame headers, else 2e6)')
+    parser.add_argument('--nfft', type=int, default=DEFAULT_NFFT, help=f'FFT size (default: {DEFAULT_NFFT})')
+    parser.add_argument('--overlap', type=float, default=0.5, help='Frame overlap, 0-1 (default: 0.5)')
+    parser.add_argument('--rows', type=int, default=DEFAULT_MAX_ROWS,
+                        help=f'Max spectrogram rows (default: {DEFAULT_MAX_ROWS})')
+    parser.add_argument('--block-size', type=int, default=DEFAULT_BLOCK_SIZE,
+                        help=f'Samples per block (default: {DEFAULT_BLOCK_SIZE})')
+    parser.add_argument('--peaks', type=int, default=10, help='Peaks to report (default: 10)')
+    parser.add_argument('--spacing', type=float, help='Min Hz between reported peaks (default: 3 FFT bins)')
+    parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+    parser.add_argument('--plot', default='decoded_signal.png', help='PNG output (default: decoded_signal.png)')
+    parser.add_argument('--no-plot', action='store_true', help='Do not write a plot')
+    args = parser.parse_args()
+
+    blocks, reader = open_iq(args.input, args.block_size, sys.stdin.buffer)
+    rate = args.rate or (reader and reader.sample_rate) or 2e6
+    analyzer = analyze_blocks(blocks, rate, nfft=args.nfft, overlap=args.overlap, max_rows=args.rows)
+
+    summary = analyzer.summary(args.peaks, args.spacing)
+    if reader:
+        summary['framing'] = reader.summary()
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(summary)
+
+    if not args.no_plot and analyzer.frames:
+        try:
+            plot(analyzer, args.plot, title=args.input)
+        except ImportError:
+            print("matplotlib not installed; skipping plot (use --no-plot to silence)", file=sys.stderr)
+        else:
+            print(f"\nPlot saved to {args.plot}", file=sys.stderr if args.json else sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
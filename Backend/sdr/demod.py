@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+FM Demodulator
+Turns wideband complex64 IQ into 16 kHz signed 16-bit PCM audio for one channel
+
+Pipeline, run block by block with every filter's state carried over:
+
+    shift + low-pass + decimate   one-channel polyphase Channelizer (IF at 2x channel width)
+    quadrature discriminator      angle(x[n] * conj(x[n-1])), scaled so full deviation = 1.0
+    de-emphasis                   single-pole IIR (750 us for NFM, 75 us for broadcast FM)
+    resample                      stateful rational polyphase resampler to the audio rate
+
+At 2 MS/s in, 16 kHz int16 out is 16 MB/s down to 32 kB/s (500x less).
+With a squelch (squelch.py) only keyed stretches are demodulated and
+output, and CallWriter turns each transmission into a call record.
+
+Usage:
+    python3 sim-capture.py --scenario bursty | python3 demod.py --offset=-125e3 > audio.s16le
+    python3 capture.py --freq 99.9e6 | python3 demod.py --mode wfm | aplay -r 16000 -f S16_LE
+
+    from demod import FMDemodulator
+
+    demod = FMDemodulator(2e6, offset_hz=-125e3)
+    for block in blocks:
+        pcm = demod.process(block)          # int16, demod.audio_rate
+
+    squelched = FMDemodulator(2e6, offset_hz=-125e3, squelch={'hang_time': 0.5})
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import wave
+from fractions import Fraction
+from math import gcd
+from typing import Dict, List, Optional, TextIO, Tuple
+
+import numpy as np
+from scipy.signal import firwin, lfilter
+
+from channelizer import Channelizer
+from spectrum import DEFAULT_BLOCK_SIZE, open_iq
+from squelch import Squelch, call_record
+
+# mode: (channel width Hz, peak deviation Hz, de-emphasis time constant s)
+MODES = {
+    'nfm': (12.5e3, 2.5e3, 750e-6),
+    'wfm': (200e3, 75e3, 75e-6),
+}
+DEFAULT_AUDIO_RATE = 16000
+
+
+class Resampler:
+    """
+    Stateful rational resampler: ``rate * up / down`` with a polyphase FIR
+
+    Only the output samples are computed. Input history is kept between
+    calls, so a stream resampled in pieces matches resampling it whole.
+    """
+
+    def __init__(self, up: int, down: int, taps_per_phase: int = 16, kaiser_beta: float = 8.0):
+        g = gcd(up, down)
+        self.up, self.down = up // g, down // g
+        length = taps_per_phase * max(self.up, self.down)
+        length += -length % self.up
+        taps = firwin(length, 1.0 / max(self.up, self.down), window=('kaiser', kaiser_beta)) * self.up
+        self.taps_per_phase = length // self.up
+        # phases[p, j] = taps[j*up + p], reversed so a window x[i-J+1..i] lines up
+        self._phases = taps.reshape(self.taps_per_phase, self.up).T[:, ::-1].astype(np.float32)
+        self.reset()
+
+    def reset(self):
+        self._buf = np.zeros(self.taps_per_phase - 1, np.float32)
+        self._base = -(self.taps_per_phase - 1)  # Absolute input index of _buf[0]
+        self._next = 0  # Absolute index of the next output sample
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        buf = np.concatenate((self._buf, x.astype(np.float32, copy=False)))
+        end = self._base + len(buf)  # One past the last input index available
+        stop = -(-end * self.up // self.down)  # Outputs whose newest input is < end
+        m = np.arange(self._next, stop, dtype=np.int64)
+        J = self.taps_per_phase
+        if len(m):
+            t = m * self.down
+            newest = t // self.up - self._base
+            windows = np.lib.stride_tricks.sliding_window_view(buf, J)[newest - J + 1]
+            y = np.einsum('ij,ij->i', windows, self._phases[t % self.up])
+        else:
+            y = np.empty(0, np.float32)
+        self._next = stop
+        keep_from = self._next * self.down // self.up - J + 1
+        self._buf = buf[keep_from - self._base:].copy()
+        self._base = keep_from
+        return y
+
+
+class FMDemodulator:
+    """
+    One FM channel from wideband IQ to PCM
+
+    ``offset_hz`` is the channel's distance from the capture center. Presets
+    come from ``mode``; ``deviation`` and ``deemphasis`` (seconds, 0 = off)
+    override them. ``gain`` scales the audio before conversion to int16.
+    """
+
+    def __init__(self, sample_rate: float, offset_hz: float = 0.0, mode: str = 'nfm',
+                 audio_rate: int = DEFAULT_AUDIO_RATE, deviation: float = None, deemphasis: float = None,
+                 gain: float = 1.0, taps_per_channel: int = 8, squelch: Optional[Dict] = None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode {mode!r} (choose from {', '.join(MODES)})")
+        spacing, default_deviation, default_tau = MODES[mode]
+        self.sample_rate = sample_rate
+        self.offset_hz = offset_hz
+        self.mode = mode
+        self.audio_rate = audio_rate
+        self.deviation = deviation or default_deviation
+        self.deemphasis = default_tau if deemphasis is None else deemphasis
+        self.gain = gain
+
+        num_channels = max(2, int(round(sample_rate / spacing / 2)) * 2)
+        self.channelizer = Channelizer(sample_rate, [offset_hz], num_channels=num_channels,
+                                       taps_per_channel=taps_per_channel)
+        self.if_rate = self.channelizer.output_rate
+        ratio = Fraction(audio_rate / self.if_rate).limit_denominator(1000)
+        self.resampler = Resampler(ratio.numerator, ratio.denominator)
+        self._discriminator_scale = np.float32(self.if_rate / (2 * np.pi * self.deviation))
+        if self.deemphasis:
+            alpha = np.exp(-1.0 / (self.if_rate * self.deemphasis))
+            self._deemph = ([1 - alpha], [1, -alpha])
+        # Squelch options (see squelch.Squelch); closed stretches skip demodulation entirely
+        self._squelch_options = squelch
+        self.reset()
+
+    def reset(self):
+        self.channelizer.reset()
+        self.squelch = Squelch(self.if_rate, **self._squelch_options) if self._squelch_options is not None else None
+        self._restart()
+        self.samples_in = 0
+        self.samples_out = 0
+
+    def _restart(self):
+        """Clear the audio-side filter state (a new transmission after squelch)"""
+        self.resampler.reset()
+        self._last = np.complex64(0)
+        self._deemph_state = np.zeros(1, np.float32)
+
+    def _demodulate(self, iq: np.ndarray) -> np.ndarray:
+        if len(iq) == 0:
+            return np.empty(0, np.float32)
+        previous = np.empty_like(iq)
+        previous[0] = self._last
+        previous[1:] = iq[:-1]
+        self._last = iq[-1]
+        np.conjugate(previous, out=previous)
+        previous *= iq
+        audio = np.angle(previous).astype(np.float32, copy=False)
+        audio *= self._discriminator_scale
+        if self.deemphasis:
+            audio, self._deemph_state = lfilter(*self._deemph, audio, zi=self._deemph_state)
+        audio = self.resampler.process(audio)
+        self.samples_out += len(audio)
+        return audio
+
+    def audio_segments(self, block: np.ndarray) -> List[Tuple[bool, np.ndarray]]:
+        """
+        Wideband IQ block -> [(starts_transmission, float32 audio), ...]
+
+        Without a squelch this is one continuous segment per block. With
+        one, only open stretches are demodulated; a segment flagged True
+        begins a new transmission (its start is in ``squelch.opened``).
+        """
+        self.samples_in += len(block)
+        iq = self.channelizer.process(block)[0]
+        if self.squelch is None:
+            return [(False, self._demodulate(iq))] if len(iq) else []
+        was_open = self.squelch.is_open
+        segments = []
+        for start, stop in self.squelch.process(iq):
+            new = start > 0 or not was_open
+            if new:
+                self._restart()
+            segments.append((new, self._demodulate(iq[start:stop])))
+        return segments
+
+    def process_audio(self, block: np.ndarray) -> np.ndarray:
+        """Wideband IQ block -> float32 audio (1.0 = full deviation); squelched stretches are left out"""
+        segments = self.audio_segments(block)
+        if len(segments) == 1:
+            return segments[0][1]
+        return np.concatenate([audio for _, audio in segments]) if segments else np.empty(0, np.float32)
+
+    def to_pcm(self, audio: np.ndarray) -> np.ndarray:
+        audio *= self.gain * 32767
+        np.clip(audio, -32768, 32767, out=audio)
+        return audio.astype(np.int16)
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Wideband IQ block -> int16 PCM at ``audio_rate``"""
+        return self.to_pcm(self.process_audio(block))
+
+
+class CallWriter:
+    """
+    Turns squelched audio into OpenMHz-style call records, optionally with one WAV file per call
+
+    Records are written as JSON lines to ``calls_file``; with ``record_dir``
+    each record's ``filename`` points at its audio. Transmissions shorter
+    than the squelch's ``min_duration`` leave no file behind.
+    """
+
+    def __init__(self, demod: FMDemodulator, freq: float, start_time: float, calls_file: Optional[TextIO] = None,
+                 record_dir: Optional[str] = None, talkgroup=None):
+        self.demod = demod
+        self.freq = freq
+        self.start_time = start_time
+        self.calls_file = calls_file
+        self.record_dir = record_dir
+        self.talkgroup = talkgroup
+        self.calls = 0
+        self._files: Dict[int, Tuple[wave.Wave_write, str]] = {}  # Transmission start -> open WAV
+        if record_dir:
+            os.makedirs(record_dir, exist_ok=True)
+
+    def write(self, segments: List[Tuple[bool, np.ndarray]]):
+        """Store the PCM of one block's segments, then emit the calls that ended in it"""
+        squelch = self.demod.squelch
+        starts = iter(squelch.opened)
+        current = None
+        for new, pcm in segments:
+            if new:
+                current = next(starts, None)
+                if self.record_dir and current is not None:
+                    path = os.path.join(self.record_dir, f"sdr-{int(round(self.freq))}-{self._epoch_ms(current)}.wav")
+                    wav = wave.open(path, 'wb')
+                    wav.setnchannels(1)
+                    wav.setsampwidth(2)
+                    wav.setframerate(self.demod.audio_rate)
+                    self._files[current] = (wav, path)
+            elif current is None and self._files:
+                current = max(self._files)  # Continues the transmission from the previous block
+            if current in self._files:
+                self._files[current][0].writeframes(pcm.tobytes())
+        self._emit(squelch.drain())
+
+    def close(self):
+        self._emit(self.demod.squelch.flush())
+        for start in list(self._files):
+            self._discard(start)
+
+    def _emit(self, completed: List[Tuple[int, int]]):
+        for start, end in completed:
+            filename = ''
+            if start in self._files:
+                wav, filename = self._files.pop(start)
+                wav.close()
+            record = call_record(start, end, self.demod.if_rate, self.start_time, self.freq,
+                                 self.talkgroup, filename=filename)
+            self.calls += 1
+            if self.calls_file:
+                self.calls_file.write(json.dumps(record) + "\n")
+                self.calls_file.flush()
+        # Files of transmissions that ended without a record were too short
+        ongoing = self.demod.squelch.current_start
+        for start in [s for s in self._files if s != ongoing]:
+            self._discard(start)
+
+    def _discard(self, start: int):
+        wav, path = self._files.pop(start)
+        wav.close()
+        os.remove(path)
+
+    def _epoch_ms(self, sample: int) -> int:
+        return int(round((self.start_time + sample / self.demod.if_rate) * 1000))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Demodulate one FM channel from complex64 IQ to 16-bit PCM',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Simulated dispatch channel 125 kHz below center, as raw PCM
+  python3 sim-capture.py --scenario bursty | python3 demod.py --offset=-125e3 > audio.s16le
+
+  # Broadcast FM from an RTL-SDR, played live
+  python3 capture.py --freq 99.9e6 | python3 demod.py --mode wfm | aplay -r 16000 -f S16_LE
+
+  # Squelched: audio only while keyed, one WAV and one call record per transmission
+  python3 capture.py --freq 851e6 | python3 demod.py --center 851e6 --offset 12.5e3 --squelch \\
+      --calls calls.jsonl --record-dir calls/ > /dev/null
+        """
+    )
+    parser.add_argument('input', nargs='?', help='IQ file, raw complex64 or framed (default: stdin)')
+    parser.add_argument('--rate', type=float,
+                        help='Input sample rate in S/s (default: from the frame headers, else 2e6)')
+    parser.add_argument('--offset', type=float, default=0.0, help='Channel offset from center in Hz (default: 0)')
+    parser.add_argument('--mode', choices=sorted(MODES), default='nfm', help='Channel preset (default: nfm)')
+    parser.add_argument('--audio-rate', type=int, default=DEFAULT_AUDIO_RATE,
+                        help=f'Output sample rate (default: {DEFAULT_AUDIO_RATE})')
+    parser.add_argument('--deviation', type=float, help='Peak deviation in Hz (default: per mode)')
+    parser.add_argument('--deemphasis', type=float, help='De-emphasis in microseconds, 0 = off (default: per mode)')
+    parser.add_argument('--gain', type=float, default=1.0, help='Audio gain (default: 1.0)')
+    parser.add_argument('--block-size', type=int, default=DEFAULT_BLOCK_SIZE,
+                        help=f'Samples per block (default: {DEFAULT_BLOCK_SIZE})')
+
+    squelch = parser.add_argument_group('squelch')
+    squelch.add_argument('--squelch', action='store_true', help='Only output audio while the channel is keyed')
+    squelch.add_argument('--open-db', type=float, default=10.0, help='Open this far above the noise floor (default: 10)')
+    squelch.add_argument('--close-db', type=float, default=6.0, help='Close below floor + this (default: 6)')
+    squelch.add_argument('--hang', type=float, default=0.5, help='Seconds quiet before closing (default: 0.5)')
+    squelch.add_argument('--min-duration', type=float, default=0.25,
+                         help='Shorter transmissions get no call record (default: 0.25)')
+    squelch.add_argument('--center', type=float,
+                         help='Capture center frequency, for call records (default: from the frame headers, else 0)')
+    squelch.add_argument('--talkgroup', type=int, help='talkgroupNum for call records (default: frequency)')
+    squelch.add_argument('--calls', help='Append one JSON call record per transmission to this file')
+    squelch.add_argument('--record-dir', help='Write each transmission to <dir>/<call id>.wav')
+    args = parser.parse_args()
+
+    squelch_options = None
+    if args.squelch or args.calls or args.record_dir:
+        squelch_options = dict(open_db=args.open_db, close_db=args.close_db, hang_time=args.hang,
+                               min_duration=args.min_duration)
+    blocks, reader = open_iq(args.input, args.block_size, sys.stdin.buffer)
+    rate = args.rate or (reader and reader.sample_rate) or 2e6
+    center = args.center if args.center is not None else (reader and reader.center_freq) or 0.0
+    start_time = (reader and reader.start_time) or time.time()
+    try:
+        demod = FMDemodulator(rate, args.offset, args.mode, args.audio_rate, args.deviation,
+                              None if args.deemphasis is None else args.deemphasis * 1e-6, args.gain,
+                              squelch=squelch_options)
+    except ValueError as e:
+        parser.error(str(e))
+
+    calls_file = open(args.calls, 'a') if args.calls else None
+    writer = CallWriter(demod, center + args.offset, start_time, calls_file, args.record_dir,
+                        args.talkgroup) if demod.squelch else None
+    out = sys.stdout.buffer
+    started = time.time()
+    try:
+        for block in blocks:
+            segments = [(new, demod.to_pcm(audio)) for new, audio in demod.audio_segments(block)]
+            for _, pcm in segments:
+                if len(pcm):
+                    out.write(memoryview(pcm.view(np.uint8)))
+            if segments:
+                out.flush()  # Keep latency to one block for live consumers
+            if writer:
+                writer.write(segments)
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass
+    finally:
+        if writer:
+            writer.close()
+        if calls_file:
+            calls_file.close()
+
+    elapsed = time.time() - started
+    print(f"Demodulated {demod.samples_in / rate:.2f}s of IQ to {demod.samples_out} samples "
+          f"at {args.audio_rate} Hz in {elapsed:.2f}s", file=sys.stderr)
+    if reader and reader.stats['lost_frames']:
+        print(f"{reader.stats['lost_frames']} input blocks lost upstream "
+              f"({reader.stats['gaps']} sequence gaps)", file=sys.stderr)
+    if writer:
+        print(f"Squelch open {demod.squelch.duty_cycle:.0%} of the time, {writer.calls} calls", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Framed IQ Wire Format
+Self-describing blocks of complex64 or quantized (int16/int8) IQ for pipes and recordings
+
+Every block is a fixed 48-byte little-endian header followed by the samples:
+
+    offset  size  field
+     0      4     magic b'IQF1'
+     4      1     version (1)
+     5      1     dtype: 0 = cf32, 1 = cs16, 2 = cs8 (interleaved I/Q)
+     6      2     header length in bytes (48; readers skip anything beyond)
+     8      8     sequence number (u64, +1 per block, including blocks that were dropped)
+    16      8     timestamp of the first sample (f64 epoch seconds)
+    24      8     sample rate (f64 S/s)
+    32      8     center frequency (f64 Hz)
+    40      4     samples in this block (u32)
+    44      4     scale (f32): sample = integer * scale; 1.0 for cf32
+
+The scale is chosen per block from its peak, so quantized blocks use the
+full integer range whatever the gain: cs16 halves and cs8 quarters the
+bytes of cf32. Payloads stay 8-byte aligned, so readers hand out
+``np.frombuffer`` views over a memory map or one reused read buffer instead
+of copying, and writers send the header and a memoryview of the payload
+separately. A jump in the sequence number tells a consumer how many blocks
+were lost upstream.
+
+Usage:
+    python3 capture.py --source sim --format cs8 --output capture.iq
+    python3 decode-sim.py capture.iq                  # sample rate read from the headers
+
+    from iqframe import FrameReader, FrameWriter
+
+    writer = FrameWriter(sys.stdout.buffer, sample_rate=2e6, center_freq=851e6, dtype='cs16')
+    writer.write(block)
+
+    reader = FrameReader(sys.stdin.buffer)
+    for frame in reader:
+        if frame.gap:
+            print(f"lost {frame.gap} blocks before #{frame.sequence}")
+        iq = frame.samples()
+"""
+
+import os
+import struct
+import time
+from typing import BinaryIO, Dict, Iterator, Optional
+
+import numpy as np
+
+MAGIC = b'IQF1'
+VERSION = 1
+HEADER = struct.Struct('<4sBBHQdddIf')
+HEADER_SIZE = HEADER.size  # 48
+
+# dtype name -> (header code, integer type of one I or Q value, full-scale integer)
+DTYPES = {
+    'cf32': (0, np.float32, None),
+    'cs16': (1, np.int16, 32767),
+    'cs8': (2, np.int8, 127),
+}
+_CODES = {code: name for name, (code, _, _) in DTYPES.items()}
+
+
+class FrameError(Exception):
+    """The input is not (or is no longer) a valid frame stream"""
+
+
+def is_framed(source) -> bool:
+    """True if a path or buffered binary stream starts with a frame header (streams are only peeked)"""
+    if isinstance(source, (str, bytes, os.PathLike)):
+        with open(source, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    peek = getattr(source, 'peek', None)  # Streams that cannot peek are taken as raw complex64
+    return peek is not None and peek(len(MAGIC))[:len(MAGIC)] == MAGIC
+
+
+# ============================================================================
+# Frames
+# ============================================================================
+
+class Frame:
+    """
+    One decoded block
+
+    ``raw`` is a view of the payload (interleaved integers, or complex64 for
+    cf32). When read from a stream it aliases the reader's buffer and is
+    only valid until the next frame is read.
+    """
+
+    __slots__ = ('sequence', 'timestamp', 'sample_rate', 'center_freq', 'dtype', 'scale', 'raw', 'gap')
+
+    def __init__(self, sequence: int, timestamp: float, sample_rate: float, center_freq: float, dtype: str,
+                 scale: float, raw: np.ndarray, gap: int = 0):
+        self.sequence = sequence
+        self.timestamp = timestamp
+        self.sample_rate = sample_rate
+        self.center_freq = center_freq
+        self.dtype = dtype
+        self.scale = scale
+        self.raw = raw
+        self.gap = gap
+
+    def __len__(self) -> int:
+        return len(self.raw) if self.dtype == 'cf32' else len(self.raw) // 2
+
+    def samples(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """complex64 samples: the payload itself for cf32, else dequantized into ``out`` (or a new array)"""
+        if self.dtype == 'cf32':
+            return self.raw
+        n = len(self)
+        if out is None:
+            out = np.empty(n, np.complex64)
+        out = out[:n]
+        np.multiply(self.raw, np.float32(self.scale), out=out.view(np.float32))
+        return out
+
+
+# ============================================================================
+# Writing
+# ============================================================================
+
+class FrameWriter:
+    """
+    Writes blocks of complex64 samples as frames of ``dtype``
+
+    Quantization goes through two scratch buffers that are reused from block
+    to block; cf32 payloads are written straight from the caller's array.
+    Without explicit values, sequence numbers count up from 0 and
+    timestamps run from the writer's creation at the sample rate.
+    """
+
+    def __init__(self, f: BinaryIO, sample_rate: float, center_freq: float = 0.0, dtype: str = 'cf32',
+                 start_time: Optional[float] = None):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unknown dtype {dtype!r} (choose from {', '.join(DTYPES)})")
+        self.f = f
+        self.sample_rate = sample_rate
+        self.center_freq = center_freq
+        self.dtype = dtype
+        self.code, self.int_type, self.full_scale = DTYPES[dtype]
+        self.start_time = time.time() if start_time is None else start_time
+        self.sequence = 0
+        self.position = 0            # Samples written, for default timestamps
+        self.bytes_written = 0
+        self._header = bytearray(HEADER_SIZE)
+        self._work = np.empty(0, np.float32)
+        self._payload = np.empty(0, self.int_type)
+
+    def quantize(self, block: np.ndarray):
+        """Interleaved integers for ``block`` (a view of the reused buffer) and their scale"""
+        values = block.view(np.float32)
+        n = len(values)
+        if len(self._work) < n:
+            self._work = np.empty(n, np.float32)
+            self._payload = np.empty(n, self.int_type)
+        peak = float(max(values.max(), -values.min())) if n else 0.0
+        scale = peak / self.full_scale if peak > 0 else 1.0
+        work = self._work[:n]
+        np.multiply(values, np.float32(1 / scale), out=work)
+        np.rint(work, out=work)
+        payload = self._payload[:n]
+        payload[...] = work
+        return payload, scale
+
+    def write(self, block: np.ndarray, sequence: Optional[int] = None, timestamp: Optional[float] = None) -> int:
+        """Write one block as a frame; returns the bytes written"""
+        block = np.ascontiguousarray(block, np.complex64)
+        if self.dtype == 'cf32':
+            payload, scale = block, 1.0
+        else:
+            payload, scale = self.quantize(block)
+        if sequence is not None:
+            self.sequence = sequence
+        if timestamp is None:
+            timestamp = self.start_time + self.position / self.sample_rate
+        HEADER.pack_into(self._header, 0, MAGIC, VERSION, self.code, HEADER_SIZE, self.sequence, timestamp,
+                         self.sample_rate, self.center_freq, len(block), scale)
+        self.f.write(self._header)
+        self.f.write(memoryview(payload.view(np.uint8)))
+        self.sequence += 1
+        self.position += len(block)
+        written = HEADER_SIZE + payload.nbytes
+        self.bytes_written += written
+        return written
+
+
+# ============================================================================
+# Reading
+# ============================================================================
+
+class FrameReader:
+    """
+    Iterates the frames of a binary stream or of a bytes-like object (e.g. an mmap)
+
+    Frames from a bytes-like source are views into it; frames from a stream
+    share one reused buffer. The first header is read on construction, so
+    ``sample_rate``, ``center_freq``, ``dtype`` and the first block's
+    ``start_time`` are known before iterating (None for empty input). A partial frame at the end of the
+    input is ignored. ``stats`` counts frames, samples, bytes, sequence
+    gaps and the blocks lost in them.
+    """
+
+    def __init__(self, source):
+        if hasattr(source, 'readinto'):
+            self._f = source
+            self._buf = None
+            self._header = bytearray(HEADER_SIZE)
+            self._payload = bytearray()
+        else:
+            self._f = None
+            self._buf = memoryview(source).cast('B')
+        self._pos = 0
+        self._expected: Optional[int] = None
+        self._dequantized = np.empty(0, np.complex64)
+        self.stats = {'frames': 0, 'samples': 0, 'bytes': 0, 'gaps': 0, 'lost_frames': 0}
+        self._first = self._next()
+        self.sample_rate = self._first.sample_rate if self._first else None
+        self.center_freq = self._first.center_freq if self._first else None
+        self.dtype = self._first.dtype if self._first else None
+        self.start_time = self._first.timestamp if self._first else None
+
+    def _read(self, size: int, into: Optional[bytearray] = None) -> Optional[memoryview]:
+        """The next ``size`` bytes of input, or None at its end"""
+        if self._buf is not None:
+            if self._pos + size > len(self._buf):
+                return None
+            view = self._buf[self._pos:self._pos + size]
+            self._pos += size
+            return view
+        view = memoryview(into)[:size]
+        got = 0
+        while got < size:
+            n = self._f.readinto(view[got:])
+            if not n:
+                return None
+            got += n
+        self._pos += size
+        return view
+
+    def _next(self) -> Optional[Frame]:
+        header = self._read(HEADER_SIZE, self._header if self._f else None)
+        if header is None:
+            return None
+        magic, version, code, header_len, sequence, timestamp, rate, freq, count, scale = HEADER.unpack(header)
+        if magic != MAGIC or code not in _CODES:
+            raise FrameError(f"Bad frame header after {self.stats['frames']} frames (lost sync or not framed IQ)")
+        if header_len > HEADER_SIZE and self._read(header_len - HEADER_SIZE, bytearray(header_len)) is None:
+            return None
+        dtype = _CODES[code]
+        value_type = DTYPES[dtype][1]
+        size = count * 2 * np.dtype(value_type).itemsize
+        if self._f is not None and len(self._payload) < size:
+            self._payload = bytearray(size)
+        payload = self._read(size, self._payload if self._f else None)
+        if payload is None:
+            return None
+        raw = np.frombuffer(payload, np.complex64 if dtype == 'cf32' else value_type)
+
+        gap = 0
+        if self._expected is not None and sequence != self._expected:
+            gap = max(sequence - self._expected, 0)
+            self.stats['gaps'] += 1
+            self.stats['lost_frames'] += gap
+        self._expected = sequence + 1
+        self.stats['frames'] += 1
+        self.stats['samples'] += count
+        self.stats['bytes'] += header_len + size
+        return Frame(sequence, timestamp, rate, freq, dtype, scale, raw, gap)
+
+    @property
+    def position(self) -> int:
+        """Bytes of input consumed so far"""
+        return self._pos
+
+    def __iter__(self) -> Iterator[Frame]:
+        frame, self._first = self._first, None
+        while frame is not None:
+            self.sample_rate, self.center_freq, self.dtype = frame.sample_rate, frame.center_freq, frame.dtype
+            yield frame
+            frame = self._next()
+
+    def blocks(self) -> Iterator[np.ndarray]:
+        """complex64 samples frame by frame (zero-copy for cf32, else dequantized into one reused buffer)"""
+        for frame in self:
+            if frame.dtype != 'cf32' and len(self._dequantized) < len(frame):
+                self._dequantized = np.empty(len(frame), np.complex64)
+            yield frame.samples(self._dequantized)
+
+    def summary(self) -> Dict:
+        return dict(self.stats, sample_rate=self.sample_rate, center_freq=self.center_freq, dtype=self.dtype)
@@ -1,17 +1,64 @@
-import numpy as np
+#!/usr/bin/env python3
+"""
+Simulated SDR capture: writes IQ to stdout in fixed-size chunks, raw complex64 or framed (iqframe.py)
+
+Usage:
+    python3 sim-capture.py                                  # 10 s of a 1 kHz tone, as fast as possible
+    python3 sim-capture.py --scenario bursty --realtime --duration 0   # paced, until stopped
+    python3 sim-capture.py --format cs16 | python3 decode-sim.py        # framed, half the bytes
+"""
+
+import argparse
 import sys
-import time
 
-sample_rate = 2e6
-freq = 99.9e6
-amplitude = 0.5
-tone_freq = 1e3
-duration = 10
+from iqframe import DTYPES, FrameWriter
+from simulator import SCENARIOS, IQSimulator, build_scenario
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Simulate an SDR: IQ on stdout',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Original behaviour: 10 s of a 1 kHz tone at 2 MS/s
+  python3 sim-capture.py | python3 decode-sim.py
+
+  # Live-like load for streamServer.js: paced to the sample rate, runs until killed
+  python3 sim-capture.py --scenario bursty --realtime --duration 0
+
+  # Framed 16-bit IQ at 851 MHz: half the bytes, self-describing
+  python3 sim-capture.py --freq 851e6 --format cs16 > sim.iq
+        """
+    )
+    parser.add_argument('--rate', type=float, default=2e6, help='Sample rate in S/s (default: 2e6)')
+    parser.add_argument('--freq', type=float, default=99.9e6, help='Center frequency in Hz (default: 99.9e6)')
+    parser.add_argument('--scenario', choices=SCENARIOS, default='tone', help='Signal scenario (default: tone)')
+    parser.add_argument('--tone', type=float, default=1e3, help='Tone offset in Hz for tone/multitone (default: 1000)')
+    parser.add_argument('--amplitude', type=float, default=0.5, help='Tone amplitude (default: 0.5)')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds to generate; 0 = until stopped (default: 10)')
+    parser.add_argument('--chunk-size', type=int, default=65536, help='Samples per write (default: 65536)')
+    parser.add_argument('--realtime', action='store_true', help='Pace output to the sample rate')
+    parser.add_argument('--format', choices=['raw'] + list(DTYPES), default='raw',
+                        help='raw = headerless complex64, else framed cf32/cs16/cs8 (default: raw)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    components = build_scenario(args.scenario, args.rate, args.seed, args.tone, args.amplitude)
+    simulator = IQSimulator(components, args.rate, args.chunk_size)
+    total = int(args.duration * args.rate) if args.duration > 0 else None
+    out = sys.stdout.buffer
+    writer = None if args.format == 'raw' else FrameWriter(out, args.rate, args.freq, args.format)
+    try:
+        for chunk in simulator.chunks(total, realtime=args.realtime):
+            if writer:
+                writer.write(chunk)
+            else:
+                out.write(memoryview(chunk.view('uint8')))
+        out.flush()
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass
 
-num_samples = int(sample_rate * duration)
-t = np.arange(num_samples) / sample_rate
-iq = amplitude * np.exp(2j * np.pi * tone_freq * t)
 
-iq_bytes = iq.astype(np.complex64).tobytes()
-sys.stdout.buffer.write(iq_bytes)
-sys.stdout.flush()
+if __name__ == '__main__':
+    main()
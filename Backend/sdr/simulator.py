@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+IQ Simulator
+Generates complex64 baseband IQ in fixed-size chunks, optionally paced to the sample rate
+
+Every signal component keeps its own phase accumulator, so chunks join
+without discontinuities, and all work buffers are allocated once: memory
+stays constant however long the simulator runs. Scenarios combine tones, a
+noise floor and keyed FM transmissions that come and go like dispatch
+traffic.
+
+Usage:
+    from simulator import IQSimulator, build_scenario
+
+    sim = IQSimulator(build_scenario('bursty', 2e6), 2e6, chunk_size=65536)
+    for chunk in sim.chunks(realtime=True):   # the same array is refilled each time
+        sink.write(chunk)
+"""
+
+import time
+from collections import deque
+from typing import Deque, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+TWO_PI = 2 * np.pi
+SCENARIOS = ('tone', 'multitone', 'noise', 'bursty')
+
+
+class Workspace:
+    """Scratch arrays shared by the components of one simulator (grown once, then reused)"""
+
+    def __init__(self, size: int = 0):
+        self.size = 0
+        self.ensure(size)
+
+    def ensure(self, size: int):
+        if size > self.size:
+            self.size = size
+            self.ramp = np.arange(size, dtype=np.float64)
+            self.phase = np.empty(size, np.float64)
+            self.mod = np.empty(size, np.float64)
+            self.real = np.empty(size, np.float32)
+            self.imag = np.empty(size, np.float32)
+
+
+# ============================================================================
+# Signal Components
+# ============================================================================
+
+class Component:
+    """Adds its signal to ``out`` (in place) and advances its own state by len(out) samples"""
+
+    def add(self, out: np.ndarray, ws: Workspace, sample_rate: float, start: int):
+        raise NotImplementedError
+
+
+def _add_carrier(out: np.ndarray, ws: Workspace, amplitude: float, phase: np.ndarray):
+    """out += amplitude * exp(j * phase) without temporaries"""
+    n = len(out)
+    np.cos(phase, out=ws.real[:n])
+    np.sin(phase, out=ws.imag[:n])
+    ws.real[:n] *= amplitude
+    ws.imag[:n] *= amplitude
+    out.real += ws.real[:n]
+    out.imag += ws.imag[:n]
+
+
+class Tone(Component):
+    """Unmodulated carrier at ``offset_hz`` from the center frequency"""
+
+    def __init__(self, offset_hz: float, amplitude: float = 0.5, phase: float = 0.0):
+        self.offset_hz = offset_hz
+        self.amplitude = amplitude
+        self.phase = phase
+
+    def add(self, out, ws, sample_rate, start):
+        n = len(out)
+        step = TWO_PI * self.offset_hz / sample_rate
+        phase = ws.phase[:n]
+        np.multiply(ws.ramp[:n], step, out=phase)
+        phase += self.phase
+        _add_carrier(out, ws, self.amplitude, phase)
+        self.phase = (self.phase + step * n) % TWO_PI
+
+
+class Noise(Component):
+    """Complex white Gaussian noise with total power ``power_db`` (dBFS)"""
+
+    def __init__(self, power_db: float = -60.0, seed: int = 0):
+        self.power_db = power_db
+        self.rng = np.random.default_rng(seed)
+
+    def add(self, out, ws, sample_rate, start):
+        n = len(out)
+        sigma = np.float32(np.sqrt(10 ** (self.power_db / 10) / 2))
+        for part, scratch in ((out.real, ws.real[:n]), (out.imag, ws.imag[:n])):
+            self.rng.standard_normal(n, dtype=np.float32, out=scratch)
+            scratch *= sigma
+            part += scratch
+
+
+class KeyedFM(Component):
+    """
+    Push-to-talk style FM transmissions on one channel
+
+    The channel alternates between keyed (exponentially distributed length,
+    mean ``mean_on`` seconds) and idle (mean ``mean_off``) periods. While
+    keyed it carries a carrier FM-modulated by an audio tone
+    (``deviation`` Hz peak). Completed transmissions are logged in
+    ``events`` as (start_sample, end_sample) pairs (last 1000 kept).
+    """
+
+    def __init__(self, offset_hz: float, amplitude: float = 0.3, mean_on: float = 2.0,
+                 mean_off: float = 3.0, audio_hz: float = 800.0, deviation: float = 2500.0,
+                 seed: int = 0, keyed: bool = False):
+        self.offset_hz = offset_hz
+        self.amplitude = amplitude
+        self.mean_on = mean_on
+        self.mean_off = mean_off
+        self.audio_hz = audio_hz
+        self.deviation = deviation
+        self.rng = np.random.default_rng(seed)
+        self.keyed = keyed
+        self.remaining: Optional[int] = None  # Samples left in the current state
+        self.carrier_phase = 0.0
+        self.audio_phase = 0.0
+        self.key_start = 0
+        self.events: Deque[Tuple[int, int]] = deque(maxlen=1000)
+
+    def _next_period(self, sample_rate: float) -> int:
+        mean = self.mean_on if self.keyed else self.mean_off
+        return max(1, int(self.rng.exponential(mean) * sample_rate))
+
+    def add(self, out, ws, sample_rate, start):
+        n = len(out)
+        if self.remaining is None:
+            self.remaining = self._next_period(sample_rate)
+        pos = 0
+        while pos < n:
+            span = min(self.remaining, n - pos)
+            if self.keyed:
+                self._add_keyed(out[pos:pos + span], ws, sample_rate)
+            pos += span
+            self.remaining -= span
+            if self.remaining == 0:
+                if self.keyed:
+                    self.events.append((self.key_start, start + pos))
+                else:
+                    self.key_start = start + pos
+                self.keyed = not self.keyed
+                self.remaining = self._next_period(sample_rate)
+
+    def _add_keyed(self, out, ws, sample_rate):
+        n = len(out)
+        carrier_step = TWO_PI * self.offset_hz / sample_rate
+        audio_step = TWO_PI * self.audio_hz / sample_rate
+        beta = self.deviation / self.audio_hz  # Modulation index
+
+        # phase = carrier + beta * sin(audio): closed-form FM of a tone
+        mod = ws.mod[:n]
+        np.multiply(ws.ramp[:n], audio_step, out=mod)
+        mod += self.audio_phase
+        np.sin(mod, out=mod)
+        mod *= beta
+        phase = ws.phase[:n]
+        np.multiply(ws.ramp[:n], carrier_step, out=phase)
+        phase += self.carrier_phase
+        phase += mod
+        _add_carrier(out, ws, self.amplitude, phase)
+
+        self.carrier_phase = (self.carrier_phase + carrier_step * n) % TWO_PI
+        self.audio_phase = (self.audio_phase + audio_step * n) % TWO_PI
+
+
+def build_scenario(name: str, sample_rate: float = 2e6, seed: int = 0,
+                   tone_hz: float = 1e3, amplitude: float = 0.5) -> List[Component]:
+    """
+    Named component sets
+
+    tone:      one carrier at ``tone_hz`` (the original sim-capture.py signal)
+    multitone: four carriers of different strength over a -70 dBFS floor
+    noise:     noise floor only (-40 dBFS)
+    bursty:    four keyed FM channels across the band over a -70 dBFS floor
+    """
+    span = sample_rate / 2
+    if name == 'tone':
+        return [Tone(tone_hz, amplitude)]
+    if name == 'multitone':
+        return [Tone(-0.6 * span, 0.05), Tone(tone_hz, amplitude), Tone(0.25 * span, 0.2),
+                Tone(0.7 * span, 0.01), Noise(-70.0, seed)]
+    if name == 'noise':
+        return [Noise(-40.0, seed)]
+    if name == 'bursty':
+        offsets = (-0.5 * span, -0.125 * span, 0.2 * span, 0.45 * span)
+        return [KeyedFM(offset, amplitude=0.25, seed=seed + i, mean_on=1.5 + i, mean_off=2.0 + i)
+                for i, offset in enumerate(offsets)] + [Noise(-70.0, seed)]
+    raise ValueError(f"Unknown scenario {name!r} (choose from {', '.join(SCENARIOS)})")
+
+
+# ============================================================================
+# Simulator
+# ============================================================================
+
+class Pacer:
+    """
+    Sleeps so that emitted samples track the wall clock at ``sample_rate``
+
+    If the consumer stalls for more than ``max_lag`` seconds, the schedule is
+    reset instead of bursting to catch up, like a radio that kept running.
+    """
+
+    def __init__(self, sample_rate: float, max_lag: float = 1.0):
+        self.sample_rate = sample_rate
+        self.max_lag = max_lag
+        self.started = None
+        self.samples = 0
+        self.resyncs = 0
+
+    def wait(self, samples: int):
+        now = time.monotonic()
+        if self.started is None:
+            self.started = now
+        self.samples += samples
+        due = self.started + self.samples / self.sample_rate
+        if due > now:
+            time.sleep(due - now)
+        elif now - due > self.max_lag:
+            self.started = now - self.samples / self.sample_rate
+            self.resyncs += 1
+
+
+class IQSimulator:
+    """
+    Baseband IQ from a set of components
+
+    ``generate(out)`` fills any complex64 array in place; ``chunks()``
+    yields one preallocated ``chunk_size`` array, refilled for every chunk.
+    """
+
+    def __init__(self, components: List[Component], sample_rate: float = 2e6, chunk_size: int = 65536):
+        self.components = components
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.samples = 0
+        self.workspace = Workspace(chunk_size)
+
+    def generate(self, out: np.ndarray) -> np.ndarray:
+        self.workspace.ensure(len(out))
+        out[:] = 0
+        for component in self.components:
+            component.add(out, self.workspace, self.sample_rate, self.samples)
+        self.samples += len(out)
+        return out
+
+    def chunks(self, total: Optional[int] = None, realtime: bool = False) -> Iterator[np.ndarray]:
+        """Yield chunks until ``total`` samples (forever if None), paced if ``realtime``"""
+        buffer = np.empty(self.chunk_size, np.complex64)
+        pacer = Pacer(self.sample_rate) if realtime else None
+        remaining = total
+        while remaining is None or remaining > 0:
+            n = self.chunk_size if remaining is None else min(self.chunk_size, remaining)
+            chunk = self.generate(buffer[:n])
+            if pacer:
+                pacer.wait(n)
+            yield chunk
+            if remaining is not None:
+                remaining -= n
+
+    def events(self) -> List[Tuple[float, int, int]]:
+        """Completed keyed transmissions as (offset_hz, start_sample, end_sample)"""
+        return sorted(
+            ((c.offset_hz, start, end) for c in self.components if isinstance(c, KeyedFM) for start, end in c.events),
+            key=lambda event: event[1]
+        )
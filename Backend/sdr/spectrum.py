@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Streaming Spectrum Analysis
+Running statistics, a Welch-averaged spectrum, max-hold and a spectrogram over
+IQ recordings of any length, in bounded memory
+
+Files are memory-mapped and walked block by block (pages already analyzed are
+released again); pipes are read in chunks into one reused buffer. Each block
+is cut into overlapping Hann-windowed frames (frames straddling two blocks are
+kept), and frames are transformed in vectorized batches. The spectrogram keeps
+at most ``max_rows`` rows: when it fills up, neighbouring rows are averaged
+together, so the whole recording is always covered.
+
+Usage:
+    from spectrum import analyze_file
+
+    analyzer = analyze_file('capture.cf32', sample_rate=2e6)
+    summary = analyzer.summary()          # stats + peaks, JSON-serializable
+    freqs, psd_db = analyzer.psd_db()
+"""
+
+import mmap
+import os
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import scipy.fft
+from scipy.signal import find_peaks, get_window
+
+from capture import FileSource
+from iqframe import FrameReader, is_framed
+
+DEFAULT_BLOCK_SIZE = 1 << 18  # 256k samples = 2 MB
+DEFAULT_NFFT = 4096
+DEFAULT_MAX_ROWS = 512
+
+
+# ============================================================================
+# Input
+# ============================================================================
+
+def _map_file(path: str) -> mmap.mmap:
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+        mm.madvise(mmap.MADV_SEQUENTIAL)
+    return mm
+
+
+def _release_pages(mm: mmap.mmap, done: int, position: int) -> int:
+    """Drop the pages behind ``position`` so resident memory stays flat on huge files; returns the new mark"""
+    end = position // mmap.PAGESIZE * mmap.PAGESIZE
+    if end > done and hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_DONTNEED'):
+        mm.madvise(mmap.MADV_DONTNEED, done, end - done)
+        return end
+    return done
+
+
+def _close_map(mm: mmap.mmap):
+    try:
+        mm.close()
+    except BufferError:
+        pass  # A caller still holds a block view; the map closes when it is freed
+
+
+def iter_file_blocks(path: str, block_size: int = DEFAULT_BLOCK_SIZE, start: int = 0,
+                     stop: Optional[int] = None) -> Iterator[np.ndarray]:
+    """Memory-map a complex64 file and yield consecutive views of up to ``block_size`` samples of [start, stop)"""
+    count = os.path.getsize(path) // 8
+    stop = count if stop is None else min(stop, count)
+    if stop <= start:
+        return
+    mm = _map_file(path)
+    samples = np.frombuffer(mm, np.complex64, count)
+    done = start * 8 // mmap.PAGESIZE * mmap.PAGESIZE  # Bytes already handed back to the kernel
+    try:
+        for first in range(start, stop, block_size):
+            yield samples[first:min(first + block_size, stop)]
+            done = _release_pages(mm, done, (first + block_size) * 8)
+    finally:
+        del samples
+        _close_map(mm)
+
+
+def iter_stream_blocks(f: BinaryIO, block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[np.ndarray]:
+    """Read complex64 samples from a pipe into one reused buffer, yielding the filled part"""
+    source = FileSource(f)
+    buf = np.empty(block_size, np.complex64)
+    while True:
+        try:
+            n = source.read(buf)
+        except EOFError:
+            return
+        yield buf[:n]
+
+
+def _iter_mapped_frames(reader: FrameReader, mm: mmap.mmap) -> Iterator[np.ndarray]:
+    done = 0
+    try:
+        for block in reader.blocks():
+            yield block
+            done = _release_pages(mm, done, reader.position)
+    finally:
+        _close_map(mm)
+
+
+def open_iq(path: Optional[str], block_size: int = DEFAULT_BLOCK_SIZE,
+            stream: Optional[BinaryIO] = None) -> Tuple[Iterator[np.ndarray], Optional[FrameReader]]:
+    """
+    Blocks of a file (``path``) or pipe (``stream``) holding raw complex64 or framed IQ (see iqframe.py)
+
+    Returns (blocks, reader). For framed input the reader's headers give the
+    sample rate and center frequency and its stats count lost blocks;
+    blocks then follow the frames instead of ``block_size``. For raw input
+    the reader is None.
+    """
+    if path:
+        if not is_framed(path):
+            return iter_file_blocks(path, block_size), None
+        mm = _map_file(path)
+        reader = FrameReader(mm)
+        return _iter_mapped_frames(reader, mm), reader
+    if not is_framed(stream):
+        return iter_stream_blocks(stream, block_size), None
+    reader = FrameReader(stream)
+    return reader.blocks(), reader
+
+
+# ============================================================================
+# Accumulators
+# ============================================================================
+
+class RunningStats:
+    """Sample count, amplitude and power statistics accumulated block by block"""
+
+    def __init__(self):
+        self.samples = 0
+        self.amplitude_sum = 0.0
+        self.power_sum = 0.0
+        self.max_power = 0.0
+        self.iq_sum = 0j
+        self._power = np.empty(0, np.float32)
+        self._amplitude = np.empty(0, np.float32)
+
+    def update(self, block: np.ndarray):
+        n = len(block)
+        if n == 0:
+            return
+        if n > len(self._power):
+            self._power = np.empty(n, np.float32)
+            self._amplitude = np.empty(n, np.float32)
+        power, amplitude = self._power[:n], self._amplitude[:n]
+        # |x|^2 once, amplitude from it: no complex abs temporaries
+        np.square(block.real, out=power)
+        np.square(block.imag, out=amplitude)
+        power += amplitude
+        np.sqrt(power, out=amplitude)
+        self.samples += n
+        self.power_sum += float(power.sum(dtype=np.float64))
+        self.amplitude_sum += float(amplitude.sum(dtype=np.float64))
+        self.max_power = max(self.max_power, float(power.max()))
+        self.iq_sum += complex(block.sum(dtype=np.complex128))
+
+    def merge(self, other: 'RunningStats'):
+        """Add the statistics of another (e.g. a neighbouring chunk's)"""
+        self.samples += other.samples
+        self.amplitude_sum += other.amplitude_sum
+        self.power_sum += other.power_sum
+        self.max_power = max(self.max_power, other.max_power)
+        self.iq_sum += other.iq_sum
+
+    def __getstate__(self):
+        # Scratch buffers are block-sized; a pickled copy (sent between processes) does not need them
+        return dict(self.__dict__, _power=np.empty(0, np.float32), _amplitude=np.empty(0, np.float32))
+
+    def summary(self) -> Dict:
+        n = max(self.samples, 1)
+        power = self.power_sum / n
+        dc = self.iq_sum / n
+        return {
+            'samples': self.samples,
+            'mean_amplitude': self.amplitude_sum / n,
+            'max_amplitude': float(np.sqrt(self.max_power)),
+            'power': power,
+            'power_db': float(10 * np.log10(power)) if power > 0 else None,
+            'dc_offset': [dc.real, dc.imag],
+        }
+
+
+class Spectrogram:
+    """
+    Frame powers averaged into at most ``max_rows`` time rows
+
+    Starts at ``frames_per_row`` frames per row (1 by default); whenever the
+    rows fill up, pairs are merged and every row covers twice as many frames
+    from then on.
+    """
+
+    def __init__(self, nbins: int, max_rows: int = DEFAULT_MAX_ROWS, frames_per_row: int = 1):
+        if max_rows < 2 or max_rows % 2:
+            raise ValueError("max_rows must be an even number >= 2")
+        self.max_rows = max_rows
+        self.rows = np.zeros((max_rows, nbins), np.float32)
+        self.n_rows = 0
+        self.frames_per_row = frames_per_row
+        self._partial = np.zeros(nbins, np.float64)
+        self._partial_frames = 0
+
+    def add(self, power: np.ndarray):
+        """Append a (frames, nbins) batch of frame powers"""
+        i, total = 0, len(power)
+        while i < total:
+            fpr = self.frames_per_row
+            if self._partial_frames or total - i < fpr:
+                take = min(fpr - self._partial_frames, total - i)
+                self._partial += power[i:i + take].sum(axis=0)
+                self._partial_frames += take
+                i += take
+                if self._partial_frames == fpr:
+                    self.rows[self.n_rows] = self._partial / fpr
+                    self.n_rows += 1
+                    self._partial[:] = 0
+                    self._partial_frames = 0
+            else:
+                m = min((total - i) // fpr, self.max_rows - self.n_rows)
+                whole = power[i:i + m * fpr].reshape(m, fpr, -1)
+                self.rows[self.n_rows:self.n_rows + m] = whole.mean(axis=1)
+                self.n_rows += m
+                i += m * fpr
+            if self.n_rows == self.max_rows:
+                self._merge()
+
+    def _merge(self):
+        half = self.max_rows // 2
+        self.rows[:half] = (self.rows[0::2] + self.rows[1::2]) / 2
+        self.rows[half:] = 0
+        self.n_rows = half
+        self.frames_per_row *= 2
+
+    def power(self) -> np.ndarray:
+        """Completed rows (time x frequency, FFT bin order)"""
+        return self.rows[:self.n_rows]
+
+
+class SpectrumAnalyzer:
+    """
+    Feed IQ blocks with ``update()``; read results from ``summary()``, ``psd_db()``, ``spectrogram``
+
+    The averaged spectrum uses scipy's Welch "spectrum" scaling, so a tone of
+    amplitude A reads about 20*log10(A) dBFS. ``max_hold`` keeps the loudest
+    value seen in every bin, which is what makes short transmissions visible
+    in a long recording.
+
+    With ``occupancy_db`` set, every (frame, bin) cell more than that far
+    above its frame's median counts as occupied; ``occupied_bins`` holds the
+    per-bin counts and the summary the occupied percentage of all cells.
+    """
+
+    def __init__(self, sample_rate: float = 2e6, nfft: int = DEFAULT_NFFT, overlap: float = 0.5,
+                 max_rows: int = DEFAULT_MAX_ROWS, batch_frames: int = 64, keep_samples: int = 1000,
+                 occupancy_db: Optional[float] = None, frames_per_row: int = 1):
+        if not 0 <= overlap < 1:
+            raise ValueError("overlap must be in [0, 1)")
+        self.sample_rate = sample_rate
+        self.nfft = nfft
+        self.hop = max(1, int(round(nfft * (1 - overlap))))
+        self.batch_frames = batch_frames
+        self.window = get_window('hann', nfft).astype(np.float32)
+        self.scale = 1.0 / float(np.sum(self.window, dtype=np.float64)) ** 2
+
+        self.stats = RunningStats()
+        self.spectrogram = Spectrogram(nfft, max_rows, frames_per_row)
+        self.frames = 0
+        self.psd_sum = np.zeros(nfft, np.float64)
+        self.max_hold = np.zeros(nfft, np.float32)
+        self.occupancy_db = occupancy_db
+        self.occupied_bins = np.zeros(nfft, np.int64)
+        self.head = np.empty(0, np.complex64)  # First samples, for plotting
+        self.keep_samples = keep_samples
+        self._pending = np.empty(0, np.complex64)  # Samples not yet covered by a full frame
+        self._windowed = np.empty((batch_frames, nfft), np.complex64)
+        self._power = np.empty((batch_frames, nfft), np.float32)
+        self._scratch = np.empty((batch_frames, nfft), np.float32)
+
+    def update(self, block: np.ndarray, stats: bool = True):
+        """Add a block; with ``stats=False`` it only completes frames (samples another analyzer counts)"""
+        if len(block) == 0:
+            return  # Zero-length frames and short pipe reads
+        if stats:
+            self.stats.update(block)
+            if len(self.head) < self.keep_samples:
+                self.head = np.concatenate((self.head, block[:self.keep_samples - len(self.head)]))
+
+        data = np.concatenate((self._pending, block)) if len(self._pending) else block
+        if len(data) < self.nfft:
+            self._pending = np.array(data, np.complex64)
+            return
+        n_frames = (len(data) - self.nfft) // self.hop + 1
+        frames = np.lib.stride_tricks.sliding_window_view(data, self.nfft)[::self.hop]
+        for i in range(0, n_frames, self.batch_frames):
+            self._add_frames(frames[i:i + self.batch_frames])
+        self._pending = np.array(data[n_frames * self.hop:], np.complex64)
+
+    def _add_frames(self, frames: np.ndarray):
+        k = len(frames)
+        windowed = self._windowed[:k]
+        np.multiply(frames, self.window, out=windowed)
+        spectrum = scipy.fft.fft(windowed, axis=1, overwrite_x=True)
+        power, scratch = self._power[:k], self._scratch[:k]
+        np.square(spectrum.real, out=power)
+        np.square(spectrum.imag, out=scratch)
+        power += scratch
+        power *= self.scale
+        self.psd_sum += power.sum(axis=0, dtype=np.float64)
+        np.maximum(self.max_hold, power.max(axis=0), out=self.max_hold)
+        if self.occupancy_db is not None:
+            floor = np.median(power, axis=1, keepdims=True)
+            floor *= 10 ** (self.occupancy_db / 10)
+            self.occupied_bins += np.count_nonzero(power > floor, axis=0)
+        self.spectrogram.add(power)
+        self.frames += k
+
+    # ------------------------------------------------------------------------
+    # Results
+    # ------------------------------------------------------------------------
+
+    def freqs(self) -> np.ndarray:
+        """Bin frequencies in Hz, FFT order"""
+        return np.fft.fftfreq(self.nfft, 1 / self.sample_rate)
+
+    def psd(self) -> np.ndarray:
+        """Welch-averaged power per bin (linear, FFT order)"""
+        return self.psd_sum / max(self.frames, 1)
+
+    def psd_db(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(freqs, averaged power in dBFS), sorted by frequency"""
+        return np.fft.fftshift(self.freqs()), np.fft.fftshift(_db(self.psd()))
+
+    def peaks(self, count: int = 10, threshold_db: float = 10.0, min_spacing_hz: Optional[float] = None,
+              dynamic_range_db: float = 60.0) -> List[Dict]:
+        """
+        Strongest spectral peaks over the whole recording
+
+        Found on the max-hold spectrum (so intermittent signals count), at
+        least ``threshold_db`` above its median floor and within
+        ``dynamic_range_db`` of the strongest bin. ``min_spacing_hz`` (default
+        3 bins) merges close peaks, e.g. FM sidebands into one per channel.
+        Each peak reports the average and the max-hold level.
+        """
+        if self.frames == 0:
+            return []
+        freqs = np.fft.fftshift(self.freqs())
+        max_db = np.fft.fftshift(_db(self.max_hold))
+        avg_db = np.fft.fftshift(_db(self.psd()))
+        height = max(float(np.median(max_db)) + threshold_db, float(max_db.max()) - dynamic_range_db)
+        distance = 3 if min_spacing_hz is None else max(1, int(min_spacing_hz * self.nfft / self.sample_rate))
+        idx, _ = find_peaks(max_db, height=height, distance=distance)
+        idx = idx[np.argsort(max_db[idx])[::-1][:count]]
+        return [
+            {'freq_hz': float(freqs[i]), 'avg_db': round(float(avg_db[i]), 2), 'max_db': round(float(max_db[i]), 2)}
+            for i in idx
+        ]
+
+    def summary(self, peak_count: int = 10, min_spacing_hz: Optional[float] = None) -> Dict:
+        stats = self.stats.summary()
+        summary = {
+            **stats,
+            'sample_rate': self.sample_rate,
+            'duration_s': stats['samples'] / self.sample_rate,
+            'nfft': self.nfft,
+            'frames': self.frames,
+            'spectrogram_rows': self.spectrogram.n_rows,
+            'seconds_per_row': self.spectrogram.frames_per_row * self.hop / self.sample_rate,
+            'peaks': self.peaks(peak_count, min_spacing_hz=min_spacing_hz),
+        }
+        if self.occupancy_db is not None:
+            cells = max(self.frames * self.nfft, 1)
+            summary['occupancy_pct'] = round(100.0 * float(self.occupied_bins.sum()) / cells, 3)
+        return summary
+
+
+def _db(power: np.ndarray) -> np.ndarray:
+    return 10 * np.log10(np.maximum(power, 1e-20))
+
+
+# ============================================================================
+# Entry Points
+# ============================================================================
+
+def analyze_blocks(blocks: Iterator[np.ndarray], sample_rate: float = 2e6, **kwargs) -> SpectrumAnalyzer:
+    analyzer = SpectrumAnalyzer(sample_rate, **kwargs)
+    for block in blocks:
+        analyzer.update(block)
+    return analyzer
+
+
+def analyze_file(path: str, sample_rate: float = 2e6, block_size: int = DEFAULT_BLOCK_SIZE,
+                 **kwargs) -> SpectrumAnalyzer:
+    return analyze_blocks(iter_file_blocks(path, block_size), sample_rate, **kwargs)
+
+
+def analyze_stream(f: BinaryIO, sample_rate: float = 2e6, block_size: int = DEFAULT_BLOCK_SIZE,
+                   **kwargs) -> SpectrumAnalyzer:
+    return analyze_blocks(iter_stream_blocks(f, block_size), sample_rate, **kwargs)
+
+
+def plot(analyzer: SpectrumAnalyzer, path: str, title: Optional[str] = None):
+    """Time domain, constellation, averaged spectrum and spectrogram in one PNG (needs matplotlib)"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    head = analyzer.head
+    freqs, psd_db = analyzer.psd_db()
+    fig, axes = plt.subplots(4, 1, figsize=(12, 14))
+
+    axes[0].plot(head.real, label='I (Real)', alpha=0.7)
+    axes[0].plot(head.imag, label='Q (Imaginary)', alpha=0.7)
+    axes[0].set_xlabel('Sample')
+    axes[0].set_ylabel('Amplitude')
+    axes[0].set_title('Time Domain - I/Q Components')
+    axes[0].legend()
+    axes[0].grid(True)
+
+    axes[1].scatter(head.real, head.imag, alpha=0.3, s=1)
+    axes[1].set_xlabel('I (In-phase)')
+    axes[1].set_ylabel('Q (Quadrature)')
+    axes[1].set_title('Constellation Diagram')
+    axes[1].axis('equal')
+    axes[1].grid(True)
+
+    axes[2].plot(freqs / 1e3, psd_db, label='Average')
+    axes[2].plot(freqs / 1e3, np.fft.fftshift(_db(analyzer.max_hold)), alpha=0.5, label='Max hold')
+    for peak in analyzer.peaks(5):
+        axes[2].axvline(peak['freq_hz'] / 1e3, color='r', linestyle='--', alpha=0.5)
+    axes[2].set_xlabel('Frequency (kHz)')
+    axes[2].set_ylabel('Power (dBFS)')
+    axes[2].set_title('Welch Spectrum')
+    axes[2].legend()
+    axes[2].grid(True)
+
+    rows = np.fft.fftshift(_db(analyzer.spectrogram.power()), axes=1)
+    duration = analyzer.spectrogram.n_rows * analyzer.spectrogram.frames_per_row * analyzer.hop / analyzer.sample_rate
+    axes[3].imshow(rows, aspect='auto', origin='lower', cmap='viridis',
+                   extent=(freqs[0] / 1e3, freqs[-1] / 1e3, 0, duration))
+    axes[3].set_xlabel('Frequency (kHz)')
+    axes[3].set_ylabel('Time (s)')
+    axes[3].set_title('Spectrogram')
+
+    if title:
+        fig.suptitle(title)
+    plt.tight_layout()
+    plt.savefig(path, dpi=150)
+    plt.close(fig)
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Energy Squelch
+Finds keyed transmissions in a channel's IQ and describes them as OpenMHz-style call records
+
+Channel power is measured over short windows (10 ms by default) and compared
+with an adaptive noise floor:
+
+    open    a window at least ``open_db`` above the floor
+    close   ``hang_time`` of consecutive windows below floor + ``close_db``
+            (open_db > close_db gives hysteresis, so a fading signal does not chatter)
+
+Window powers, thresholds, the hang-time run lengths and the open/closed
+state are all computed for a whole block at once with NumPy; there is no
+per-sample or per-window Python loop. The floor follows the low percentile
+of the windows spent closed, so it adapts to a changing noise level without
+climbing during long transmissions.
+
+Usage:
+    from squelch import Squelch, call_record
+
+    squelch = Squelch(sample_rate=25e3)
+    for iq in channel_blocks:
+        for start, stop in squelch.process(iq):   # open spans of this block
+            publish(iq[start:stop])
+        for start, end in squelch.drain():        # finished transmissions (absolute samples)
+            calls.append(call_record(start, end, 25e3, t0, freq=851.0125e6))
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class Squelch:
+    """
+    Stateful open/close detector over consecutive IQ blocks of one channel
+
+    ``process()`` returns the open spans of each block and lists the start
+    of every transmission that began in it in ``opened``. Completed
+    transmissions (at least ``min_duration`` long, hang time excluded) are
+    queued for ``drain()`` as absolute (start, end) sample indices.
+    """
+
+    def __init__(self, sample_rate: float, window: float = 0.01, open_db: float = 10.0, close_db: float = 6.0,
+                 hang_time: float = 0.5, min_duration: float = 0.25, floor_tc: float = 5.0,
+                 floor_percentile: float = 20.0, initial_floor_db: Optional[float] = None,
+                 relearn_after: float = 60.0):
+        if close_db > open_db:
+            raise ValueError("close_db must not exceed open_db")
+        self.sample_rate = sample_rate
+        self.window = max(1, int(round(window * sample_rate)))
+        self.open_db = open_db
+        self.close_db = close_db
+        self.hang_windows = max(1, int(round(hang_time * sample_rate / self.window)))
+        self.min_samples = int(min_duration * sample_rate)
+        self.floor_tc = floor_tc
+        self.floor_percentile = floor_percentile
+        self.relearn_windows = int(relearn_after * sample_rate / self.window)
+        self.floor_db = initial_floor_db
+
+        self.is_open = False
+        self.samples = 0            # Absolute index of the next input sample
+        self.open_samples = 0       # Samples passed while open (for duty cycle)
+        self._acc = 0.0             # Power summed over the current partial window
+        self._acc_count = 0
+        self._quiet_run = 0         # Consecutive quiet windows so far
+        self._open_run = 0          # Consecutive open windows so far
+        self._start: Optional[int] = None
+        self.opened: List[int] = []
+        self._completed: List[Tuple[int, int]] = []
+
+    # ------------------------------------------------------------------------
+    # Window powers
+    # ------------------------------------------------------------------------
+
+    def _window_powers(self, iq: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Mean power of every window completed in this block, and each window's end (block-relative)"""
+        power = np.square(iq.real)
+        power += np.square(iq.imag)
+        W, n = self.window, len(iq)
+        head = min(W - self._acc_count, n)
+        self._acc += float(power[:head].sum(dtype=np.float64))
+        self._acc_count += head
+        sums, ends = [], []
+        if self._acc_count == W:
+            sums.append(self._acc)
+            ends.append(head)
+            self._acc, self._acc_count = 0.0, 0
+        whole = (n - head) // W
+        body = power[head:head + whole * W].reshape(whole, W).sum(axis=1, dtype=np.float64)
+        tail = power[head + whole * W:]
+        self._acc += float(tail.sum(dtype=np.float64))
+        self._acc_count += len(tail)
+        sums = np.concatenate((sums, body)) / W
+        ends = np.concatenate((ends, head + W * np.arange(1, whole + 1))).astype(np.int64)
+        return 10 * np.log10(np.maximum(sums, 1e-20)), ends
+
+    # ------------------------------------------------------------------------
+    # Gating
+    # ------------------------------------------------------------------------
+
+    def process(self, iq: np.ndarray) -> List[Tuple[int, int]]:
+        """Advance by one block; returns its open spans as (start, stop) indices into ``iq``"""
+        n = len(iq)
+        power_db, ends = self._window_powers(iq)
+        k = len(power_db)
+        self.opened = []
+        if k == 0:
+            spans = [(0, n)] if self.is_open else []
+            self._advance(n)
+            return spans
+        if self.floor_db is None:
+            self.floor_db = float(np.percentile(power_db, self.floor_percentile))
+
+        idx = np.arange(k)
+        opens = power_db >= self.floor_db + self.open_db
+        quiet = power_db < self.floor_db + self.close_db
+
+        # Length of the quiet run ending at each window (continuing the previous block's run)
+        last_loud = np.maximum.accumulate(np.where(quiet, -1, idx))
+        quiet_run = np.where(last_loud >= 0, idx - last_loud, idx + 1 + self._quiet_run)
+        closes = quiet & (quiet_run >= self.hang_windows)
+
+        # Hysteresis: each window takes the state of the latest open/close event, else the carried state
+        event = np.where(opens, 1, np.where(closes, 0, -1))
+        last_event = np.maximum.accumulate(np.where(event >= 0, idx, -1))
+        state = np.where(last_event >= 0, event[np.maximum(last_event, 0)] == 1, self.is_open)
+
+        # Transitions -> transmissions (absolute sample indices)
+        previous = np.concatenate(([self.is_open], state[:-1]))
+        base = self.samples
+        for i in np.flatnonzero(state != previous):
+            if state[i]:
+                self._start = base + int(ends[i]) - self.window
+                self.opened.append(self._start)
+            else:
+                end = base + int(ends[i]) - self.hang_windows * self.window
+                self._finish(end)
+
+        # Per-sample gate: window i decides the samples since window i-1 ended; the tail follows the last window
+        edges = np.concatenate(([0], ends, [n]))
+        gate = np.concatenate(([0], state, state[-1:], [0])).astype(np.int8)
+        changes = np.flatnonzero(np.diff(gate))
+        spans = [(int(edges[a]), int(edges[b])) for a, b in zip(changes[0::2], changes[1::2]) if edges[a] < edges[b]]
+
+        self.is_open = bool(state[-1])
+        self._quiet_run = int(quiet_run[-1]) if quiet[-1] else 0
+        self._open_run = self._open_run + k if np.all(state) else int(k - 1 - np.flatnonzero(~state)[-1])
+        self._update_floor(power_db, state)
+        self._advance(n, sum(stop - start for start, stop in spans))
+        return spans
+
+    def _update_floor(self, power_db: np.ndarray, state: np.ndarray):
+        closed = power_db[~state]
+        if len(closed):
+            estimate = float(np.percentile(closed, self.floor_percentile))
+        elif self._open_run >= self.relearn_windows:
+            # Open for longer than any plausible transmission: the noise itself went up
+            estimate = float(np.percentile(power_db, self.floor_percentile))
+            self._open_run = 0
+        else:
+            return
+        alpha = 1 - np.exp(-len(power_db) * self.window / self.sample_rate / self.floor_tc)
+        self.floor_db += alpha * (estimate - self.floor_db)
+
+    def _advance(self, n: int, open_samples: Optional[int] = None):
+        self.samples += n
+        self.open_samples += n if open_samples is None else open_samples
+
+    def _finish(self, end: int):
+        start, self._start = self._start, None
+        if start is not None and end - start >= self.min_samples:
+            self._completed.append((start, end))
+
+    def drain(self) -> List[Tuple[int, int]]:
+        """Transmissions completed since the last call, as absolute (start, end) samples"""
+        completed, self._completed = self._completed, []
+        return completed
+
+    def flush(self) -> List[Tuple[int, int]]:
+        """End of stream: close a transmission still in progress, then drain"""
+        if self.is_open:
+            self.is_open = False
+            # Ends where the signal did if the stream stopped during the hang time
+            quiet = self._acc_count + self._quiet_run * self.window if self._quiet_run else 0
+            self._finish(self.samples - quiet)
+        return self.drain()
+
+    @property
+    def current_start(self) -> Optional[int]:
+        """Start sample of the transmission in progress (None while closed)"""
+        return self._start if self.is_open else None
+
+    @property
+    def duty_cycle(self) -> float:
+        return self.open_samples / self.samples if self.samples else 0.0
+
+
+def format_time(epoch: float) -> str:
+    """Epoch seconds -> OpenMHz timestamp ("YYYY-MM-DDTHH:MM:SS.mmmZ")"""
+    millis = int(round(epoch * 1000))
+    seconds, millis = divmod(millis, 1000)
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S") + f".{millis:03d}Z"
+
+
+def call_record(start: int, end: int, sample_rate: float, start_time: float, freq: float,
+                talkgroup=None, url: str = '', filename: str = '') -> Dict:
+    """
+    An OpenMHz ``calls`` entry for one transmission
+
+    ``start``/``end`` are sample indices at ``sample_rate`` counted from
+    ``start_time`` (epoch seconds). Without a talkgroup the channel
+    frequency stands in for it.
+    """
+    begin = start_time + start / sample_rate
+    freq = int(round(freq))
+    return {
+        '_id': f"sdr-{freq}-{int(round(begin * 1000))}",
+        'talkgroupNum': freq if talkgroup is None else talkgroup,
+        'url': url,
+        'filename': filename,
+        'time': format_time(begin),
+        'srcList': [],
+        'star': 0,
+        'emergency': False,
+        'freq': freq,
+        'patches': [],
+        'len': round((end - start) / sample_rate, 2),
+    }
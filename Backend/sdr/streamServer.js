@@ -1,15 +1,88 @@
 import { spawn } from "child_process";
+import { createInterface } from "readline";
+import { fileURLToPath } from "url";
 import WebSocket, { WebSocketServer } from "ws";
 
+const AUDIO_RATE = 16000;
+const SPECTRUM_PORT = Number(process.env.SPECTRUM_PORT || 8081);
+const MAX_BUFFERED = 1 << 20;  // Skip waterfall rows for clients this far behind
+
 const wss = new WebSocketServer({ port: 8080 });
 console.log("WebSocket SDR stream server running on ws://localhost:8080");
+const spectrumWss = new WebSocketServer({ port: SPECTRUM_PORT });
+console.log(`Waterfall stream running on ws://localhost:${SPECTRUM_PORT}`);
+
+// Paced to the sample rate and open-ended, like a live receiver. Framed 16-bit IQ
+// carries the rate, center frequency and timestamps to both consumers.
+const simCapture = fileURLToPath(new URL("./sim-capture.py", import.meta.url));
+const capture = spawn("python3", [
+  simCapture,
+  "--scenario", process.env.SDR_SCENARIO || "bursty",
+  "--realtime", "--duration", "0",
+  "--format", "cs16",
+  `--freq=${process.env.SDR_CENTER || "99.9e6"}`,
+]);
+
+// Demodulate one channel to 16 kHz PCM: ~32 kB/s per client instead of 16 MB/s of raw IQ.
+// Squelched, so nothing is sent while the channel is idle; call records arrive on fd 3.
+const demodScript = fileURLToPath(new URL("./demod.py", import.meta.url));
+const py = spawn("python3", [
+  demodScript,
+  `--offset=${process.env.SDR_OFFSET || "-125e3"}`,
+  "--mode", process.env.SDR_MODE || "nfm",
+  "--audio-rate", String(AUDIO_RATE),
+  "--squelch",
+  "--calls", "/dev/fd/3",
+], { stdio: ["pipe", "pipe", "pipe", "pipe"] });
+capture.stdout.pipe(py.stdin);
 
-const py = spawn("python", ["backend/sdr/sim-capture.py"]);
+// The whole band as a few averaged uint8 spectrum rows per second (~7 kB/s)
+const waterfallScript = fileURLToPath(new URL("./waterfall.py", import.meta.url));
+const waterfall = spawn("python3", [
+  waterfallScript,
+  "--nfft", process.env.SPECTRUM_BINS || "1024",
+  "--fps", process.env.SPECTRUM_FPS || "5",
+]);
+capture.stdout.pipe(waterfall.stdin);
+
+const broadcast = (message) => {
+  for (const client of wss.clients) {
+    if (client.readyState === WebSocket.OPEN) client.send(message);
+  }
+};
+// One JSON line per finished transmission, same shape as an OpenMHz call
+createInterface({ input: py.stdio[3] }).on("line", (line) => {
+  broadcast(JSON.stringify({ type: "call", call: JSON.parse(line) }));
+});
 
 wss.on("connection", (ws) => {
   console.log("Client connected.");
-  py.stdout.on("data", (data) => ws.send(data));  // Stream IQ data
-  ws.on("close", () => console.log("Client disconnected."));
+  ws.send(JSON.stringify({ format: "s16le", sampleRate: AUDIO_RATE, channels: 1 }));
+  const forward = (data) => {  // Stream PCM audio
+    if (ws.readyState === WebSocket.OPEN) ws.send(data);
+  };
+  py.stdout.on("data", forward);
+  ws.on("close", () => {
+    py.stdout.off("data", forward);
+    console.log("Client disconnected.");
+  });
+});
+
+// First line describes the rows; late joiners get it on connect
+let spectrumFormat = null;
+createInterface({ input: waterfall.stdout }).on("line", (line) => {
+  if (spectrumFormat === null) {
+    spectrumFormat = line;
+  }
+  for (const client of spectrumWss.clients) {
+    if (client.readyState === WebSocket.OPEN && client.bufferedAmount < MAX_BUFFERED) client.send(line);
+  }
+});
+
+spectrumWss.on("connection", (ws) => {
+  if (spectrumFormat !== null) ws.send(spectrumFormat);
 });
 
-py.stderr.on("data", (d) => console.error("SDR error:", d.toString()));
+capture.stderr.on("data", (d) => console.error("SDR error:", d.toString()));
+py.stderr.on("data", (d) => console.error("Demod error:", d.toString()));
+waterfall.stderr.on("data", (d) => console.error("Waterfall error:", d.toString()));
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Audio prefetch and content-addressed cache tests against a local stand-in server
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'openmhz')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+from audio_cache import AudioCache, AudioPrefetcher
+from ingest_openmhz import ingest_systems
+from mock_openmhz_server import MockOpenMHzServer, fake_audio, load_fixture_calls, rebase_calls, talkgroups_for
+
+
+def local_media(calls, base_url):
+    """Point call audio URLs at the stand-in server"""
+    return [dict(c, url=base_url + '/media/' + c['url'].split('/media/', 1)[1]) for c in calls]
+
+
+def test_ingest_prefetches_audio_once(tmp_path):
+    calls = rebase_calls(load_fixture_calls())
+    with MockOpenMHzServer({'dcfd': {'calls': [], 'talkgroups': talkgroups_for(calls)}}) as server:
+        server.add_calls('dcfd', local_media(calls, server.url))
+        kwargs = dict(base_url=server.url, talkgroup_cache=None, wallet_cache=None,
+                      audio_cache=str(tmp_path / 'audio'))
+        profile = ingest_systems(['dcfd'], **kwargs)['systems']['dcfd']
+        media_requests = sum(1 for path in server.request_log if path.startswith('/media/'))
+        assert profile['total_streams'] > 0
+
+        for stream in profile['streams']:
+            path = stream['audio_path']
+            assert path.startswith(str(tmp_path / 'audio'))
+            assert os.path.basename(path) == stream['metadata']['call_id'] + '.m4a'
+            with open(path, 'rb') as f:
+                assert f.read() == fake_audio('/media/' + stream['audio_url'].split('/media/', 1)[1])
+        assert media_requests == profile['total_streams']
+
+        # Second run is served entirely from disk
+        ingest_systems(['dcfd'], **kwargs)
+        assert sum(1 for path in server.request_log if path.startswith('/media/')) == media_requests
+
+
+def test_lru_eviction_keeps_recent_files(tmp_path):
+    with MockOpenMHzServer() as server:
+        cache = AudioCache(str(tmp_path), max_bytes=3 * 4096)
+        prefetcher = AudioPrefetcher(cache, max_workers=2)
+        try:
+            paths = []
+            for i in range(3):
+                paths.append(prefetcher.submit(f"call{i}", f"{server.url}/media/{i}.m4a").result())
+                time.sleep(0.01)
+            # Touch the oldest so call1 becomes least recently used
+            assert cache.get('call0', f"{server.url}/media/0.m4a") == paths[0]
+            prefetcher.submit('call3', f"{server.url}/media/3.m4a").result()
+        finally:
+            prefetcher.close()
+
+        assert os.path.exists(paths[0]) and not os.path.exists(paths[1])
+        assert cache.stats()['bytes'] <= cache.max_bytes
+
+        # Failed downloads resolve to None instead of raising
+        failing = AudioPrefetcher(cache)
+        try:
+            assert failing.submit('missing', f"{server.url}/nope/x.m4a").result() is None
+            assert failing.stats['failures'] == 1
+        finally:
+            failing.close()
+
+
+def test_eviction_trims_to_the_low_water_mark(tmp_path):
+    with MockOpenMHzServer() as server:
+        cache = AudioCache(str(tmp_path), max_bytes=10 * 4096, low_water=0.5)
+        scans = []
+        scan = cache._scan
+        cache._scan = lambda: scans.append(1) or scan()
+        prefetcher = AudioPrefetcher(cache, max_workers=1)
+        try:
+            for i in range(16):
+                prefetcher.submit(f"call{i}", f"{server.url}/media/{i}.m4a").result()
+        finally:
+            prefetcher.close()
+
+    # Over budget at the 11th file: trimmed to 5, so the next 5 downloads need no scan
+    assert len(scans) == 1 and cache.stats()['files'] == 10
+    assert cache.total_bytes == 10 * 4096
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Smoke tests for the ingestion micro-benchmarks (tiny sizes only)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+from bench_ingest import compare, parse_size, run_suite, synth_calls
+
+
+def test_synthetic_calls_are_deterministic_and_schema_shaped():
+    first = synth_calls(200, talkgroups=50, seed=7)
+    assert first == synth_calls(200, talkgroups=50, seed=7)
+    assert first != synth_calls(200, talkgroups=50, seed=8)
+
+    call = first[0]
+    assert set(call) == {'_id', 'talkgroupNum', 'url', 'filename', 'time', 'srcList',
+                         'star', 'emergency', 'freq', 'patches', 'len'}
+    assert len(call['time']) == 24 and call['time'].endswith('Z')
+    assert all(1000 <= c['talkgroupNum'] < 1050 for c in first)
+    assert [c['time'] for c in first] == sorted((c['time'] for c in first), reverse=True)
+
+
+def test_suite_reports_throughput_and_memory():
+    results = run_suite([50], talkgroup_count=20, repeat=1, verbose=False)
+    names = {r['benchmark'] for r in results}
+    assert names == {'build_talkgroup_lookup', 'generate_profile', 'generate_system_profile',
+                     'json_serialize', 'registry_save'}
+    for result in results:
+        assert result['items_per_second'] > 0
+        assert result['peak_mb'] is not None
+
+
+def test_compare_flags_throughput_drops():
+    baseline = {'results': [{'benchmark': 'json_serialize', 'calls': 1000, 'items_per_second': 100.0}]}
+    slower = [{'benchmark': 'json_serialize', 'calls': 1000, 'items_per_second': 80.0}]
+    assert compare(slower, baseline, tolerance=0.15)[0]['ratio'] == 0.8
+    assert compare(slower, baseline, tolerance=0.25) == []
+    assert parse_size('1M') == 1000000 and parse_size('100k') == 100000 and parse_size('250') == 250
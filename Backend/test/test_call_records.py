@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Compact CallRecord representation tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'openmhz')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+from ingest_openmhz import CallRecord, StreamProfileGenerator, to_call_records
+from mock_openmhz_server import call_time_ms, load_fixture_calls, talkgroups_for
+
+
+def test_record_profile_matches_call_fields():
+    call = load_fixture_calls()[0]
+    tg_info = {'num': call['talkgroupNum'], 'description': 'Engine 1', 'tag': 'Fire Dispatch'}
+    profile = StreamProfileGenerator.generate_profile(call, 'dcfd', tg_info)
+
+    assert profile == {
+        'stream_id': f"dcfd-{call['talkgroupNum']}-{call['_id']}",
+        'name': 'Engine 1',
+        'description': f"System: dcfd | Category: Fire Dispatch | Duration: {call['len']}s | "
+                       f"Radios: {len(call['srcList'])}",
+        'audio_url': call['url'],
+        'system_name': 'dcfd',
+        'talkgroup_id': call['talkgroupNum'],
+        'timestamp': call['time'],
+        'duration': call['len'],
+        'metadata': {'call_id': call['_id'], 'talkgroup_info': tg_info}
+    }
+
+
+def test_records_are_slotted_with_numeric_time_and_interned_ids():
+    calls = load_fixture_calls()
+    records = to_call_records(calls, ''.join(['dc', 'fd']))
+    assert not hasattr(records[0], '__dict__')
+    assert [r.time_ms for r in records] == [call_time_ms(c) for c in calls]
+    assert records[0].system_id is records[-1].system_id is sys.intern('dcfd')
+
+    # Non-canonical timestamps survive unchanged
+    odd = CallRecord.from_call(dict(calls[0], time='2025-10-23T19:58:19Z'), 'dcfd')
+    assert odd.timestamp == '2025-10-23T19:58:19Z'
+
+
+def test_system_profile_sorted_newest_first():
+    calls = load_fixture_calls()
+    profile = StreamProfileGenerator.generate_system_profile('dcfd', talkgroups_for(calls), calls)
+    ids = [s['metadata']['call_id'] for s in profile['streams']]
+    expected = [c['_id'] for c in sorted(calls, key=call_time_ms, reverse=True)]
+    assert ids == expected
+    assert profile['streams'][0]['metadata']['talkgroup_info']['tag'] in ('Fire Dispatch', 'Law Dispatch')
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Paged historical backfill tests against a local stand-in OpenMHz server
+"""
+
+import io
+import json
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'openmhz')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+from ingest_openmhz import backfill_systems, parse_backfill_range
+from mock_openmhz_server import MockOpenMHzServer, call_time_ms, load_fixture_calls, talkgroups_for
+
+
+class FlakyServer(MockOpenMHzServer):
+    """Fails every calls page after ``fail_after_ms`` (simulates an interrupted run)"""
+
+    fail_after_ms = None
+
+    def route(self, path, query, headers=None):
+        if self.fail_after_ms is not None and int(query.get('time', ['0'])[0]) >= self.fail_after_ms:
+            return 400, {'error': 'boom'}  # not retried
+        return super().route(path, query, headers)
+
+
+def run_backfill(server, start_ms, end_ms, checkpoint):
+    out = io.StringIO()
+    summary = backfill_systems(['dcfd'], start_ms / 1000, end_ms / 1000, out,
+                               base_url=server.url, slice_seconds=60, rate=1000,
+                               checkpoint_file=checkpoint, talkgroup_cache=None)
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert lines[-1] == summary
+    return [s['metadata']['call_id'] for s in lines[:-1]], summary
+
+
+def test_backfill_resumes_from_checkpoint(tmp_path):
+    calls = [c for c in load_fixture_calls() if c['len'] > 0]
+    times = sorted(call_time_ms(c) for c in calls)
+    start_ms, end_ms = times[0], times[-1] + 1
+    checkpoint = str(tmp_path / 'checkpoint.json')
+
+    server = FlakyServer({'dcfd': {'calls': calls, 'talkgroups': talkgroups_for(calls)}}, page_size=3)
+    server.fail_after_ms = times[len(times) // 2]
+    with server:
+        first, summary = run_backfill(server, start_ms, end_ms, checkpoint)
+        assert not summary['complete'] and summary['failed_slices'] > 0
+        assert os.path.exists(checkpoint)
+
+        server.fail_after_ms = None
+        second, summary = run_backfill(server, start_ms, end_ms, checkpoint)
+        assert summary['complete'] and summary['failed_slices'] == 0
+        assert not os.path.exists(checkpoint)
+
+    # Every call exactly once across both runs, none outside the range
+    assert sorted(first + second) == sorted(c['_id'] for c in calls)
+
+
+class MalformedServer(MockOpenMHzServer):
+    """Adds a call without a parseable time to every calls page"""
+
+    def route(self, path, query, headers=None):
+        status, body = super().route(path, query, headers)
+        if path.endswith('/calls/newer') and status == 200 and body['calls']:
+            body = dict(body, calls=body['calls'] + [dict(body['calls'][0], _id='bad', time='not a time')])
+        return status, body
+
+
+def test_backfill_skips_calls_without_a_valid_time(tmp_path):
+    calls = [c for c in load_fixture_calls() if c['len'] > 0]
+    times = sorted(call_time_ms(c) for c in calls)
+    server = MalformedServer({'dcfd': {'calls': calls, 'talkgroups': talkgroups_for(calls)}}, page_size=3)
+    with server:
+        ids, summary = run_backfill(server, times[0], times[-1] + 1, str(tmp_path / 'checkpoint.json'))
+    assert summary['complete'] and summary['failed_slices'] == 0
+    assert sorted(ids) == sorted(c['_id'] for c in calls)
+
+
+class BrokenOutput(io.StringIO):
+    """A reader that went away after the first line (``| head -1``)"""
+
+    def write(self, text):
+        if self.tell():
+            raise BrokenPipeError(32, 'Broken pipe')
+        return super().write(text)
+
+
+def test_backfill_does_not_hang_when_output_fails(tmp_path):
+    calls = [c for c in load_fixture_calls() if c['len'] > 0]
+    times = sorted(call_time_ms(c) for c in calls)
+    server = MockOpenMHzServer({'dcfd': {'calls': calls, 'talkgroups': talkgroups_for(calls)}}, page_size=1)
+    outcome = []
+
+    def run():
+        try:
+            backfill_systems(['dcfd'], times[0] / 1000, (times[-1] + 1) / 1000, BrokenOutput(),
+                             base_url=server.url, slice_seconds=10, rate=1000, max_workers=2,
+                             checkpoint_file=str(tmp_path / 'checkpoint.json'), talkgroup_cache=None)
+        except BrokenPipeError as e:
+            outcome.append(e)
+
+    with server:
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(timeout=30)
+    assert not thread.is_alive(), "backfill hung with walkers blocked on the full results queue"
+    assert len(outcome) == 1
+    assert os.path.exists(tmp_path / 'checkpoint.json')  # Progress so far is kept for the next run
+
+
+def test_parse_backfill_range():
+    assert parse_backfill_range('1000..2000') == (1000.0, 2000.0)
+    start, end = parse_backfill_range('2025-10-23T19:00:00Z..2025-10-23T20:00:00')
+    assert end - start == 3600
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Multi-system ingestion tests against a local stand-in OpenMHz server
+"""
+
+import io
+import json
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'openmhz')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+from ingest_openmhz import OpenMHZClient, TalkgroupCache, ingest_systems, load_systems_file, stream_systems
+from mock_openmhz_server import MockOpenMHzServer, load_fixture_calls, rebase_calls, talkgroups_for
+
+SYSTEM_IDS = ['alpha', 'bravo', 'charlie', 'delta']
+
+
+def make_server(delay: float = 0.0) -> MockOpenMHzServer:
+    calls = rebase_calls(load_fixture_calls())
+    systems = {sid: {'calls': calls, 'talkgroups': talkgroups_for(calls)} for sid in SYSTEM_IDS}
+    return MockOpenMHzServer(systems, delay=delay)
+
+
+def test_ingest_systems_combines_all_systems():
+    with make_server() as server:
+        result = ingest_systems(SYSTEM_IDS, base_url=server.url, talkgroup_cache=None)
+
+    assert result['total_systems'] == len(SYSTEM_IDS)
+    assert list(result['systems']) == SYSTEM_IDS
+    per_system = result['systems']['alpha']['total_streams']
+    assert per_system > 0
+    assert result['total_streams'] == per_system * len(SYSTEM_IDS)
+    assert result['systems']['bravo']['streams'][0]['stream_id'].startswith('bravo-')
+
+
+def test_ingest_systems_respects_per_host_cap():
+    with make_server(delay=0.05) as server:
+        ingest_systems(SYSTEM_IDS, base_url=server.url, max_workers=8, per_host=2, talkgroup_cache=None)
+        assert len(server.request_log) == 2 * len(SYSTEM_IDS)
+        assert server.max_in_flight <= 2
+
+
+def test_ingest_systems_runs_concurrently():
+    with make_server(delay=0.05) as server:
+        ingest_systems(SYSTEM_IDS, base_url=server.url, max_workers=8, per_host=8, talkgroup_cache=None)
+        assert server.max_in_flight > 1
+
+
+def test_load_systems_file(tmp_path):
+    text_file = tmp_path / 'systems.txt'
+    text_file.write_text("alpha\n# comment\nbravo  # inline\n\n")
+    assert load_systems_file(str(text_file)) == ['alpha', 'bravo']
+
+    json_file = tmp_path / 'systems.json'
+    json_file.write_text('["alpha", "charlie"]')
+    assert load_systems_file(str(json_file)) == ['alpha', 'charlie']
+
+
+def test_stream_systems_writes_one_line_per_stream_then_summary():
+    out = io.StringIO()
+    with make_server() as server:
+        summary = stream_systems(SYSTEM_IDS[:2], out, base_url=server.url, talkgroup_cache=None)
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert records[-1] == summary
+    assert summary['type'] == 'summary'
+    assert len(records) - 1 == summary['total_streams'] == sum(summary['systems'].values())
+    assert {r['system_name'] for r in records[:-1]} == set(SYSTEM_IDS[:2])
+
+
+def test_talkgroup_cache_serves_fresh_entries_and_revalidates_stale_ones(tmp_path):
+    cache_dir = str(tmp_path / 'talkgroups')
+    with make_server() as server:
+        client = OpenMHZClient('alpha', base_url=server.url)
+        talkgroups, lookup = TalkgroupCache(cache_dir, ttl=60).get(client)
+        assert len(server.request_log) == 1
+        assert lookup[729]['num'] == 729
+
+        # Fresh entry on disk: a new process makes no request
+        assert TalkgroupCache(cache_dir, ttl=60).get(client)[1] == lookup
+        assert len(server.request_log) == 1
+
+        # Expired entry: revalidated with If-None-Match and answered 304
+        _, revalidated = TalkgroupCache(cache_dir, ttl=0).get(client)
+        assert len(server.request_log) == 2
+        assert revalidated == lookup
+
+
+def test_talkgroup_cache_refetches_over_a_file_of_the_wrong_shape(tmp_path):
+    cache_dir = tmp_path / 'talkgroups'
+    cache_dir.mkdir()
+    with make_server() as server:
+        client = OpenMHZClient('alpha', base_url=server.url)
+        for stored in ([], {'talkgroups': []}, {'talkgroups': [], 'lookup': [[729, 3]]},
+                       {'talkgroups': [], 'lookup': []}):
+            (cache_dir / 'alpha.json').write_text(json.dumps(stored))
+            assert TalkgroupCache(str(cache_dir), ttl=60).get(client)[1][729]['num'] == 729
+        assert len(server.request_log) == 4
+    assert TalkgroupCache(str(cache_dir), ttl=60)._load('alpha')['lookup'][729]['num'] == 729
+
+
+def test_talkgroup_cache_writers_sharing_a_directory_do_not_collide(tmp_path):
+    cache_dir = str(tmp_path / 'talkgroups')
+    with make_server() as server:
+        client = OpenMHZClient('alpha', base_url=server.url)
+        TalkgroupCache(cache_dir, ttl=60).get(client)
+        entry = TalkgroupCache(cache_dir, ttl=60)._load('alpha')
+
+    def writer():  # Separate caches, as cron runs and --serve are separate processes
+        for _ in range(20):
+            TalkgroupCache(cache_dir, ttl=60)._store('alpha', entry)
+
+    threads = [threading.Thread(target=writer) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert TalkgroupCache(cache_dir, ttl=60)._load('alpha')['lookup'] == entry['lookup']
+    assert os.listdir(cache_dir) == ['alpha.json']
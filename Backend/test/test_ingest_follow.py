@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Watermark follow-mode tests against a local stand-in OpenMHz server
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'openmhz')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+from ingest_openmhz import CallRecord, Watermark, follow_systems
+from mock_openmhz_server import MockOpenMHzServer, call_time_ms, load_fixture_calls, rebase_calls, talkgroups_for
+
+
+def run_cycle(server, state_file):
+    profiles = []
+    follow_systems(['dcfd'], base_url=server.url, state_file=state_file,
+                   interval=0, lookback=3600, max_cycles=1, talkgroup_cache=None,
+                   on_profile=profiles.append)
+    return [s['metadata']['call_id'] for p in profiles for s in p['streams']]
+
+
+def test_follow_processes_only_new_calls(tmp_path):
+    calls = sorted((c for c in rebase_calls(load_fixture_calls()) if c['len'] > 0), key=call_time_ms)
+    first, later = calls[:30], calls[30:]
+    state_file = str(tmp_path / 'watermarks.json')
+
+    with MockOpenMHzServer({'dcfd': {'calls': first, 'talkgroups': talkgroups_for(calls)}}, page_size=10) as server:
+        seen = run_cycle(server, state_file)
+        assert sorted(seen) == sorted(c['_id'] for c in first)
+
+        # Nothing new: a second cycle processes no calls
+        assert run_cycle(server, state_file) == []
+
+        server.add_calls('dcfd', later)
+        seen = run_cycle(server, state_file)
+        assert sorted(seen) == sorted(c['_id'] for c in later)
+
+
+def test_watermark_dedupes_calls_sharing_a_timestamp():
+    stamp = '2025-10-23T19:58:19.000Z'
+    watermark = Watermark()
+    assert len(watermark.filter_new([{'_id': 'a', 'time': stamp}])) == 1
+
+    # Same timestamp: only the unseen ID passes, and it stays remembered
+    fresh = watermark.filter_new([{'_id': 'a', 'time': stamp}, {'_id': 'b', 'time': stamp}])
+    assert [c['_id'] for c in fresh] == ['b']
+    assert Watermark.from_dict(watermark.to_dict()).seen_ids == {'a', 'b'}
+
+
+def test_watermark_and_call_records_agree_on_milliseconds():
+    call = dict(load_fixture_calls()[0], time='2025-10-23T19:58:19.123600Z')  # Sub-millisecond precision
+    watermark = Watermark()
+    watermark.filter_new([call])
+    assert watermark.time_ms == CallRecord.from_call(call, 'dcfd').time_ms
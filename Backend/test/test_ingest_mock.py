@@ -1,11 +1,20 @@
 #!/usr/bin/env python3
 """
-Mock test for OpenMHz ingestion - demonstrates functionality without API access
+Mock test for OpenMHz ingestion - exercises profile generation without API access
+
+Run directly to print the generated profile:
+    python3 test_ingest_mock.py
 """
 
 import json
+import os
+import sys
 from datetime import datetime, timedelta
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'openmhz')))
+
+from ingest_openmhz import StreamProfileGenerator
+
 # Mock data that simulates OpenMHz API responses
 MOCK_TALKGROUPS = [
     {
@@ -76,85 +85,54 @@ MOCK_CALLS = [
     }
 ]
 
+MOCK_WALLET = {
+    "walletAddress": "0x0000000000000000000000000000000000003344",
+    "mode": "simple",
+    "createdAt": "2025-10-23T12:00:00.000Z"
+}
 
-def test_mock_ingestion():
-    """Test the ingestion with mock data"""
-    print("=" * 80)
-    print("OpenMHz Ingestion Mock Test (with Wallet Assignment)")
-    print("=" * 80)
-    print()
-
-    # Import from the actual script
-    import sys
-    import os
-    sys.path.insert(0, '.')
-    from ingest_openmhz import StreamProfileGenerator, WalletAssigner
 
+def test_mock_ingestion():
+    """Generate a system profile from mock data and check every stream"""
     system_id = "test-system"
-
-    print(f"Testing with mock data for system: {system_id}")
-    print(f"Mock talkgroups: {len(MOCK_TALKGROUPS)}")
-    print(f"Mock calls: {len(MOCK_CALLS)}")
-    print()
-
-    # Try to initialize wallet assigner (may fail if ts-node not available)
-    wallet_assigner = None
-    assign_wallets = False
-    backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-
-    if os.path.exists(os.path.join(backend_dir, 'scripts', 'generateStreamWallet.ts')):
-        print(f"✓ Found wallet generation script")
-        try:
-            wallet_assigner = WalletAssigner(backend_dir)
-            assign_wallets = True
-            print(f"✓ Wallet assigner initialized")
-        except Exception as e:
-            print(f"⚠ Could not initialize wallet assigner: {e}")
-            print(f"  Continuing without wallet assignment")
-    else:
-        print(f"⚠ Wallet generation script not found")
-        print(f"  Continuing without wallet assignment")
-
-    print()
-
-    # Generate system profile
-    profile = StreamProfileGenerator.generate_system_profile(
-        system_id,
-        MOCK_TALKGROUPS,
-        MOCK_CALLS,
-        wallet_assigner=wallet_assigner,
-        assign_wallets=assign_wallets
+    profile = StreamProfileGenerator.generate_system_profile(system_id, MOCK_TALKGROUPS, MOCK_CALLS)
+
+    assert profile['system_id'] == system_id
+    assert profile['total_streams'] == len(MOCK_CALLS)
+    assert profile['generated_at'].endswith('Z')
+
+    # Newest call first
+    streams = profile['streams']
+    assert [s['metadata']['call_id'] for s in streams] == [c['_id'] for c in MOCK_CALLS]
+
+    for stream, call in zip(streams, MOCK_CALLS):
+        assert stream['stream_id'] == f"{system_id}-{call['talkgroupNum']}-{call['_id']}"
+        assert stream['audio_url'] == call['url']
+        assert stream['talkgroup_id'] == call['talkgroupNum']
+        assert stream['duration'] == call['len']
+        assert f"Radios: {len(call['srcList'])}" in stream['description']
+        assert stream['metadata']['talkgroup_info']['num'] == call['talkgroupNum']
+        assert 'wallet' not in stream
+
+    assert streams[0]['name'] == "Fire Dispatch"
+    assert "Category: Fire Dispatch" in streams[0]['description']
+    json.dumps(profile)  # Serializable as-is
+
+
+def test_mock_profile_with_wallet():
+    """Wallet script output is reduced to address/mode/created_at on the profile"""
+    stream = StreamProfileGenerator.generate_profile(
+        MOCK_CALLS[0], "test-system", MOCK_TALKGROUPS[0], wallet_data=MOCK_WALLET
     )
-
-    print("✓ Successfully generated system profile")
-    print()
-    print("Profile Summary:")
-    print(f"  System ID: {profile['system_id']}")
-    print(f"  Total Talkgroups: {profile['total_talkgroups']}")
-    print(f"  Total Streams: {profile['total_streams']}")
-    print(f"  Generated At: {profile['generated_at']}")
-    print()
-
-    print("Streams:")
-    print("-" * 80)
-    for i, stream in enumerate(profile['streams'], 1):
-        print(f"\n{i}. {stream['name']}")
-        print(f"   ID: {stream['stream_id']}")
-        print(f"   Description: {stream['description']}")
-        print(f"   Audio URL: {stream['audio_url']}")
-        print(f"   Talkgroup: {stream['talkgroup_id']}")
-        print(f"   Duration: {stream['duration']}s")
-        print(f"   Radios: {len(stream['src_list'])}")
-        if 'wallet' in stream:
-            print(f"   ✓ Wallet: {stream['wallet']['address']}")
-
-    print()
-    print("=" * 80)
-    print("✓ All tests passed!")
-    print()
-    print("Full JSON output:")
-    print(json.dumps(profile, indent=2))
+    assert stream['wallet'] == {
+        'address': MOCK_WALLET['walletAddress'],
+        'mode': 'simple',
+        'created_at': MOCK_WALLET['createdAt']
+    }
 
 
 if __name__ == '__main__':
-    test_mock_ingestion()
+    print(json.dumps(
+        StreamProfileGenerator.generate_system_profile("test-system", MOCK_TALKGROUPS, MOCK_CALLS),
+        indent=2
+    ))
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Resident ingestion service tests against a local stand-in OpenMHz server
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+OPENMHZ_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'openmhz'))
+sys.path.insert(0, OPENMHZ_DIR)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+from ingest_openmhz import IngestService, create_server
+from mock_openmhz_server import MockOpenMHzServer, load_fixture_calls, rebase_calls, talkgroups_for
+
+
+def test_service_answers_from_warm_caches():
+    calls = rebase_calls(load_fixture_calls())
+    with MockOpenMHzServer({'dcfd': {'calls': calls, 'talkgroups': talkgroups_for(calls)}}) as upstream:
+        service = IngestService(base_url=upstream.url, call_ttl=60)
+        server = create_server(service, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+
+        def get(path):
+            with urllib.request.urlopen(base + path) as response:
+                return json.loads(response.read())
+
+        try:
+            first = get('/ingest?system=dcfd')
+            second = get('/ingest?system=dcfd')
+            talkgroups = get('/talkgroups?system=dcfd')
+            upstream_requests = len(upstream.request_log)
+        finally:
+            server.shutdown()
+            server.server_close()
+            service.close()
+
+    assert first['total_streams'] > 0
+    assert [s['stream_id'] for s in second['streams']] == [s['stream_id'] for s in first['streams']]
+    assert talkgroups['total_talkgroups'] == len(talkgroups_for(calls))
+    assert upstream_requests == 2  # One talkgroup fetch and one call fetch
+
+
+def test_call_cache_shares_fetches_and_hands_out_copies():
+    calls = rebase_calls(load_fixture_calls())
+    with MockOpenMHzServer({'dcfd': {'calls': calls, 'talkgroups': talkgroups_for(calls)}}, delay=0.2) as upstream:
+        service = IngestService(base_url=upstream.url, call_ttl=60)
+        try:
+            with ThreadPoolExecutor(4) as pool:
+                results = list(pool.map(lambda _: service.calls('dcfd'), range(4)))
+            fetches = sum('/calls/' in path for path in upstream.request_log)
+            results[0][0].wallet = {'address': '0xabc'}
+            again = service.calls('dcfd')
+
+            service.call_ttl = 0  # Everything cached is now expired
+            service.calls('dcfd', [calls[0]['talkgroupNum']])
+            keys = list(service._calls)
+        finally:
+            service.close()
+
+    assert fetches == 1  # Concurrent misses waited for one fetch
+    assert len({id(records[0]) for records in results}) == 4 and again[0].wallet is None
+    assert keys == [('dcfd', (calls[0]['talkgroupNum'],))]
+
+
+def test_cli_lists_talkgroups_or_fails(tmp_path):
+    calls = rebase_calls(load_fixture_calls())
+    command = [sys.executable, os.path.join(OPENMHZ_DIR, 'ingest_openmhz.py'), '--list-talkgroups',
+               '--talkgroup-cache', str(tmp_path)]
+    with MockOpenMHzServer({'dcfd': {'calls': calls, 'talkgroups': talkgroups_for(calls)}}) as upstream:
+        listed = subprocess.run(command + ['--system', 'dcfd', '--api-url', upstream.url],
+                                capture_output=True, text=True)
+        missing = subprocess.run(command + ['--system', 'nowhere', '--api-url', upstream.url],
+                                 capture_output=True, text=True)
+
+    assert listed.returncode == 0 and json.loads(listed.stdout)['talkgroups'] == talkgroups_for(calls)
+    assert missing.returncode == 1 and missing.stdout == ''  # No empty list passed off as the answer
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Ingestion metrics tests: Prometheus rendering and per-stage instrumentation
+"""
+
+import os
+import sys
+import threading
+import urllib.request
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'openmhz')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+from ingest_openmhz import IngestService, create_server, ingest_systems
+from metrics import METRICS, MetricsRegistry
+from mock_openmhz_server import MockOpenMHzServer, load_fixture_calls, rebase_calls, talkgroups_for
+
+
+def make_server() -> MockOpenMHzServer:
+    calls = rebase_calls(load_fixture_calls())
+    return MockOpenMHzServer({'dcfd': {'calls': calls, 'talkgroups': talkgroups_for(calls)}})
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    registry.inc('openmhz_api_requests_total', system='dcfd', status='200')
+    registry.inc('openmhz_api_requests_total', system='dcfd', status='200')
+    for value in (0.002, 0.02, 0.2):
+        registry.observe('ingest_stage_seconds', value, stage='fetch_calls')
+
+    text = registry.render_prometheus()
+    assert '# TYPE openmhz_api_requests_total counter' in text
+    assert 'openmhz_api_requests_total{status="200",system="dcfd"} 2' in text
+    assert 'ingest_stage_seconds_bucket{stage="fetch_calls",le="0.025"} 2' in text
+    assert 'ingest_stage_seconds_bucket{stage="fetch_calls",le="+Inf"} 3' in text
+    assert 'ingest_stage_seconds_count{stage="fetch_calls"} 3' in text
+
+    timing = registry.summary()['timings']['ingest_stage_seconds']['stage=fetch_calls']
+    assert timing['count'] == 3
+    assert timing['p50'] == 0.025
+    assert timing['max'] == 0.2
+
+
+def test_ingest_records_stage_and_request_metrics(tmp_path):
+    METRICS.reset()
+    with make_server() as server:
+        server.inject(503)
+        result = ingest_systems(['dcfd'], base_url=server.url, talkgroup_cache=None,
+                                save_registry=True, registry_db=str(tmp_path / 'streams.db'))
+
+    summary = METRICS.summary()
+    stages = summary['timings']['ingest_stage_seconds']
+    for stage in ('fetch_talkgroups', 'fetch_calls', 'profiles', 'registry_write'):
+        assert stages[f'stage={stage}']['count'] >= 1
+    assert METRICS.counter_value('ingest_streams_total', system='dcfd') == result['total_streams']
+    assert METRICS.counter_value('openmhz_api_retries_total', system='dcfd', endpoint='talkgroups') + \
+        METRICS.counter_value('openmhz_api_retries_total', system='dcfd', endpoint='calls') == 1
+    assert METRICS.counter_value('openmhz_api_requests_total', system='dcfd', endpoint='calls', status='200') == 1
+
+
+def test_service_exposes_metrics_endpoint():
+    METRICS.reset()
+    with make_server() as upstream:
+        service = IngestService(base_url=upstream.url)
+        server = create_server(service, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            urllib.request.urlopen(base + '/ingest?system=dcfd').read()
+            with urllib.request.urlopen(base + '/metrics') as response:
+                content_type = response.headers['Content-Type']
+                text = response.read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+            service.close()
+
+    assert content_type.startswith('text/plain')
+    assert 'openmhz_api_request_seconds_count{endpoint="calls",system="dcfd"} 1' in text
+    assert 'ingest_stage_seconds_sum{stage="profiles"}' in text
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Registry store tests - incremental upserts, indexed queries, concurrent writers, streams.json export
+"""
+
+import json
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'openmhz')))
+
+from ingest_openmhz import StreamProfileGenerator
+from registry_store import RegistryStore, open_registry
+
+
+def make_profile(system_id, start, count, talkgroup=3344):
+    calls = [{
+        '_id': f'{system_id}{i}', 'talkgroupNum': talkgroup + (i % 2), 'len': 4, 'srcList': [],
+        'time': f'2025-10-23T19:{i // 60:02d}:{i % 60:02d}.000Z'
+    } for i in range(start, start + count)]
+    return StreamProfileGenerator.generate_system_profile(system_id, [], calls)
+
+
+def test_upserts_are_incremental_and_queryable(tmp_path):
+    with RegistryStore(str(tmp_path / 'streams.db')) as store:
+        store.upsert_profile(make_profile('dcfd', 0, 10))
+        store.upsert_profile(make_profile('dcfd', 5, 10))  # Overlaps 5 streams
+
+        assert len(store.query(system_id='dcfd')) == 15
+        newest = store.query(system_id='dcfd', talkgroup_id=3344, limit=3)
+        assert [s['metadata']['call_id'] for s in newest] == ['dcfd14', 'dcfd12', 'dcfd10']
+
+        export = store.export()
+        assert export['dcfd']['total_streams'] == 15
+        assert 'last_updated' in export
+
+
+def test_concurrent_writers_do_not_lose_updates(tmp_path):
+    db = str(tmp_path / 'streams.db')
+    RegistryStore(db).close()
+
+    def writer(system_id):
+        with RegistryStore(db) as store:
+            for batch in range(5):
+                store.upsert_profile(make_profile(system_id, batch * 10, 10))
+
+    threads = [threading.Thread(target=writer, args=(sid,)) for sid in ('alpha', 'bravo', 'charlie')]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    with RegistryStore(db) as store:
+        export = store.export()
+    assert {sid: export[sid]['total_streams'] for sid in ('alpha', 'bravo', 'charlie')} == \
+        {'alpha': 50, 'bravo': 50, 'charlie': 50}
+
+
+def test_retention_bounds_the_store_and_the_export(tmp_path):
+    path = tmp_path / 'streams.json'
+    with RegistryStore(str(tmp_path / 'streams.db'), keep_per_system=8) as store:
+        for batch in range(4):
+            store.upsert_profile(make_profile('dcfd', batch * 5, 5))
+            store.upsert_profile(make_profile('kcers1b', batch * 5, 2))
+        assert len(store.query(system_id='dcfd')) == 8 and len(store.query(system_id='kcers1b')) == 8
+
+        store.export_json(str(path))
+        ids = [s['metadata']['call_id'] for s in json.loads(path.read_text())['dcfd']['streams']]
+        assert ids == [f'dcfd{i}' for i in range(19, 11, -1)]  # The newest 8
+        assert b'\n' not in path.read_bytes()  # Compact
+
+    with RegistryStore(str(tmp_path / 'streams.db'), max_age=60) as store:  # Fixture calls are from 2025
+        store.upsert_profile(make_profile('dcfd', 20, 1))
+        assert store.query(system_id='dcfd') == [] and store.export()['dcfd']['total_streams'] == 0
+
+
+def test_concurrent_exports_never_publish_a_partial_file(tmp_path):
+    db, path = str(tmp_path / 'streams.db'), tmp_path / 'streams.json'
+    with RegistryStore(db) as store:
+        for system_id in ('alpha', 'bravo', 'charlie'):
+            store.upsert_profile(make_profile(system_id, 0, 100))
+
+    def exporter():
+        with RegistryStore(db) as store:
+            for _ in range(10):
+                store.export_json(str(path))
+
+    threads = [threading.Thread(target=exporter) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert json.loads(path.read_text())['alpha']['total_streams'] == 100
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+
+def test_new_store_is_seeded_from_legacy_json_and_exports_it(tmp_path):
+    legacy = {'dcfd': make_profile('dcfd', 0, 4), 'last_updated': '2025-10-23T00:00:00Z'}
+    legacy_path = tmp_path / 'streams.json'
+    legacy_path.write_text(json.dumps(legacy))
+
+    with open_registry(str(tmp_path / 'streams.db'), str(legacy_path)) as store:
+        store.upsert_profile(make_profile('kcers1b', 0, 2))
+        store.export_json(str(legacy_path))
+
+    exported = json.loads(legacy_path.read_text())
+    assert exported['dcfd']['total_streams'] == 4
+    assert exported['kcers1b']['streams'][0]['system_name'] == 'kcers1b'
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Replay load harness tests: schedule construction and a short end-to-end follow run
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'openmhz')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+from mock_openmhz_server import call_time_ms, load_fixture_calls
+from registry_store import DEFAULT_JSON
+from replay_load import build_schedule, percentile, run_replay
+
+
+def test_schedule_compresses_time_and_keeps_ids_unique():
+    template = load_fixture_calls()
+    span_ms = max(map(call_time_ms, template)) - min(map(call_time_ms, template))
+    schedule = build_schedule(template, ['a', 'b'], start=1000.0, speed=10.0)
+
+    for items in schedule.values():
+        assert len(items) == len(template)
+        releases = [ms for ms, _ in items]
+        assert releases == sorted(releases)
+        assert all(call_time_ms(call) == ms for ms, call in items)
+        assert releases[-1] - releases[0] <= span_ms / 10 + 100
+
+    ids = [call['_id'] for items in schedule.values() for _, call in items]
+    assert len(ids) == len(set(ids))
+
+    tiled = build_schedule(template, ['a'], start=1000.0, speed=1.0, duration=3 * span_ms / 1000)
+    assert len(tiled['a']) > 2 * len(template)
+
+
+def test_follow_replay_reaches_registry_without_drops():
+    with open(DEFAULT_JSON, 'rb') as f:
+        published = f.read()
+    report = run_replay(load_fixture_calls(), systems=2, speed=120.0, mode='follow',
+                        interval=0.3, drain=2.0)
+
+    assert report['calls_served'] > 0
+    assert report['calls_ingested'] == report['calls_served']
+    assert report['dropped'] == 0
+    assert report['duplicates'] == 0
+    assert report['unexpected'] == 0
+    assert 0 <= report['latency_seconds']['p50'] <= report['latency_seconds']['p99'] < 3.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.5) == 2.0
+    with open(DEFAULT_JSON, 'rb') as f:
+        assert f.read() == published  # The export goes to the scratch directory
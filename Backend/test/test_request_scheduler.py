@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Request scheduler tests: retries, 429/Retry-After handling, budget split and
+failures reported apart from empty results
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'openmhz')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+import pytest
+import requests
+
+from ingest_openmhz import OpenMHZClient, RequestScheduler, ingest_systems
+from mock_openmhz_server import MockOpenMHzServer
+
+
+def test_retry_after_pauses_then_succeeds():
+    with MockOpenMHzServer() as server:
+        server.inject(429, retry_after='0.3')
+        scheduler = RequestScheduler(rate=20.0, base_delay=0.01)
+        client = OpenMHZClient('dcfd', base_url=server.url, scheduler=scheduler)
+
+        started = time.monotonic()
+        calls = client.get_calls_page(0)
+        assert calls
+        assert time.monotonic() - started >= 0.3
+        assert scheduler.stats['throttled'] == 1
+        # The 429 halved the budget; successes win it back gradually
+        assert scheduler.factor < 1.0
+
+
+def test_exhausted_retries_raise_instead_of_returning_empty():
+    with MockOpenMHzServer() as server:
+        server.inject(503, count=10)
+        client = OpenMHZClient('dcfd', base_url=server.url,
+                               scheduler=RequestScheduler(max_retries=2, base_delay=0.01))
+        with pytest.raises(requests.RequestException):
+            client.get_recent_calls(since_time=0)
+        assert len(server.request_log) == 3
+
+
+def test_failed_system_reported_separately(tmp_path):
+    quiet = {'calls': [], 'talkgroups': []}
+    with MockOpenMHzServer({'quiet': quiet}) as server:
+        result = ingest_systems(['quiet', 'missing'], base_url=server.url, talkgroup_cache=None,
+                                wallet_cache=None, registry_db=str(tmp_path / 'streams.db'))
+    # An empty system is a result; a 404 is an error
+    assert result['systems']['quiet']['total_streams'] == 0
+    assert list(result['errors']) == ['missing']
+    assert 'missing' not in result['systems']
+
+
+def test_budget_is_split_across_systems():
+    scheduler = RequestScheduler(rate=8.0)
+    scheduler.register(['a', 'b', 'c', 'd'])
+    started = time.monotonic()
+    for _ in range(3):
+        scheduler.acquire('a')
+    # 'a' gets 2 req/s: the first token is free, two more take about a second
+    assert time.monotonic() - started >= 0.9
+    assert scheduler.backoff(3) <= scheduler.base_delay * 8
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Batch analysis tests: chunked results equal one pass, framed input, occupancy, the CLI table and the benchmark
+"""
+
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+SDR_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'sdr'))
+sys.path.insert(0, SDR_DIR)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+import batch
+from batch import analyze_recordings, expand_inputs, plan_chunks
+from bench_batch import run_suite
+from iqframe import FrameWriter
+from simulator import IQSimulator, Noise, Tone
+from spectrum import analyze_file
+
+RATE = 256000
+
+
+def band(seconds, seed=0):
+    components = [Tone(-50e3, 0.5), Tone(30e3, 0.01), Noise(-60.0, seed=seed)]
+    return IQSimulator(components, RATE).generate(np.empty(int(RATE * seconds), np.complex64))
+
+
+def run(paths, **kwargs):
+    analyzers = {}
+    rows = analyze_recordings(paths, workers=2, sample_rate=RATE, on_analyzer=analyzers.__setitem__, **kwargs)
+    return rows, analyzers
+
+
+def test_chunks_cover_whole_rows():
+    frames_per_row, rows, chunks = plan_chunks(100000, 512, 256, max_rows=64, chunk_samples=20000)
+    assert frames_per_row == 8 and rows == 48  # 389 frames: 48 rows of 8, as a single pass would merge them
+    assert [c[0] for c in chunks] == list(range(0, 389, 72)) and sum(c[1] for c in chunks) == 389
+    assert all(c[1] % frames_per_row == 0 for c in chunks[:-1]) and chunks[1][2] == 9
+    assert plan_chunks(100, 512, 256)[2] == [(0, 0, 0)]
+
+
+@pytest.mark.parametrize('nfft,overlap', [(512, 0.5), (256, 0.0)])
+def test_chunked_analysis_matches_one_pass(tmp_path, nfft, overlap):
+    path = str(tmp_path / 'band.cf32')
+    band(3.0).tofile(path)
+    with open(path, 'ab') as f:
+        f.write(band(0.01, seed=1).tobytes()[:8 * 777])  # Not a whole number of frames
+    reference = analyze_file(path, RATE, nfft=nfft, overlap=overlap, max_rows=64, occupancy_db=10.0)
+
+    rows, analyzers = run([path], nfft=nfft, overlap=overlap, max_rows=64, chunk_samples=100000)
+    analyzer = analyzers[path]
+    assert rows[0]['chunks'] > 5 and rows[0]['error'] is None
+    assert analyzer.frames == reference.frames and analyzer.stats.samples == reference.stats.samples
+    assert np.allclose(analyzer.psd(), reference.psd(), rtol=1e-6)
+    assert np.allclose(analyzer.max_hold, reference.max_hold, rtol=1e-5)  # FFT batches differ: rounding only
+    assert np.abs(analyzer.occupied_bins - reference.occupied_bins).sum() <= 2
+    assert analyzer.spectrogram.frames_per_row == reference.spectrogram.frames_per_row
+    assert np.allclose(analyzer.spectrogram.power(), reference.spectrogram.power(), rtol=1e-4)
+    assert np.array_equal(analyzer.head, reference.head)
+
+    summary = reference.summary()
+    assert rows[0]['samples'] == summary['samples']
+    assert rows[0]['occupancy_pct'] == pytest.approx(summary['occupancy_pct'], abs=0.01)
+    assert rows[0]['power_db'] == round(summary['power_db'], 2)
+    assert rows[0]['peak_freqs_hz'] == [p['freq_hz'] for p in summary['peaks']]
+
+
+def test_framed_recordings_and_errors(tmp_path):
+    iq = band(2.0)
+    framed = str(tmp_path / 'band.iq')
+    with open(framed, 'wb') as f:
+        writer = FrameWriter(f, RATE, 851e6, 'cs16')
+        for sequence, i in enumerate(range(0, len(iq), 10000)):
+            writer.write(iq[i:i + 10000], sequence=sequence + (sequence >= 20))  # One lost frame
+    raw = str(tmp_path / 'band.cf32')
+    iq.tofile(raw)
+
+    rows, analyzers = run([framed, raw, str(tmp_path / 'missing.cf32')], nfft=512, chunk_samples=65536)
+    framed_row, raw_row, missing = rows
+    assert framed_row['format'] == 'cs16' and framed_row['center_freq'] == 851e6 and framed_row['lost_frames'] == 1
+    assert framed_row['samples'] == raw_row['samples'] == len(iq)
+    assert framed_row['peak_freqs_hz'][:2] == [851e6 - 50e3, 851e6 + 30e3]
+    assert np.allclose(analyzers[framed].psd(), analyzers[raw].psd(), rtol=1e-3)
+    assert missing['error'].startswith('FileNotFoundError') and missing['samples'] is None
+
+
+def shared_segments():
+    return set(os.listdir('/dev/shm')) if os.path.isdir('/dev/shm') else set()
+
+
+def test_no_shared_memory_gives_error_rows(tmp_path, monkeypatch):
+    path = str(tmp_path / 'band.cf32')
+    band(0.5).tofile(path)
+
+    def full(*args, **kwargs):
+        raise OSError(28, 'No space left on device')
+
+    monkeypatch.setattr(batch, 'SharedArrays', full)
+    rows, _ = run([path, path + '.missing'], nfft=512)
+    assert rows[0]['error'].startswith('OSError') and rows[0]['format'] == 'raw' and rows[0]['samples'] is None
+    assert rows[1]['error'].startswith('FileNotFoundError')
+
+
+def test_interrupted_batch_releases_shared_memory(tmp_path):
+    paths = []
+    for i in range(4):
+        paths.append(str(tmp_path / f'rec{i}.cf32'))
+        band(0.5, seed=i).tofile(paths[-1])
+    before = shared_segments()
+
+    def interrupt(path, analyzer):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        analyze_recordings(paths, workers=1, sample_rate=RATE, nfft=512, chunk_samples=32768, on_analyzer=interrupt)
+    assert shared_segments() == before
+
+
+def test_occupancy_counts_busy_cells(tmp_path):
+    quiet, busy = str(tmp_path / 'quiet.cf32'), str(tmp_path / 'busy.cf32')
+    IQSimulator([Noise(-60.0)], RATE).generate(np.empty(RATE, np.complex64)).tofile(quiet)
+    band(1.0).tofile(busy)
+    rows, _ = run([quiet, busy], nfft=512, occupancy_db=10.0)
+    assert rows[0]['occupancy_pct'] < 0.1
+    # Two tones, each a main lobe of a few of the 512 bins, in every frame
+    assert 0.5 < rows[1]['occupancy_pct'] < 3
+
+
+def test_cli_writes_one_table(tmp_path):
+    for i in range(3):
+        band(0.5, seed=i).tofile(str(tmp_path / f'rec{i}.cf32'))
+    (tmp_path / 'notes.txt').write_text('not a recording')
+    assert len(expand_inputs([str(tmp_path)])) == 3 and len(expand_inputs([str(tmp_path / 'rec[01].*')])) == 2
+
+    command = [sys.executable, os.path.join(SDR_DIR, 'batch.py'), str(tmp_path), '--rate', str(RATE),
+               '--center', '100e6', '--nfft', '512', '--workers', '2']
+    result = subprocess.run(command, capture_output=True, text=True, check=True, cwd=SDR_DIR)
+    table = list(csv.DictReader(io.StringIO(result.stdout)))
+    assert [os.path.basename(row['file']) for row in table] == ['rec0.cf32', 'rec1.cf32', 'rec2.cf32']
+    assert float(table[0]['duration_s']) == 0.5 and table[0]['error'] == ''
+    assert table[0]['peak_freqs_hz'].split(';')[0] == str(100e6 - 50e3)
+
+    output = tmp_path / 'summary.json'
+    subprocess.run(command + ['--json', '--output', str(output)], capture_output=True, check=True, cwd=SDR_DIR)
+    rows = json.loads(output.read_text())
+    assert len(rows) == 3 and rows[1]['sample_rate'] == RATE and rows[1]['occupancy_pct'] > 0
+
+
+def test_benchmark_smoke():
+    results = run_suite([1, 2], files=2, sample_rate=1e6, seconds=0.5, chunk_samples=1 << 18, repeat=1, verbose=False)
+    assert [r['workers'] for r in results] == [1, 2] and results[0]['speedup'] == 1.0
+    assert all(r['failed'] == 0 and r['chunks'] == 4 for r in results) and results[0]['megabytes_per_second'] > 0
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Polyphase channelizer tests: reference equivalence, block independence, tuning and the benchmark
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+from scipy.signal import lfilter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'sdr')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+from bench_channelizer import run_suite
+from channelizer import Channelizer
+
+RATE = 1e6
+
+
+def noise(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(n) + 1j * rng.standard_normal(n)).astype(np.complex64)
+
+
+def run_blocks(channelizer, iq, block):
+    return np.concatenate([channelizer.process(iq[i:i + block]) for i in range(0, len(iq), block)], axis=1)
+
+
+@pytest.mark.parametrize('oversample', [1, 2])
+def test_matches_mix_filter_decimate_for_any_block_size(oversample):
+    iq = noise(20000)
+    freqs = [-250e3, 0.0, 12.5e3, 487.5e3]
+    channelizer = Channelizer(RATE, freqs, channel_spacing=12.5e3, oversample=oversample, taps_per_channel=6)
+    out = run_blocks(channelizer, iq, 3001)
+
+    D = channelizer.decimation
+    t = np.arange(len(iq))
+    assert out.shape == (4, len(iq) // D) and out.dtype == np.complex64
+    for row, freq in zip(out, freqs):
+        reference = lfilter(channelizer.taps, 1, iq * np.exp(-2j * np.pi * freq * t / RATE))[D - 1::D]
+        assert np.allclose(row, reference, atol=1e-5 * np.abs(reference).max())
+
+    channelizer.reset()
+    assert np.allclose(run_blocks(channelizer, iq, len(iq)), out, atol=1e-5)
+
+
+def test_off_grid_channel_is_tuned_to_zero_hz():
+    t = np.arange(200000) / RATE
+    freq = 103.3e3  # Not a multiple of the 12.5 kHz grid
+    iq = (0.4 * np.exp(2j * np.pi * freq * t) + 0.4 * np.exp(2j * np.pi * (freq + 25e3) * t)).astype(np.complex64)
+    channelizer = Channelizer(RATE, [freq + 100e6], center_freq=100e6)
+    out = run_blocks(channelizer, iq, 7777)[0, 200:]  # Skip the filter start-up
+
+    assert channelizer.output_rate == 25e3
+    assert np.allclose(np.abs(out), 0.4, atol=0.01)  # Neighbour 2 channels away is rejected
+    assert np.abs(np.mean(np.diff(np.unwrap(np.angle(out))))) < 1e-3  # No residual rotation
+
+
+def test_rejects_frequencies_outside_the_band():
+    with pytest.raises(ValueError):
+        Channelizer(RATE, [600e3])
+    with pytest.raises(ValueError):
+        Channelizer(RATE, [0.0], num_channels=15, oversample=2)
+
+
+def test_benchmark_smoke():
+    results = run_suite([8, 16], sample_rate=200e3, seconds=0.1, block_size=4096, repeat=1, verbose=False)
+    assert [r['benchmark'] for r in results] == ['polyphase', 'mix_decimate_1ch'] * 2
+    assert all(r['samples_per_second'] > 0 and r['realtime_factor'] > 0 for r in results)
+    assert results[0]['selected'] == 8
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+FM demodulator tests: resampler continuity, tone recovery, seamless blocks and the benchmark
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+from scipy.signal import upfirdn
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'sdr')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+from bench_demod import run_suite
+from demod import FMDemodulator, Resampler
+from simulator import IQSimulator, KeyedFM
+
+RATE = 2e6
+OFFSET = -125e3
+
+
+def fm_tone(seconds, deviation=2500.0, audio_hz=800.0, extra=()):
+    channel = KeyedFM(OFFSET, amplitude=0.3, mean_on=1e6, mean_off=1e6, deviation=deviation,
+                      audio_hz=audio_hz, keyed=True)
+    return IQSimulator([channel, *extra], RATE).generate(np.empty(int(RATE * seconds), np.complex64))
+
+
+def in_blocks(func, data, size):
+    return np.concatenate([func(data[i:i + size]) for i in range(0, len(data), size)])
+
+
+@pytest.mark.parametrize('up,down', [(16, 25), (1, 25), (3, 2)])
+def test_resampler_matches_upfirdn_in_pieces(up, down):
+    x = np.random.default_rng(0).standard_normal(5000).astype(np.float32)
+    resampler = Resampler(up, down)
+    pieces = in_blocks(resampler.process, x, 333)
+
+    taps = np.zeros(resampler.taps_per_phase * up)
+    for phase in range(up):
+        taps[phase::up] = resampler._phases[phase, ::-1]
+    expected = upfirdn(taps, x, up, down)[:len(pieces)]
+    assert len(pieces) == len(x) * up // down
+    assert np.allclose(pieces, expected, atol=1e-5)
+
+
+def test_recovers_the_modulating_tone():
+    iq = fm_tone(0.5)
+    flat = FMDemodulator(RATE, OFFSET, deemphasis=0)
+    audio = in_blocks(flat.process_audio, iq, 50000)[1000:]  # Skip filter start-up
+
+    assert flat.if_rate == 25000 and flat.samples_out == 8000
+    spectrum = np.abs(np.fft.rfft(audio))
+    assert np.fft.rfftfreq(len(audio), 1 / 16000)[np.argmax(spectrum)] == pytest.approx(800, abs=3)
+    assert np.sqrt(2) * audio.std() == pytest.approx(1.0, abs=0.02)  # Full deviation reads 1.0
+
+    emphasized = FMDemodulator(RATE, OFFSET)  # 750 us: corner at 212 Hz
+    level = np.sqrt(2) * in_blocks(emphasized.process_audio, iq, 50000)[1000:].std()
+    assert level == pytest.approx(1 / np.hypot(1, 800 * 2 * np.pi * 750e-6), rel=0.05)
+
+
+def test_block_size_does_not_change_the_audio():
+    iq = fm_tone(0.3, extra=[KeyedFM(200e3, amplitude=0.5, mean_on=0.01, mean_off=0.01, seed=2)])
+    whole = FMDemodulator(RATE, OFFSET).process(iq)
+    pieces = in_blocks(FMDemodulator(RATE, OFFSET).process, iq, 12345)
+
+    assert pieces.dtype == np.int16 and len(pieces) == len(whole) == 4800
+    assert np.abs(pieces.astype(int) - whole).max() <= 1
+    assert iq.nbytes / pieces.nbytes == 500
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        FMDemodulator(RATE, mode='am')
+
+
+def test_benchmark_smoke():
+    results = run_suite(['nfm', 'wfm'], sample_rate=1e6, seconds=0.2, repeat=1, verbose=False)
+    assert [r['mode'] for r in results] == ['nfm', 'wfm']
+    assert all(r['realtime_factor'] > 0 and r['bandwidth_reduction'] == 250 for r in results)
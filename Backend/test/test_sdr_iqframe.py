@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Framed IQ tests: round trips, zero-copy reads, sequence gaps, capture/CLI integration and the benchmark
+"""
+
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pytest
+
+SDR_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'sdr'))
+sys.path.insert(0, SDR_DIR)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+from bench_iqframe import run_suite
+from capture import CaptureEngine, SimSource
+from iqframe import HEADER_SIZE, FrameError, FrameReader, FrameWriter, is_framed
+from spectrum import open_iq
+
+RATE = 48000
+
+
+def tone(n, amplitude=0.5):
+    return (amplitude * np.exp(2j * np.pi * 1000 / RATE * np.arange(n))).astype(np.complex64)
+
+
+def framed(iq, dtype, block_size=1000, **kwargs):
+    f = io.BytesIO()
+    writer = FrameWriter(f, RATE, 851e6, dtype, start_time=1.7e9)
+    for i in range(0, len(iq), block_size):
+        writer.write(iq[i:i + block_size], **kwargs)
+    return f.getvalue()
+
+
+@pytest.mark.parametrize('dtype,bytes_per_sample,tolerance', [('cf32', 8, 0), ('cs16', 4, 1e-4), ('cs8', 2, 6e-3)])
+def test_round_trip_size_and_headers(dtype, bytes_per_sample, tolerance):
+    iq = tone(4500, amplitude=0.01)  # Per-block scaling: a weak signal still uses the full integer range
+    data = framed(iq, dtype)
+    assert len(data) == 5 * HEADER_SIZE + len(iq) * bytes_per_sample
+
+    reader = FrameReader(data)
+    assert (reader.sample_rate, reader.center_freq, reader.dtype, reader.start_time) == (RATE, 851e6, dtype, 1.7e9)
+    frames = list(reader)
+    assert [f.sequence for f in frames] == [0, 1, 2, 3, 4] and [len(f) for f in frames] == [1000] * 4 + [500]
+    assert frames[1].timestamp == pytest.approx(1.7e9 + 1000 / RATE)
+    decoded = np.concatenate([f.samples() for f in frames])
+    assert np.abs(decoded - iq).max() <= tolerance * 0.01
+    assert reader.stats == {'frames': 5, 'samples': 4500, 'bytes': len(data), 'gaps': 0, 'lost_frames': 0}
+
+
+def test_reads_are_zero_copy():
+    iq = tone(3000)
+    memory = bytearray(framed(iq, 'cf32'))
+    first = next(iter(FrameReader(memory)))
+    assert np.shares_memory(first.raw, np.frombuffer(memory, np.uint8))
+
+    stream = FrameReader(io.BytesIO(framed(iq, 'cs16')))
+    views = [block for block in stream.blocks()]
+    assert all(np.shares_memory(views[0], view) for view in views)  # One reused dequantization buffer
+
+
+def test_sequence_gaps_are_reported():
+    iq = tone(5000)
+    f = io.BytesIO()
+    writer = FrameWriter(f, RATE, dtype='cs8')
+    for sequence in (0, 1, 4, 5, 9):
+        writer.write(iq[:1000], sequence=sequence)
+    reader = FrameReader(io.BytesIO(f.getvalue() + b'IQF1partial'))  # A truncated last frame is ignored
+    assert [frame.gap for frame in reader] == [0, 0, 2, 0, 3]
+    assert reader.stats['gaps'] == 2 and reader.stats['lost_frames'] == 5
+
+    with pytest.raises(FrameError):
+        list(FrameReader(b'\x00' * 100))
+
+
+def test_capture_numbers_dropped_blocks():
+    sink = io.BytesIO()
+    source = SimSource(sample_rate=RATE, amplitude=0.5, realtime=True)
+    writer = FrameWriter(sink, RATE, source.center_freq, 'cs16')
+    delivered = []
+
+    def stall_once(block):  # The consumer hangs for ~10 blocks, then keeps up again
+        delivered.append(len(block))
+        if len(delivered) == 5:
+            time.sleep(0.1)
+
+    engine = CaptureEngine(source, None, block_size=500, ring_blocks=2, frame_writer=writer, on_block=stall_once)
+    stats = engine.run(max_samples=25000)
+
+    reader = FrameReader(sink.getvalue())
+    frames = list(reader)
+    assert stats['dropped_blocks'] > 0 and stats['bytes_written'] == len(sink.getvalue())
+    assert reader.stats['gaps'] >= 1 and reader.stats['lost_frames'] == stats['dropped_blocks']
+    assert frames[-1].sequence == 49
+    assert frames[-1].timestamp - frames[0].timestamp == pytest.approx(49 * 500 / RATE)
+
+
+def test_framed_input_describes_itself(tmp_path):
+    path = tmp_path / 'tone.iq'
+    path.write_bytes(framed(tone(20000), 'cs8', block_size=4096))
+    assert is_framed(str(path)) and not is_framed(io.BytesIO(b'IQF1'))  # No peek: taken as raw
+
+    blocks, reader = open_iq(str(path))
+    assert reader.sample_rate == RATE and sum(len(b) for b in blocks) == 20000
+
+    result = subprocess.run([sys.executable, os.path.join(SDR_DIR, 'decode-sim.py'), str(path), '--json', '--no-plot'],
+                            capture_output=True, text=True, check=True, cwd=SDR_DIR)
+    summary = json.loads(result.stdout)
+    assert summary['sample_rate'] == RATE and summary['framing']['dtype'] == 'cs8'
+    assert summary['peaks'][0]['freq_hz'] == pytest.approx(1000, abs=RATE / 4096)  # Not the 2 MS/s default
+
+
+def test_benchmark_smoke():
+    results = run_suite(['cf32', 'cs8'], sample_rate=1e6, seconds=0.2, block_size=1 << 16, repeat=1, verbose=False)
+    assert [r['size_reduction'] for r in results] == [1.0, 4.0]
+    assert results[0]['snr_db'] is None and results[1]['snr_db'] > 30
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Streaming spectrum analysis tests: block independence, Welch parity, peaks and bounded memory
+"""
+
+import io
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+from scipy.signal import welch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'sdr')))
+
+from simulator import IQSimulator, KeyedFM, Noise, Tone
+from spectrum import Spectrogram, SpectrumAnalyzer, analyze_blocks, analyze_file, analyze_stream
+
+RATE = 250e3
+
+
+def recording(tmp_path, components, seconds):
+    iq = IQSimulator(components, RATE).generate(np.empty(int(RATE * seconds), np.complex64))
+    path = tmp_path / 'capture.cf32'
+    path.write_bytes(iq.tobytes())
+    return str(path), iq
+
+
+def test_matches_scipy_welch_and_whole_array_stats(tmp_path):
+    path, iq = recording(tmp_path, [Tone(20e3, 0.5), Noise(-50.0, seed=2)], 0.5)
+    analyzer = analyze_file(path, RATE, block_size=10007, nfft=1024)
+
+    _, expected = welch(iq, RATE, window='hann', nperseg=1024, noverlap=512, detrend=False,
+                        return_onesided=False, scaling='spectrum')
+    assert np.allclose(analyzer.psd(), expected, rtol=1e-3, atol=1e-12)
+
+    stats = analyzer.summary()
+    power = np.abs(iq.astype(np.complex128)) ** 2
+    assert stats['samples'] == len(iq)
+    assert np.isclose(stats['power'], power.mean(), rtol=1e-5)
+    assert np.isclose(stats['mean_amplitude'], np.sqrt(power).mean(), rtol=1e-5)
+    assert np.isclose(stats['max_amplitude'], np.sqrt(power.max()), rtol=1e-5)
+
+
+def test_block_size_and_input_kind_do_not_change_results(tmp_path):
+    path, iq = recording(tmp_path, [Tone(-30e3, 0.3), Noise(-60.0, seed=4)], 0.3)
+    reference = analyze_file(path, RATE, block_size=len(iq))
+    for analyzer in (analyze_file(path, RATE, block_size=777),
+                     analyze_stream(io.BytesIO(iq.tobytes() + b'\x01\x02\x03'), RATE, block_size=5000)):
+        assert analyzer.frames == reference.frames
+        assert np.allclose(analyzer.psd(), reference.psd(), rtol=1e-4)
+        assert np.allclose(analyzer.max_hold, reference.max_hold, rtol=1e-4)
+        assert analyzer.stats.samples == len(iq)
+
+    # Empty blocks (zero-length frames, short pipe reads) are skipped
+    empty = np.zeros(0, np.complex64)
+    analyzer = analyze_blocks(iter([empty, iq[:5000], empty, iq[5000:], empty]), RATE)
+    assert analyzer.frames == reference.frames and np.allclose(analyzer.psd(), reference.psd(), rtol=1e-4)
+    SpectrumAnalyzer(RATE).update(empty)
+
+
+def test_peaks_cover_intermittent_transmissions(tmp_path):
+    components = [Tone(50e3, 0.2), Noise(-70.0, seed=1),
+                  KeyedFM(-80e3, amplitude=0.3, mean_on=0.05, mean_off=0.5, deviation=500, audio_hz=100, seed=6)]
+    path, _ = recording(tmp_path, components, 2.0)
+    peaks = analyze_file(path, RATE, nfft=2048).peaks(count=2, min_spacing_hz=5e3)
+
+    by_freq = {round(p['freq_hz'] / 1e3): p for p in peaks}
+    assert set(by_freq) == {50, -80}
+    tone, burst = by_freq[50], by_freq[-80]
+    assert abs(tone['avg_db'] - 20 * np.log10(0.2)) < 1.5
+    assert burst['max_db'] - burst['avg_db'] > 5  # Keyed a fraction of the time
+
+
+def test_spectrogram_stays_bounded_and_covers_every_frame():
+    spectrogram = Spectrogram(nbins=8, max_rows=16)
+    for _ in range(13):
+        spectrogram.add(np.ones((37, 8), np.float32))
+    frames = 13 * 37
+    assert 8 <= spectrogram.n_rows <= 16
+    assert spectrogram.n_rows * spectrogram.frames_per_row + spectrogram._partial_frames == frames
+    assert np.allclose(spectrogram.power(), 1.0)
+
+
+def test_memory_does_not_grow_with_recording_length(tmp_path):
+    path = tmp_path / 'long.cf32'
+    chunk = IQSimulator([Tone(10e3, 0.5), Noise(-40.0)], RATE).generate(np.empty(1 << 20, np.complex64)).tobytes()
+    with open(path, 'wb') as f:
+        for _ in range(6):  # 48 MB
+            f.write(chunk)
+
+    tracemalloc.start()
+    analyzer = analyze_file(str(path), RATE, block_size=1 << 16, nfft=1024)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert analyzer.stats.samples == 6 << 20
+    assert peak < 8 << 20
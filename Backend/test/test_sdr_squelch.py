@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Squelch tests: block-size independence, simulator events, hysteresis, floor tracking and call records
+"""
+
+import json
+import os
+import sys
+import wave
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'sdr')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'openmhz')))
+
+from demod import CallWriter, FMDemodulator
+from ingest_openmhz import StreamProfileGenerator
+from simulator import IQSimulator, KeyedFM, Noise
+from squelch import Squelch, call_record
+
+RATE = 25e3  # One channel at the channelizer's output rate
+
+
+def noise(n, power_db=-60.0, seed=0):
+    rng = np.random.default_rng(seed)
+    sigma = np.sqrt(10 ** (power_db / 10) / 2)
+    return (sigma * (rng.standard_normal(n) + 1j * rng.standard_normal(n))).astype(np.complex64)
+
+
+def keyed_channel(seconds, seed=1):
+    channel = KeyedFM(0.0, amplitude=0.1, mean_on=1.0, mean_off=1.0, seed=seed)
+    iq = IQSimulator([channel, Noise(-50.0, seed=seed)], RATE).generate(np.empty(int(RATE * seconds), np.complex64))
+    return iq, list(channel.events)
+
+
+def run(squelch, iq, size):
+    spans = []
+    for i in range(0, len(iq), size):
+        spans += [(i + a, i + b) for a, b in squelch.process(iq[i:i + size])]
+    return spans, squelch.flush()
+
+
+def test_block_size_does_not_change_the_decisions():
+    iq, _ = keyed_channel(20)
+    whole_spans, whole_calls = run(Squelch(RATE), iq, len(iq))
+    for size in (97, 250, 4096, 25000):
+        spans, calls = run(Squelch(RATE), iq, size)
+        assert calls == whole_calls
+        if size < Squelch(RATE).window:
+            continue  # Audio before a window completes has already gone out closed
+        merged = []
+        for a, b in spans:
+            if merged and merged[-1][1] == a:
+                merged[-1] = (merged[-1][0], b)
+            else:
+                merged.append((a, b))
+        assert merged == whole_spans
+
+
+def test_transmissions_match_the_simulator():
+    iq, events = keyed_channel(30)
+    _, calls = run(Squelch(RATE), iq, 4096)
+    merged = []  # Pauses shorter than the hang time do not close the squelch
+    for start, end in events:
+        if merged and start - merged[-1][1] < 0.5 * RATE:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    events = [(s, e) for s, e in merged if e - s >= 0.25 * RATE]
+
+    assert len(calls) == len(events) > 3
+    window = Squelch(RATE).window
+    for (start, end), (true_start, true_end) in zip(calls, events):
+        assert abs(start - true_start) <= window
+        assert abs(end - true_end) <= 2 * window
+
+
+def test_hysteresis_and_hang_time():
+    squelch = Squelch(RATE, initial_floor_db=-60.0, hang_time=0.1, min_duration=0)
+    level = lambda db, seconds: noise(int(RATE * seconds), db, seed=int(seconds * 1000))  # noqa: E731
+    # Opens at +10 dB, stays open while fading to +8 dB, then closes 100 ms into the quiet
+    iq = np.concatenate([level(-60, 0.5), level(-48, 0.5), level(-52, 0.5), level(-60, 0.5)])
+    _, calls = run(squelch, iq, 5000)
+
+    assert len(calls) == 1
+    start, end = calls[0]
+    assert start == pytest.approx(0.5 * RATE, abs=squelch.window)
+    assert end == pytest.approx(1.5 * RATE, abs=squelch.window)
+    assert squelch.duty_cycle == pytest.approx(1.1 / 2, abs=0.01)
+
+
+def test_noise_floor_follows_the_channel():
+    squelch = Squelch(RATE)
+    run(squelch, noise(int(RATE * 10), -60.0), 4096)
+    assert squelch.floor_db == pytest.approx(-60.0, abs=1.0)
+
+    # A gradual 6 dB rise stays under the open threshold and drags the floor along
+    rising = np.concatenate([noise(int(RATE), -60.0 + step, seed=step) for step in range(7)])
+    spans, calls = run(squelch, np.concatenate([rising, noise(int(RATE * 20), -54.0, seed=9)]), 4096)
+    assert calls == [] and squelch.floor_db == pytest.approx(-54.0, abs=1.0)
+
+
+def test_call_records_feed_the_stream_index():
+    records = [call_record(start, end, RATE, 1.7e9, freq=851.0125e6) for start, end in [(0, 50000), (75000, 80000)]]
+    assert records[0]['time'] == '2023-11-14T22:13:20.000Z' and records[1]['len'] == 0.2
+    assert records[0]['_id'] != records[1]['_id'] and records[0]['talkgroupNum'] == 851012500
+
+    profile = StreamProfileGenerator.generate_system_profile('sdr', [], records)
+    assert [s['duration'] for s in profile['streams']] == [0.2, 2.0]  # Newest first
+
+
+def test_idle_channel_is_silent_and_calls_are_recorded(tmp_path):
+    sample_rate = 1e6
+    channel = KeyedFM(-125e3, amplitude=0.1, mean_on=1.0, mean_off=1.5, seed=3)
+    iq = IQSimulator([channel, Noise(-50.0)], sample_rate).generate(np.empty(int(sample_rate * 8), np.complex64))
+
+    idle = FMDemodulator(sample_rate, -125e3, squelch={})
+    assert sum(len(idle.process(noise(100000, -50.0, seed=s))) for s in range(10)) == 0
+
+    demod = FMDemodulator(sample_rate, -125e3, squelch={})
+    calls_file = open(tmp_path / 'calls.jsonl', 'w')
+    writer = CallWriter(demod, 851e6 - 125e3, 1.7e9, calls_file, str(tmp_path / 'audio'))
+    total = 0
+    for i in range(0, len(iq), 1 << 17):
+        segments = [(new, demod.to_pcm(audio)) for new, audio in demod.audio_segments(iq[i:i + (1 << 17)])]
+        total += sum(len(pcm) for _, pcm in segments)
+        writer.write(segments)
+    writer.close()
+    calls_file.close()
+
+    records = [json.loads(line) for line in open(tmp_path / 'calls.jsonl')]
+    events = [(s, e) for s, e in channel.events if e - s >= 0.25 * sample_rate]
+    assert len(records) == len(events) >= 2
+    assert sorted(os.listdir(tmp_path / 'audio')) == sorted(r['_id'] + '.wav' for r in records)
+    frames = 0
+    for record, (start, end) in zip(records, events):
+        assert record['len'] == pytest.approx((end - start) / sample_rate, abs=0.03)
+        with wave.open(record['filename']) as wav:
+            assert wav.getframerate() == 16000
+            frames += wav.getnframes()
+    assert frames <= total < len(iq) / sample_rate * 16000 * 0.8
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Waterfall tests: row timing and levels, block-size independence, quantization, the CLI stream and the benchmark
+"""
+
+import base64
+import io
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+SDR_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'sdr'))
+sys.path.insert(0, SDR_DIR)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+from bench_waterfall import run_suite
+from iqframe import FrameWriter
+from simulator import IQSimulator, Noise, Tone
+from waterfall import Waterfall
+
+RATE = 256000
+
+
+def band(seconds, seed=0):
+    components = [Tone(-50e3, 0.5), Tone(80e3, 0.05), Noise(-70.0, seed=seed)]
+    return IQSimulator(components, RATE).generate(np.empty(int(RATE * seconds), np.complex64))
+
+
+def collect(waterfall, iq, size):
+    return [row for i in range(0, len(iq), size) for row in waterfall.update(iq[i:i + size])]
+
+
+def test_rows_show_the_band():
+    waterfall = Waterfall(RATE, nfft=512, rows_per_second=4, center_freq=100e6, start_time=1000.0)
+    rows = collect(waterfall, band(2.1), 30000)
+
+    assert waterfall.row_rate == pytest.approx(4, rel=0.01) and len(rows) == 8
+    assert [row['seq'] for row in rows] == list(range(8))
+    assert rows[1]['time'] - rows[0]['time'] == pytest.approx(1 / waterfall.row_rate)
+    assert rows[0]['row'].dtype == np.uint8 and rows[0]['row'].shape == (512,)
+
+    peaks = rows[-1]['peaks']
+    assert [p['freq_hz'] for p in peaks[:2]] == [100e6 - 50e3, 100e6 + 80e3]
+    assert peaks[0]['db'] == pytest.approx(20 * np.log10(0.5), abs=1.5)
+    levels = waterfall.dequantize(rows[-1]['row'])
+    assert levels[np.argmax(rows[-1]['row'])] == pytest.approx(peaks[0]['db'], abs=0.5)
+    assert np.median(levels) == pytest.approx(-70 - 10 * np.log10(512), abs=3)  # Noise spread over the bins
+
+
+def test_block_size_does_not_change_the_rows():
+    iq = band(1.01)  # Eight rows with half-overlapping frames
+    reference = collect(Waterfall(RATE, nfft=256, rows_per_second=8, overlap=0.5), iq, len(iq))
+    for size in (100, 4097):
+        rows = collect(Waterfall(RATE, nfft=256, rows_per_second=8, overlap=0.5), iq, size)
+        assert len(rows) == len(reference) == 8
+        for row, expected in zip(rows, reference):
+            assert np.abs(row['row'].astype(int) - expected['row']).max() <= 1
+            assert row['peaks'] == expected['peaks']
+
+
+def test_quantization_clips_and_rounds():
+    waterfall = Waterfall(RATE, min_db=-100, max_db=-49)  # 0.2 dB steps
+    db = np.array([-150, -100, -70.05, -49, 10])
+    row = waterfall.quantize(db)
+    assert row.tolist() == [0, 0, 150, 255, 255]
+    assert waterfall.dequantize(row)[2] == pytest.approx(-70, abs=0.1)
+    with pytest.raises(ValueError):
+        Waterfall(RATE, min_db=0, max_db=-10)
+
+
+def test_cli_streams_json_lines_from_framed_input():
+    stream = io.BytesIO()
+    writer = FrameWriter(stream, RATE, 851e6, 'cs16', start_time=1.7e9)
+    iq = band(1.0)
+    for i in range(0, len(iq), 65536):
+        writer.write(iq[i:i + 65536])
+
+    result = subprocess.run([sys.executable, os.path.join(SDR_DIR, 'waterfall.py'), '--nfft', '256', '--fps', '4'],
+                            input=stream.getvalue(), capture_output=True, check=True, cwd=SDR_DIR)
+    lines = [json.loads(line) for line in result.stdout.decode().splitlines()]
+    fmt, rows = lines[0], lines[1:]
+    assert fmt['type'] == 'format' and fmt['bins'] == 256 and fmt['centerFreq'] == 851e6
+    assert fmt['startFreq'] == 851e6 - RATE / 2
+    assert len(rows) == 4 and rows[0]['time'] == 1.7e9
+    row = np.frombuffer(base64.b64decode(rows[0]['row']), np.uint8)
+    assert len(row) == 256 and rows[0]['peaks'][0]['freq_hz'] == pytest.approx(851e6 - 50e3, abs=RATE / 256)
+    assert len(result.stdout) < iq.nbytes / 100
+
+
+def test_benchmark_smoke():
+    results = run_suite([256], sample_rate=1e6, seconds=0.4, repeat=1, verbose=False)
+    assert results[0]['rows'] == 2 and results[0]['realtime_factor'] > 1
+    assert results[0]['bandwidth_reduction'] > 1000
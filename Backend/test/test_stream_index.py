@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+StreamIndex tests over profiles built from the fixture calls
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'openmhz')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+from ingest_openmhz import IngestService, StreamProfileGenerator
+from mock_openmhz_server import MockOpenMHzServer, call_time_ms, load_fixture_calls, rebase_calls, talkgroups_for
+from stream_index import StreamIndex, stream_tag
+
+
+def fixture_profile(system_id='dcfd', end_time=None):
+    calls = rebase_calls(load_fixture_calls(), end_time)
+    return StreamProfileGenerator.generate_system_profile(system_id, talkgroups_for(calls), calls)
+
+
+def brute_force(streams, system_id=None, talkgroup_id=None, tag=None, since=None, until=None):
+    matches = [
+        s for s in streams
+        if (system_id is None or s['system_name'] == system_id)
+        and (talkgroup_id is None or s['talkgroup_id'] == talkgroup_id)
+        and (tag is None or stream_tag(s) == tag)
+        and (since is None or call_time_ms({'time': s['timestamp']}) >= since * 1000)
+        and (until is None or call_time_ms({'time': s['timestamp']}) < until * 1000)
+    ]
+    return sorted(s['stream_id'] for s in matches)
+
+
+def test_queries_match_a_linear_scan():
+    end = 1_761_249_500.0
+    profiles = [fixture_profile('dcfd', end), fixture_profile('kcers1b', end - 120)]
+    streams = [s for p in profiles for s in p['streams']]
+    index = StreamIndex()
+    for profile in profiles:
+        index.add_system_profile(profile)
+
+    talkgroup = streams[0]['talkgroup_id']
+    cases = [
+        {},
+        {'system_id': 'dcfd'},
+        {'tag': 'Fire Dispatch', 'since': end - 600},
+        {'tag': 'Law Dispatch', 'system_id': 'kcers1b'},
+        {'system_id': 'dcfd', 'talkgroup_id': talkgroup, 'until': end - 60},
+        {'talkgroup_id': talkgroup},
+    ]
+    for filters in cases:
+        found = index.query(**filters)
+        assert sorted(s['stream_id'] for s in found) == brute_force(streams, **filters), filters
+        assert index.count(**filters) == len(found)
+        times = [call_time_ms({'time': s['timestamp']}) for s in found]
+        assert times == sorted(times, reverse=True)
+
+    newest = index.latest(3, tag='Fire Dispatch')
+    assert [s['stream_id'] for s in newest] == [s['stream_id'] for s in index.query(tag='Fire Dispatch')[:3]]
+
+
+def test_talkgroups_of_a_system_with_unknown_ones():
+    end = 1_761_249_500.0
+    calls = rebase_calls(load_fixture_calls(), end)
+    unnumbered = [{k: v for k, v in call.items() if k != 'talkgroupNum'} for call in calls[:3]]
+    index = StreamIndex()
+    index.add_system_profile(fixture_profile('dcfd', end))
+    index.add_system_profile(StreamProfileGenerator.generate_system_profile('dcfd', [], unnumbered))
+
+    talkgroups = index.talkgroups('dcfd')
+    assert talkgroups == sorted({c['talkgroupNum'] for c in calls}) + ['unknown']
+    assert index.count('dcfd', 'unknown') == 3
+
+
+def test_updates_replace_and_retention_evicts():
+    profile = fixture_profile(end_time=1_000_000.0)
+    index = StreamIndex()
+    index.add_system_profile(profile)
+    total = len(index)
+
+    # Re-adding a stream replaces it rather than duplicating it
+    renamed = dict(profile['streams'][0], name='Renamed')
+    index.add([renamed])
+    assert len(index) == total
+    assert index.latest(1)[0]['name'] == 'Renamed'
+
+    oldest = min(call_time_ms({'time': s['timestamp']}) for s in profile['streams']) / 1000
+    evicted = index.evict(before=oldest + 60)
+    assert evicted == len(brute_force(profile['streams'], until=oldest + 60))
+    assert len(index) == total - evicted
+    assert index.count(since=0, until=oldest + 60) == 0
+
+    # A short retention drops old streams as soon as something is added
+    bounded = StreamIndex(retention=300)
+    recent = fixture_profile()
+    stale = fixture_profile('stale', end_time=1_000_000.0)
+    bounded.add_system_profile(recent)
+    bounded.add_system_profile(stale)
+    assert 0 < len(bounded) <= recent['total_streams']
+    assert all(s['stream_id'] not in bounded for s in stale['streams'])
+
+
+def test_service_streams_endpoint():
+    calls = rebase_calls(load_fixture_calls())
+    with MockOpenMHzServer({'dcfd': {'calls': calls, 'talkgroups': talkgroups_for(calls)}}) as upstream:
+        service = IngestService(base_url=upstream.url)
+        try:
+            ingested = service.ingest('dcfd')
+            status, result = service.handle('/streams', {'tag': ['Fire Dispatch'], 'minutes': ['10'], 'limit': ['5']})
+            assert status == 200
+            assert 0 < result['total_streams'] <= 5
+            assert result['indexed_streams'] == ingested['total_streams']
+            assert all(stream_tag(s) == 'Fire Dispatch' for s in result['streams'])
+            assert service.handle('/streams', {'limit': ['x']})[0] == 400
+        finally:
+            service.close()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Wallet worker protocol tests using a stand-in worker that speaks the same NDJSON protocol
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'openmhz')))
+
+from ingest_openmhz import CachedWalletAssigner, StreamProfileGenerator, WalletCache, WalletWorker
+
+FAKE_WORKER = '''
+import json, sys
+print(json.dumps({"ready": True}), flush=True)
+for line in sys.stdin:
+    req = json.loads(line)
+    if req["streamId"].endswith("-fail"):
+        print(json.dumps({"id": req["id"], "error": "boom"}), flush=True)
+        continue
+    wallet = {"streamId": req["streamId"], "walletAddress": "0x" + str(req["id"]).zfill(40),
+              "mode": "simple", "createdAt": "2025-10-23T00:00:00.000Z"}
+    print(json.dumps({"id": req["id"], "wallet": wallet}), flush=True)
+'''
+
+CALLS = [
+    {'_id': f'call{i}', 'talkgroupNum': 3344, 'time': f'2025-10-23T19:58:{i:02d}.000Z', 'len': 5, 'srcList': []}
+    for i in range(20)
+]
+
+
+def make_worker(tmp_path) -> WalletWorker:
+    script = tmp_path / 'fake_worker.py'
+    script.write_text(FAKE_WORKER)
+    worker = WalletWorker(str(tmp_path), timeout=5, command=[sys.executable, str(script)])
+    assert worker.start()
+    return worker
+
+
+def test_worker_answers_many_requests_over_one_process(tmp_path):
+    worker = make_worker(tmp_path)
+    pid = worker.process.pid
+    try:
+        futures = [worker.submit(f'sys-3344-call{i}', 'Fire Dispatch') for i in range(50)]
+        wallets = [worker.result(f) for f in futures]
+        assert [w['streamId'] for w in wallets] == [f'sys-3344-call{i}' for i in range(50)]
+        assert worker.assign_wallet('sys-3344-fail', 'Fire Dispatch') is None
+        assert worker.process.pid == pid
+    finally:
+        worker.close()
+
+
+def test_system_profile_pipelines_wallet_requests(tmp_path):
+    worker = make_worker(tmp_path)
+    try:
+        profile = StreamProfileGenerator.generate_system_profile('sys', [], CALLS, worker)
+    finally:
+        worker.close()
+
+    assert profile['total_streams'] == len(CALLS)
+    assert all(s['wallet']['address'].startswith('0x') for s in profile['streams'])
+
+
+def test_worker_that_cannot_start_reports_failure(tmp_path):
+    worker = WalletWorker(str(tmp_path), timeout=1, command=[str(tmp_path / 'missing-binary')])
+    assert not worker.start()
+    assert worker.assign_wallet('sys-1-a', 'x') is None
+
+
+class CountingAssigner:
+    """Blocking assigner that records every stream ID it is asked for"""
+
+    def __init__(self, fail: bool = False):
+        self.requests = []
+        self.fail = fail
+
+    def assign_wallet(self, stream_id, stream_name):
+        self.requests.append(stream_id)
+        if self.fail:
+            return None
+        return {'streamId': stream_id, 'walletAddress': f'0x{len(self.requests):040d}', 'mode': 'simple'}
+
+    def close(self):
+        pass
+
+
+def test_wallet_cache_makes_repeat_runs_free(tmp_path):
+    cache_path = str(tmp_path / 'wallets.db')
+    backends = []
+
+    def factory():
+        backends.append(CountingAssigner())
+        return backends[-1]
+
+    first = StreamProfileGenerator.generate_system_profile(
+        'sys', [], CALLS, CachedWalletAssigner(WalletCache(cache_path), factory, 'talkgroup'))
+    # Every call is on talkgroup 3344, so one wallet serves them all
+    assert backends[0].requests == ['sys-3344']
+    assert len({s['wallet']['address'] for s in first['streams']}) == 1
+
+    cached = CachedWalletAssigner(WalletCache(cache_path), factory, 'talkgroup')
+    second = StreamProfileGenerator.generate_system_profile('sys', [], CALLS, cached)
+    cached.close()
+    assert len(backends) == 1  # No backend started on a fully cached run
+    assert second['streams'][0]['wallet'] == first['streams'][0]['wallet']
+
+
+def test_wallet_cache_per_call_and_negative_ttl(tmp_path):
+    failing = CountingAssigner(fail=True)
+    cache = WalletCache(str(tmp_path / 'wallets.db'), failure_ttl=60)
+    assigner = CachedWalletAssigner(cache, lambda: failing, 'call')
+
+    assert assigner.assign_wallet('sys-3344-a', 'x') is None
+    assert assigner.assign_wallet('sys-3344-a', 'x') is None
+    assert assigner.assign_wallet('sys-3344-b', 'x') is None
+    assert failing.requests == ['sys-3344-a', 'sys-3344-b']
+
+    cache.failure_ttl = 0  # Expired failures are retried
+    assert assigner.assign_wallet('sys-3344-a', 'x') is None
+    assert failing.requests[-1] == 'sys-3344-a'
+
+
+def test_resolved_wallets_are_not_kept(tmp_path):
+    backend = CountingAssigner()
+    for granularity in ('call', 'talkgroup'):
+        assigner = CachedWalletAssigner(WalletCache(str(tmp_path / f'{granularity}.db')), lambda: backend, granularity)
+        for batch in range(3):  # As --follow does, one system batch after another
+            calls = [dict(call, _id=f'{call["_id"]}-{batch}') for call in CALLS]
+            profile = StreamProfileGenerator.generate_system_profile('sys', [], calls, assigner)
+            assert all(s['wallet'] for s in profile['streams'])
+        assert not assigner._resolved and not assigner._readers and not assigner._inflight